@@ -6,33 +6,16 @@ Functions and classes related to the application
 """
 
 import threading
-from typing import Callable
 
 import pygame
 import pygame_gui
 from pygame import constants
 from config import Config
 from simulation import Simulation, SimulationStatistics
-from simulation.heuristics.initial_state.closest import ClosestGenerator
-from simulation.heuristics.initial_state.generator import (
-    Generator as InitialStateGenerator,
+from simulation.registry import (
+    initial_state_generator_from_config,
+    simulation_config_from_config,
 )
-from simulation.heuristics.initial_state.random import (
-    RandomGenerator as RandomInitialStateGenerator,
-)
-from simulation.heuristics.meta.metaheuristic import Metaheuristic
-from simulation.heuristics.meta.simulated_annealing import SimulatedAnnealing
-from simulation.heuristics.neighborhood.crossover import CrossoverGenerator
-from simulation.heuristics.neighborhood.generator import (
-    Generator as NeighborhoodGenerator,
-)
-from simulation.heuristics.neighborhood.multiple import MultiGenerator
-from simulation.heuristics.neighborhood.mutation import MutationGenerator
-from simulation.heuristics.neighborhood.random import (
-    RandomGenerator as RandomNeighborhoodGenerator,
-)
-from simulation.heuristics.neighborhood.shuffle import ShuffleGenerator
-from simulation.simulation import SimulationConfig
 from simulation.state import State
 
 from .constants import *
@@ -241,52 +224,7 @@ class App:
         Sets up the simulation
         """
 
-        # HACK: due to time restrictions, this is done this way. However, this should be configured somewhere else
-        # it should also be configurable through the GUI
-
-        # could add support for more in the future
-        fitness_function: Callable[[State], float] = lambda state: -state.value()
-
-        neighborhood_generators = {
-            "default": NeighborhoodGenerator(),
-            "crossover": CrossoverGenerator(),
-            "mutation": MutationGenerator(),
-            "random": RandomNeighborhoodGenerator(
-                [
-                    CrossoverGenerator(),
-                    MutationGenerator(),
-                    ShuffleGenerator(),
-                ],
-                randomize=True,
-            ),
-            "multi": MultiGenerator(
-                [
-                    CrossoverGenerator(),
-                    MutationGenerator(),
-                    ShuffleGenerator(),
-                ]
-            ),
-            "shuffle": ShuffleGenerator(),
-        }
-        neighborhood_generator: NeighborhoodGenerator = neighborhood_generators[
-            Config.get("NEIGHBORHOOD_GENERATOR", "default")
-        ]
-
-        metaheuristics = {
-            "default": Metaheuristic(neighborhood_generator, fitness_function),
-            "sa": SimulatedAnnealing(
-                neighborhood_generator,
-                fitness_function,
-                float(Config.get("SA_INITIAL_TEMPERATURE", "1000")),
-                float(Config.get("SA_COOLDOWN_RATE", "0.999")),
-                float(Config.get("SA_MIN_TEMPERATURE", "0.00001")),
-            ),
-        }
-        metaheuristic: Metaheuristic = metaheuristics[Config.get("METAHEURISTIC", "default")]
-
-        simulation_config = SimulationConfig(
-            metaheuristic, fitness_function, neighborhood_generator
-        )
+        simulation_config = simulation_config_from_config()
 
         self.simulation = Simulation.setup(simulation_config)
 
@@ -380,12 +318,9 @@ class App:
         self.improvement.set_text(
             f"Improvement: {(((stats.values[0] - stats.values[-1]) / stats.values[0]) * 100):.2f}%"
         )
-        self.travel_time.set_text(
-            f"{sum([b.total_travel_time for b in stats.best_solution.brigades]):.2f}"
-        )
-        self.total_utility.set_text(
-            f"{sum([b.utility for b in stats.best_solution.brigades]):.2f}"
-        )
+        evaluations = stats.best_solution.evaluations()
+        self.travel_time.set_text(f"{sum([e.travel_time for e in evaluations]):.2f}")
+        self.total_utility.set_text(f"{sum([e.utility for e in evaluations]):.2f}")
         self.statistics.show()
 
     def initial_state(self):
@@ -399,23 +334,12 @@ class App:
                 self.simulation.state.network
             )  # Simulations start with a dummy state that already has the network loaded
 
-            # HACK: same as above
-            generators = {
-                "default": InitialStateGenerator(),
-                "closest": ClosestGenerator(),
-                "random": RandomInitialStateGenerator(),
-            }
-
-            generator: InitialStateGenerator = generators[
-                Config.get("INITIAL_STATE_GENERATOR", "default")
-            ]
+            generator = initial_state_generator_from_config()
 
             print(f"Using {generator.__class__.__name__} for initial state generation")
 
             self.simulation.state = State.initial_state(
-                network.depot,
-                network.graph,
-                network.establishments,
+                network,
                 self.simulation.get_num_carriers(),
                 generator,
             )
@@ -0,0 +1,225 @@
+"""
+Runs the simulation without the graphical application,
+writing the final routes and the simulation's statistics as JSON.
+
+Options default to the values in the `.env` file
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+from typing import Optional
+
+from config import Config
+from simulation import Simulation, State
+from simulation.heuristics.meta.genetic_algorithm import CROSSOVERS
+from simulation.registry import (
+    INITIAL_STATE_GENERATORS,
+    METAHEURISTICS,
+    NEIGHBORHOOD_GENERATORS,
+    initial_state_generator_from_config,
+    simulation_config_from_config,
+)
+
+# command line options that override a configuration key
+CONFIG_OPTIONS = {
+    "num_models": "NUM_MODELS_TO_PARSE",
+    "initial_state_generator": "INITIAL_STATE_GENERATOR",
+    "neighborhood_generator": "NEIGHBORHOOD_GENERATOR",
+    "metaheuristic": "METAHEURISTIC",
+    "route_cache_size": "ROUTE_CACHE_SIZE",
+    "time_limit": "BUDGET_TIME_LIMIT",
+    "max_evaluations": "BUDGET_MAX_EVALUATIONS",
+    "max_iterations_without_improvement": "BUDGET_MAX_ITERATIONS_WITHOUT_IMPROVEMENT",
+    "target_value": "BUDGET_TARGET_VALUE",
+    "sa_initial_temperature": "SA_INITIAL_TEMPERATURE",
+    "sa_cooldown_rate": "SA_COOLDOWN_RATE",
+    "sa_min_temperature": "SA_MIN_TEMPERATURE",
+    "sa_max_iterations_without_improvement": "SA_MAX_ITERATIONS_WITHOUT_IMPROVEMENT",
+    "sa_num_chains": "SA_NUM_CHAINS",
+    "sa_chains_initial_state_generator": "SA_CHAINS_INITIAL_STATE_GENERATOR",
+    "pt_num_replicas": "PT_NUM_REPLICAS",
+    "pt_min_temperature": "PT_MIN_TEMPERATURE",
+    "pt_max_temperature": "PT_MAX_TEMPERATURE",
+    "pt_steps_per_exchange": "PT_STEPS_PER_EXCHANGE",
+    "pt_num_exchanges": "PT_NUM_EXCHANGES",
+    "tabu_neighborhood_size": "TABU_NEIGHBORHOOD_SIZE",
+    "tabu_tenure": "TABU_TENURE",
+    "tabu_max_iterations": "TABU_MAX_ITERATIONS",
+    "tabu_max_iterations_without_improvement": (
+        "TABU_MAX_ITERATIONS_WITHOUT_IMPROVEMENT"
+    ),
+    "vnd_neighborhoods": "VND_NEIGHBORHOODS",
+    "vnd_first_improvement": "VND_FIRST_IMPROVEMENT",
+    "ils_perturbation_strength": "ILS_PERTURBATION_STRENGTH",
+    "ils_max_iterations": "ILS_MAX_ITERATIONS",
+    "ils_max_iterations_without_improvement": (
+        "ILS_MAX_ITERATIONS_WITHOUT_IMPROVEMENT"
+    ),
+    "ga_population_size": "GA_POPULATION_SIZE",
+    "ga_crossover_rate": "GA_CROSSOVER_RATE",
+    "ga_mutation_rate": "GA_MUTATION_RATE",
+    "ga_crossover": "GA_CROSSOVER",
+    "ga_num_generations": "GA_NUM_GENERATIONS",
+    "ga_max_generations_without_improvement": "GA_MAX_GENERATIONS_WITHOUT_IMPROVEMENT",
+    "ga_num_islands": "GA_NUM_ISLANDS",
+    "ga_migration_interval": "GA_MIGRATION_INTERVAL",
+    "ga_num_migrants": "GA_NUM_MIGRANTS",
+}
+
+
+def neighborhood_names(value: str) -> str:
+    """
+    Returns the given neighborhood generator names, separated by commas,
+    if they are all known
+    """
+
+    for name in value.split(","):
+        if name.strip() not in NEIGHBORHOOD_GENERATORS:
+            raise argparse.ArgumentTypeError(
+                f"invalid neighborhood generator: {name.strip()!r} "
+                f"(choose from {', '.join(NEIGHBORHOOD_GENERATORS)})"
+            )
+
+    return value
+
+
+def parse_args(args: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the headless runner
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+
+    parser.add_argument("--num-models", type=int, help="establishments to parse")
+    parser.add_argument(
+        "--initial-state-generator", choices=list(INITIAL_STATE_GENERATORS)
+    )
+    parser.add_argument(
+        "--neighborhood-generator", choices=list(NEIGHBORHOOD_GENERATORS)
+    )
+    parser.add_argument("--metaheuristic", choices=list(METAHEURISTICS))
+    parser.add_argument(
+        "--route-cache-size", type=int, help="route costs to remember, 0 disables it"
+    )
+    parser.add_argument(
+        "--time-limit", type=float, help="seconds the metaheuristic may run for"
+    )
+    parser.add_argument(
+        "--max-evaluations", type=int, help="moves the metaheuristic may evaluate"
+    )
+    parser.add_argument(
+        "--max-iterations-without-improvement",
+        type=int,
+        help="iterations without a better state before the metaheuristic stops",
+    )
+    parser.add_argument(
+        "--target-value",
+        type=float,
+        help="waiting time at which the metaheuristic stops",
+    )
+    parser.add_argument("--sa-initial-temperature", type=float)
+    parser.add_argument("--sa-cooldown-rate", type=float)
+    parser.add_argument("--sa-min-temperature", type=float)
+    parser.add_argument("--sa-max-iterations-without-improvement", type=int)
+    parser.add_argument("--sa-num-chains", type=int)
+    parser.add_argument(
+        "--sa-chains-initial-state-generator", choices=list(INITIAL_STATE_GENERATORS)
+    )
+    parser.add_argument("--pt-num-replicas", type=int)
+    parser.add_argument("--pt-min-temperature", type=float)
+    parser.add_argument("--pt-max-temperature", type=float)
+    parser.add_argument("--pt-steps-per-exchange", type=int)
+    parser.add_argument("--pt-num-exchanges", type=int)
+    parser.add_argument("--tabu-neighborhood-size", type=int)
+    parser.add_argument("--tabu-tenure", type=int)
+    parser.add_argument("--tabu-max-iterations", type=int)
+    parser.add_argument("--tabu-max-iterations-without-improvement", type=int)
+    parser.add_argument(
+        "--vnd-neighborhoods",
+        type=neighborhood_names,
+        help="neighborhood generators to descend through, separated by commas",
+    )
+    parser.add_argument("--vnd-first-improvement", choices=["true", "false"])
+    parser.add_argument("--ils-perturbation-strength", type=int)
+    parser.add_argument("--ils-max-iterations", type=int)
+    parser.add_argument("--ils-max-iterations-without-improvement", type=int)
+    parser.add_argument("--ga-population-size", type=int)
+    parser.add_argument("--ga-crossover-rate", type=float)
+    parser.add_argument("--ga-mutation-rate", type=float)
+    parser.add_argument("--ga-crossover", choices=list(CROSSOVERS))
+    parser.add_argument("--ga-num-generations", type=int)
+    parser.add_argument("--ga-max-generations-without-improvement", type=int)
+    parser.add_argument("--ga-num-islands", type=int)
+    parser.add_argument("--ga-migration-interval", type=int)
+    parser.add_argument("--ga-num-migrants", type=int)
+
+    parser.add_argument("--seed", type=int, help="seed for the random generator")
+    parser.add_argument(
+        "--output", default="-", help="file to write the results to, - for stdout"
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="discard the progress messages of the metaheuristics",
+    )
+
+    return parser.parse_args(args)
+
+
+def run() -> Simulation:
+    """
+    Sets up and runs the simulation picked in the configuration until it finishes
+    """
+
+    simulation = Simulation.setup(simulation_config_from_config())
+
+    generator = initial_state_generator_from_config()
+    simulation.state = State.initial_state(
+        simulation.network, simulation.get_num_carriers(), generator
+    )
+
+    simulation.stats.metaheuristic_name = Config.get("METAHEURISTIC", "default")
+    simulation.stats.initial_state_generator_name = Config.get(
+        "INITIAL_STATE_GENERATOR", "default"
+    )
+
+    for _ in simulation.run():
+        pass
+
+    return simulation
+
+
+def main(args: Optional[list[str]] = None):
+    """
+    Runs the headless simulation with the given command line arguments
+    """
+
+    options = parse_args(args)
+
+    for option, key in CONFIG_OPTIONS.items():
+        if (value := getattr(options, option)) is not None:
+            Config.set(key, str(value))
+
+    if options.seed is not None:
+        random.seed(options.seed)
+
+    # the metaheuristics report their progress on stdout, which may hold the results
+    with open(os.devnull, mode="w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull if options.quiet else sys.stderr):
+            simulation = run()
+
+    results = json.dumps(simulation.stats.as_dict(), indent=2)
+
+    if options.output == "-":
+        print(results)
+    else:
+        with open(options.output, mode="w", encoding="utf-8") as output:
+            output.write(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,31 @@
 Classes and methods related to brigades
 """
 
-from typing import ClassVar
+from dataclasses import dataclass
+from typing import ClassVar, Iterable, Sequence
+
+import numpy as np
 
 from debug import Printable
 
+from .establishment import HOURS_PER_DAY, Establishment
 from .network import Network
 from .route import Route
 
 
+@dataclass(frozen=True)
+class RouteEvaluation(Printable):
+    """
+    The costs of walking a route, which depend only on the route and the network
+    """
+
+    waiting_time: float
+    travel_time: float
+    utility: float
+    # time at which each establishment after the depot is reached
+    arrival_times: tuple[float, ...]
+
+
 class Brigade(Printable):
     """
     An inspection brigade that is responsible for visiting establishments on a route
@@ -19,56 +36,131 @@ class Brigade(Printable):
 
     def __init__(self, route: Route):
         self.route = route
-        self.utility: float = 0.0
-        self.total_travel_time: float = 0
+
+        # costs of the route, computed for the version stored alongside them
+        self.evaluation: RouteEvaluation | None = None
+        self.evaluated_version: int | None = None
+
+    @property
+    def utility(self) -> float:
+        """
+        Returns the total utility of the inspections in this brigade's route,
+        as of its last evaluation
+        """
+
+        return self.evaluation.utility if self.evaluation is not None else 0.0
+
+    @property
+    def total_travel_time(self) -> float:
+        """
+        Returns the time this brigade takes to go through its route,
+        as of its last evaluation
+        """
+
+        return self.evaluation.travel_time if self.evaluation is not None else 0.0
+
+    def is_dirty(self) -> bool:
+        """
+        Returns whether this brigade's route changed since its costs were last computed
+        """
+
+        return self.evaluated_version != self.route.version
 
     def total_waiting_time(self, network: Network) -> float:
         """
         Returns the total waiting time in seconds for this brigade
-        across its route's establishments
+        across its route's establishments.
+
+        The costs of the route are cached, so they are only recomputed
+        when the route changed since the last call
+        """
+
+        return self.evaluate(network).waiting_time
+
+    def evaluate(self, network: Network) -> RouteEvaluation:
+        """
+        Returns the costs of this brigade's route,
+        only walking it if it changed since the last evaluation
         """
 
-        graph = network.graph
-        depot = network.depot
+        if self.evaluation is None or self.is_dirty():
+            self.evaluation = evaluate_route(self.route, network)
+            self.evaluated_version = self.route.version
+
+        return self.evaluation
+
+
+def evaluate_route(
+    route: Route | Iterable[Establishment], network: Network
+) -> RouteEvaluation:
+    """
+    Walks the given route, starting at the depot, and returns its costs.
+
+    This function has no side effects,
+    so its result can be safely cached or computed elsewhere
+    """
+
+    # no need to iterate through the depot
+    return evaluate_path(
+        [establishment.establishment_id for establishment in list(route)[1:]],
+        network,
+    )
+
+
+def evaluate_path(
+    establishment_ids: Sequence[int] | np.ndarray, network: Network
+) -> RouteEvaluation:
+    """
+    Returns the costs of visiting the establishments with the given ids in order,
+    after leaving the depot.
+
+    This function has no side effects,
+    so its result can be safely cached or computed elsewhere
+    """
+
+    ids: list[int] = (
+        establishment_ids.tolist()
+        if isinstance(establishment_ids, np.ndarray)
+        else list(establishment_ids)
+    )
 
-        total_waiting_time: float = 0
+    hours_until_open = network.hours_until_open_rows
+    inspection_times = network.inspection_times
+    inspection_utilities = network.inspection_utilities
 
-        previous_establishment = depot
-        cur_time: float = Brigade.INSPECTION_START_TIME_SECONDS
+    total_waiting_time: float = 0
+    utility: float = 0
+    arrival_times: list[float] = []
 
-        # no need to iterate through the depot
-        for establishment in self.route[1:]:
-            time_to_arrive = graph.get(
-                previous_establishment.establishment_id, establishment.establishment_id
-            )
-            cur_time += time_to_arrive  # simulate the brigade's trip
+    cur_time: float = Brigade.INSPECTION_START_TIME_SECONDS
 
-            opening_hours = establishment.opening_hours
-            cur_hour = int(cur_time // 3600)
+    # fetch every leg of the route at once instead of one matrix lookup per leg
+    legs: list[float] = network.graph.legs(
+        [network.depot.establishment_id, *ids]
+    ).tolist()
 
-            # use only opening hours in the future
-            # relative to us or that are the current one
-            valid_opening_hours = (
-                opening_hours[cur_hour % 24 :] + opening_hours[: cur_hour % 24]
-            )
+    for establishment_id, time_to_arrive in zip(ids, legs):
+        cur_time += time_to_arrive  # simulate the brigade's trip
+        arrival_times.append(cur_time)
 
-            next_open_hour = valid_opening_hours.index(1) + cur_hour
+        cur_hour = int(cur_time // 3600)
 
-            waiting_time = (
-                0
-                if next_open_hour
-                # should not fall in the "less than" range but just to be sure
-                <= cur_hour
-                else (next_open_hour * 60 * 60) - cur_time
-            )
+        # hours until the establishment opens, 0 if it is already open
+        hours_to_wait = hours_until_open[establishment_id][cur_hour % HOURS_PER_DAY]
 
-            cur_time += waiting_time
-            total_waiting_time += waiting_time
+        waiting_time = (
+            0 if hours_to_wait == 0 else (cur_hour + hours_to_wait) * 3600 - cur_time
+        )
 
-            cur_time += establishment.inspection_data.inspection_time * 60
-            self.utility += establishment.inspection_data.inspection_utility
-            previous_establishment = establishment
+        cur_time += waiting_time
+        total_waiting_time += waiting_time
 
-        self.total_travel_time = cur_time - Brigade.INSPECTION_START_TIME_SECONDS
+        cur_time += inspection_times[establishment_id]
+        utility += inspection_utilities[establishment_id]
 
-        return total_waiting_time
+    return RouteEvaluation(
+        total_waiting_time,
+        cur_time - Brigade.INSPECTION_START_TIME_SECONDS,
+        utility,
+        tuple(arrival_times),
+    )
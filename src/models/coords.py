@@ -61,3 +61,20 @@ class Coords(Printable, Parsable):
         coef: float = 2 * np.arcsin(np.sqrt(arc))
 
         return coef * Coords.EARTH_RADIUS_KM
+
+    def round_dists_to(
+        self, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns the distance to each of the coordinates given by the arrays
+        of latitudes and longitudes, as computed by **round_dist_to**
+        """
+
+        lat_diff = np.radians(latitudes - self.latitude)
+        long_diff = np.radians(longitudes - self.longitude)
+
+        arc = np.sin(lat_diff / 2) ** 2 + np.sin(long_diff / 2) ** 2 * np.cos(
+            np.radians(self.latitude)
+        ) * np.cos(np.radians(latitudes))
+
+        return 2 * np.arcsin(np.sqrt(arc)) * Coords.EARTH_RADIUS_KM
@@ -9,6 +9,8 @@ from debug import Printable
 from .coords import Coords
 from .parse import Parsable, get_named_field
 
+HOURS_PER_DAY = 24
+
 
 @dataclass
 class EstablishmentAddress(Printable, Parsable):
@@ -69,6 +71,25 @@ class Establishment(Printable, Parsable):
         )
         self.visited = False
 
+        # bit h is set when the establishment is open during hour h of the day
+        self.opening_mask = sum(
+            1 << hour for hour, is_open in enumerate(self.opening_hours) if is_open
+        )
+
+        # hours to wait from the start of each hour of the day until it opens,
+        # -1 if it never does
+        self.hours_until_open: tuple[int, ...] = tuple(
+            next(
+                (
+                    offset
+                    for offset in range(HOURS_PER_DAY)
+                    if self.opening_mask >> ((hour + offset) % HOURS_PER_DAY) & 1
+                ),
+                -1,
+            )
+            for hour in range(HOURS_PER_DAY)
+        )
+
     def is_open(self, hour: int) -> bool:
         """
         Checks if an establishment is open at the given hour
@@ -76,7 +97,15 @@ class Establishment(Printable, Parsable):
 
         assert 1 <= hour <= 24, "Invalid hour value"
 
-        return self.opening_hours[hour - 1] == 1
+        return self.opening_mask >> (hour - 1) & 1 == 1
+
+    def never_opens(self) -> bool:
+        """
+        Returns whether this establishment is closed at every hour of the day,
+        meaning it can never be inspected
+        """
+
+        return self.opening_mask == 0
 
     def is_visited(self) -> bool:
         """
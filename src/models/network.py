@@ -2,14 +2,44 @@
 Classes and functions related to the establishment network
 """
 
+from typing import TYPE_CHECKING
+
+import numpy as np
+
 from simulation.graph import Graph
+from simulation.route_cache import RouteCache
+
+from .establishment import HOURS_PER_DAY, Establishment
 
-from .establishment import Establishment
+if TYPE_CHECKING:
+    from simulation.segment import SegmentSummary
 
 
-class Network:  # pylint: disable=too-few-public-methods
+def compile_opening_hours(establishments: list[Establishment]) -> np.ndarray:
     """
-    The establishment network
+    Returns a table, indexed by establishment id and hour of the day,
+    with the number of hours to wait until each establishment opens.
+
+    Raises a ValueError if any of the establishments never opens
+    """
+
+    if closed := [e.establishment_id for e in establishments if e.never_opens()]:
+        raise ValueError(f"Establishments {closed} never open and cannot be inspected")
+
+    size = max((e.establishment_id for e in establishments), default=-1) + 1
+    table = np.zeros((size, HOURS_PER_DAY), dtype=np.int8)
+
+    for establishment in establishments:
+        table[establishment.establishment_id] = establishment.hours_until_open
+
+    return table
+
+
+class Network:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    The establishment network.
+
+    It never changes during a simulation, so every state shares the same instance
     """
 
     def __init__(
@@ -18,3 +48,38 @@ class Network:  # pylint: disable=too-few-public-methods
         self.depot = depot
         self.graph = graph
         self.establishments = establishments
+
+        self.establishments_by_id: dict[int, Establishment] = {
+            e.establishment_id: e for e in [depot, *establishments]
+        }
+
+        self.hours_until_open = compile_opening_hours([depot, *establishments])
+
+        # plain lists, indexed by establishment id, are faster than arrays
+        # when reading one element at a time
+        self.hours_until_open_rows: list[list[int]] = self.hours_until_open.tolist()
+        self.inspection_times: list[float] = [0.0] * len(self.hours_until_open_rows)
+        self.inspection_utilities: list[float] = [0.0] * len(self.inspection_times)
+
+        for establishment_id, establishment in self.establishments_by_id.items():
+            inspection_data = establishment.inspection_data
+            self.inspection_times[establishment_id] = (
+                inspection_data.inspection_time * 60
+            )
+            self.inspection_utilities[establishment_id] = (
+                inspection_data.inspection_utility
+            )
+
+        # array version, for vectorized evaluations
+        self.inspection_times_array = np.array(self.inspection_times)
+
+        # costs of the routes evaluated on this network, shared by every state
+        self.route_cache = RouteCache(depot.establishment_id, len(graph.mat))
+
+        # summary of the segment that only inspects each establishment,
+        # only built when needed
+        self.stop_summaries: dict[int, "SegmentSummary"] = {}
+
+    def __deepcopy__(self, memo) -> "Network":
+        # the network is never mutated, copying it would only waste memory
+        return self
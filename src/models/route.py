@@ -17,6 +17,9 @@ class Route(Printable, Iterable[Establishment]):
     def __init__(self, route_establishments: list[Establishment]):
         self.route_establishments = route_establishments
 
+        # bumped on every change so that cached route costs can be invalidated
+        self.version = 0
+
     def __iter__(self) -> Iterator[Establishment]:
         return iter(self.route_establishments)
 
@@ -25,6 +28,7 @@ class Route(Printable, Iterable[Establishment]):
 
     def __setitem__(self, __i: SupportsIndex, __o: Establishment) -> None:
         self.route_establishments[__i] = __o
+        self.version += 1
 
     @overload
     def __getitem__(self, __i: SupportsIndex) -> Establishment:
@@ -0,0 +1,184 @@
+"""
+Vectorized evaluation of many routes at once
+"""
+
+import numpy as np
+
+from models.brigade import Brigade, evaluate_path
+from models.establishment import HOURS_PER_DAY
+from models.network import Network
+
+# below this many routes, evaluating them one at a time is faster than vectorizing
+MIN_ROUTES_TO_VECTORIZE = 16
+
+
+def pad_routes(
+    routes: list[np.ndarray] | list[list[int]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacks the given routes into a (routes x stops) matrix of establishment ids,
+    padded with the depot, and returns it along with the length of each route
+    """
+
+    lengths = np.fromiter((len(route) for route in routes), dtype=np.intp)
+    padded = np.zeros((len(routes), lengths.max(initial=0)), dtype=np.intp)
+
+    for row, (route, length) in enumerate(zip(routes, lengths)):
+        padded[row, :length] = route
+
+    return padded, lengths
+
+
+def evaluate_routes(
+    routes: np.ndarray, lengths: np.ndarray, network: Network
+) -> np.ndarray:
+    """
+    Returns the total waiting time of each of the given routes,
+    as computed by **evaluate_path**, walking every route at the same time.
+
+    Each row of *routes* holds the establishment ids visited by a route
+    after leaving the depot, and only the first *lengths[row]* ids of a row are used
+    """
+
+    graph = network.graph.mat
+    hours_until_open = network.hours_until_open
+    inspection_times = network.inspection_times_array
+
+    num_routes = routes.shape[0]
+
+    cur_time = np.full(num_routes, float(Brigade.INSPECTION_START_TIME_SECONDS))
+    total_waiting_time = np.zeros(num_routes)
+    previous = np.full(num_routes, network.depot.establishment_id, dtype=np.intp)
+
+    for position in range(routes.shape[1]):
+        # routes that already ended keep their values
+        active = position < lengths
+        current = np.where(active, routes[:, position], previous)
+
+        arrival = cur_time + graph[previous, current]  # simulate the brigades' trips
+
+        cur_hour = (arrival // 3600).astype(np.intp)
+        hours_to_wait = hours_until_open[current, cur_hour % HOURS_PER_DAY]
+
+        waiting_time = np.where(
+            hours_to_wait == 0, 0.0, (cur_hour + hours_to_wait) * 3600 - arrival
+        )
+
+        departure = arrival + waiting_time
+        departure += inspection_times[current]
+
+        cur_time = np.where(active, departure, cur_time)
+        total_waiting_time += np.where(active, waiting_time, 0.0)
+        previous = current
+
+    return total_waiting_time
+
+
+def evaluate_tours(
+    tours: np.ndarray, offsets: np.ndarray, network: Network
+) -> np.ndarray:
+    """
+    Returns the total waiting time of each of the given giant tours,
+    as encoded by **State.encode**, walking the routes of every tour at the same time.
+
+    Each row of *tours* is a giant tour, and every tour is split into routes
+    by the same *offsets*
+    """
+
+    num_tours, tour_length = tours.shape
+
+    if tour_length == 0:
+        return np.zeros(num_tours)
+
+    lengths = np.diff(offsets).astype(np.intp)
+    num_routes = len(lengths)
+
+    # position in the giant tour of each stop of each route, padded past its end
+    positions = offsets[:-1, np.newaxis] + np.arange(lengths.max(initial=0))
+    positions = np.minimum(positions, tour_length - 1)
+
+    routes = tours[:, positions].reshape(num_tours * num_routes, -1)
+    waiting_times = cached_evaluate_routes(routes, np.tile(lengths, num_tours), network)
+
+    return waiting_times.reshape(num_tours, num_routes).sum(axis=1)
+
+
+def cached_evaluate_routes(
+    routes: np.ndarray,
+    lengths: np.ndarray,
+    network: Network,
+    hashes: list[int | None] | None = None,
+) -> np.ndarray:
+    """
+    Returns the total waiting time of each of the given routes,
+    like **evaluate_routes**, but only evaluates the routes
+    that are not in the network's route cache.
+
+    The hashes of the routes that are already known can be given,
+    so that only the others are hashed
+    """
+
+    cache = network.route_cache
+
+    if not cache.enabled:
+        return evaluate_routes(routes, lengths, network)
+
+    keys = list(hashes) if hashes is not None else [None] * len(routes)
+
+    if unknown := [row for row, key in enumerate(keys) if key is None]:
+        for row, key in zip(
+            unknown, cache.route_hashes(routes[unknown], lengths[unknown]).tolist()
+        ):
+            keys[row] = key
+
+    waiting_times = np.array(
+        [np.nan if (w := cache.get(key)) is None else w for key in keys]
+    )
+
+    if len(missing := np.flatnonzero(np.isnan(waiting_times))) > 0:
+        waiting_times[missing] = evaluate_routes(
+            routes[missing], lengths[missing], network
+        )
+
+        for row, waiting_time in zip(missing.tolist(), waiting_times[missing].tolist()):
+            cache.put(keys[row], waiting_time)
+
+    return waiting_times
+
+
+def route_waiting_times(
+    routes: list[np.ndarray] | list[list[int]],
+    network: Network,
+    hashes: list[int | None] | None = None,
+) -> list[float]:
+    """
+    Returns the waiting time of each of the given routes,
+    reusing the costs in the network's route cache.
+    The hashes of the routes that are already known can be given,
+    so that only the others are hashed.
+
+    A few routes are evaluated one at a time,
+    while many routes are evaluated in a single vectorized pass
+    """
+
+    if len(routes) >= MIN_ROUTES_TO_VECTORIZE:
+        return cached_evaluate_routes(*pad_routes(routes), network, hashes).tolist()
+
+    cache = network.route_cache
+
+    if not cache.enabled:
+        return [evaluate_path(route, network).waiting_time for route in routes]
+
+    waiting_times: list[float] = []
+
+    for route, key in zip(routes, hashes or [None] * len(routes)):
+        if key is None:
+            key = cache.route_hash(route)
+
+        if (waiting_time := cache.get(key)) is None:
+            waiting_time = evaluate_path(route, network).waiting_time
+            cache.put(key, waiting_time)
+
+        waiting_times.append(waiting_time)
+
+    return waiting_times
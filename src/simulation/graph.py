@@ -2,46 +2,181 @@
 Functions and classes related to graphs
 """
 
+import hashlib
+import os
+import tempfile
+from typing import Sequence
+
 import numpy as np
 
 from files import parse_file
 from debug import Printable
 
+# layout of the compiled graph cache: magic, CSV checksum, rows, cols, float64 data
+CACHE_MAGIC = b"GRAPHv1\0"
+CACHE_CHECKSUM_SIZE = hashlib.sha256().digest_size
+CACHE_HEADER_SIZE = len(CACHE_MAGIC) + CACHE_CHECKSUM_SIZE + 2 * 8
+CACHE_SUFFIX = ".cache"
+
 
 class Graph(Printable):
     """
-    A graph that stores its data as an adjacency matrix
+    A graph that stores its data as a dense adjacency matrix,
+    backed by a contiguous 2-D array
     """
 
-    def __init__(self, mat: list[list[float]]):
-        self.mat = np.matrix(mat)  # type: ignore
+    def __init__(self, mat: list[list[float]] | np.ndarray):
+        # does not copy contiguous float arrays, so memory-mapped data stays shared
+        self.mat: np.ndarray = np.ascontiguousarray(mat, dtype=np.float64)
 
-    def get_row(self, establishment_id: int) -> list[float]:
+    def __deepcopy__(self, memo) -> "Graph":
+        # the graph is never mutated, copying it would only waste memory
+        return self
+
+    def get_row(self, establishment_id: int) -> np.ndarray:
         """
-        Returns a row of the graph's matrix
+        Returns a view of a row of the graph's matrix
         """
 
         return self.mat[establishment_id]
 
-    def get_col(self, establishment_id: int) -> list[float]:
+    def get_col(self, establishment_id: int) -> np.ndarray:
         """
-        Returns a column of the graph's matrix
+        Returns a view of a column of the graph's matrix
         """
 
-        return self.mat[:, establishment_id]  # type: ignore
+        return self.mat[:, establishment_id]
 
     def get(self, first_establishment_id: int, second_establishment_id: int) -> float:
         """
         Returns the element at the given column and row
         """
 
-        return self.mat[first_establishment_id, second_establishment_id]
+        # item() returns a python float, skipping the creation of a numpy scalar
+        return self.mat.item(first_establishment_id, second_establishment_id)
+
+    def legs(self, establishment_ids: Sequence[int] | np.ndarray) -> np.ndarray:
+        """
+        Returns the cost of every leg of the path
+        that visits the given establishments in order
+        """
+
+        path = np.asarray(establishment_ids, dtype=np.intp)
+
+        return self.mat[path[:-1], path[1:]]
+
+    def nearest_neighbors(self, k: int, candidates: np.ndarray) -> np.ndarray:
+        """
+        Returns, for every row of the graph, the ids of the *k* candidates
+        closest to it, nearest first, as a (rows x k) int32 array.
+
+        A row is never among its own neighbors
+        """
+
+        candidates = np.asarray(candidates, dtype=np.intp)
+        k = min(k, len(candidates) - 1)
 
+        if k <= 0:
+            return np.empty((len(self.mat), 0), dtype=np.int32)
 
-def parse_graph(file: str) -> Graph:
+        distances = self.mat[:, candidates]  # a copy, which can be modified
+        distances[candidates, np.arange(len(candidates))] = np.inf
+
+        nearest = np.argpartition(distances, k, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+
+        return candidates[np.take_along_axis(nearest, order, axis=1)].astype(np.int32)
+
+
+def file_checksum(file: str) -> bytes:
+    """
+    Returns the SHA-256 digest of the given file's contents
+    """
+
+    digest = hashlib.sha256()
+
+    with open(file, mode="rb") as source:
+        for chunk in iter(lambda: source.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+def load_graph_cache(cache_file: str, checksum: bytes) -> np.ndarray | None:
     """
-    Parses an input file and returns a dense graph representing its data
+    Memory-maps the matrix stored in the given cache file.
+
+    Returns None if the cache does not exist or was compiled from a different CSV.
     """
+
+    try:
+        with open(cache_file, mode="rb") as cache:
+            header = cache.read(CACHE_HEADER_SIZE)
+    except OSError:
+        return None
+
+    if len(header) != CACHE_HEADER_SIZE or not header.startswith(CACHE_MAGIC):
+        return None
+
+    checksum_end = len(CACHE_MAGIC) + CACHE_CHECKSUM_SIZE
+    if header[len(CACHE_MAGIC) : checksum_end] != checksum:
+        return None
+
+    rows, cols = np.frombuffer(header[checksum_end:], dtype="<u8")
+    expected_size = CACHE_HEADER_SIZE + int(rows) * int(cols) * 8
+    if os.path.getsize(cache_file) != expected_size:
+        return None
+
+    return np.memmap(
+        cache_file,
+        dtype="<f8",
+        mode="r",
+        offset=CACHE_HEADER_SIZE,
+        shape=(int(rows), int(cols)),
+    )
+
+
+def write_graph_cache(cache_file: str, checksum: bytes, mat: np.ndarray):
+    """
+    Writes the given matrix to a cache file that can later be memory-mapped.
+
+    The file is written to a temporary location and then moved into place,
+    so concurrent readers never see a partially written cache.
+    """
+
+    rows, cols = mat.shape
+    header = CACHE_MAGIC + checksum + np.array([rows, cols], dtype="<u8").tobytes()
+
+    directory = os.path.dirname(os.path.abspath(cache_file))
+    descriptor, temp_file = tempfile.mkstemp(dir=directory, suffix=CACHE_SUFFIX)
+
+    try:
+        with os.fdopen(descriptor, mode="wb") as cache:
+            cache.write(header)
+            cache.write(np.ascontiguousarray(mat, dtype="<f8").tobytes())
+        os.chmod(temp_file, 0o644)  # mkstemp creates owner-only files
+        os.replace(temp_file, cache_file)
+    except OSError:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+
+
+def parse_graph(file: str, use_cache: bool = True) -> Graph:
+    """
+    Parses an input file and returns a dense graph representing its data.
+
+    The parsed matrix is compiled into a binary sidecar file,
+    so later calls memory-map it instead of parsing the CSV again.
+    The cache is invalidated whenever the CSV's checksum changes.
+    """
+
+    cache_file = file + CACHE_SUFFIX
+    checksum = file_checksum(file) if use_cache else b""
+
+    if use_cache and (cached := load_graph_cache(cache_file, checksum)) is not None:
+        return Graph(cached)
+
     mat: list[list[float]] = []
 
     for line in parse_file(file):
@@ -49,4 +184,16 @@ def parse_graph(file: str) -> Graph:
 
         mat.append(list(map(float, line)))
 
-    return Graph(mat)
+    parsed = np.array(mat, dtype=np.float64)
+
+    if use_cache:
+        try:
+            write_graph_cache(cache_file, checksum, parsed)
+        except OSError:
+            # a read-only dataset directory only costs us the cache
+            return Graph(parsed)
+
+        if (cached := load_graph_cache(cache_file, checksum)) is not None:
+            return Graph(cached)
+
+    return Graph(parsed)
@@ -2,30 +2,25 @@
 "Next closest" heuristic selection for the initial state
 """
 
-from models.establishment import Establishment
+import numpy as np
+
 from simulation.graph import Graph
 
 from .generator import Generator
 
 
-class ClosestGenerator(Generator):
+class ClosestGenerator(Generator):  # pylint: disable=too-few-public-methods
     """
     Generator that returns the closest establishment from the previous one
     """
 
     def next(
         self,
-        establishments: dict[int, Establishment],
-        previous: Establishment,
+        unvisited: np.ndarray,
+        previous: int,
         graph: Graph,
-    ) -> Establishment:
-        closest, _ = min(
-            (
-                (i, d)
-                for i, d in enumerate(graph.get_col(previous.establishment_id))
-                if i in establishments
-            ),
-            key=lambda x: x[1],
-        )
+    ) -> int:
+        distances = np.where(unvisited, graph.get_col(previous), np.inf)
 
-        return establishments[closest]
+        # argmin breaks ties in favor of the lowest id
+        return int(np.argmin(distances))
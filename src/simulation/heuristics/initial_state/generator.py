@@ -2,29 +2,31 @@
 Initial State Generator
 """
 
-from models.establishment import Establishment
+import numpy as np
+
 from simulation.graph import Graph
 
 
 class Generator:  # pylint: disable=too-few-public-methods
     """
-    Generator class that has a method **generate**
-    that takes a list of establishments and the desired number of carriers
-    and generates a sample from the same list to be used
-    in the initial state of the simulation
+    Generator class that has a method **next**
+    that picks, one at a time, the establishments
+    to be used in the initial state of the simulation
     """
 
     def next(
         self,
-        establishments: dict[int, Establishment],
-        previous: Establishment,  # pylint: disable=unused-argument
+        unvisited: np.ndarray,
+        previous: int,  # pylint: disable=unused-argument
         graph: Graph,  # pylint: disable=unused-argument
-    ) -> Establishment:
+    ) -> int:
         """
-        Returns an establishment to be used in the applications initial state.
+        Returns the id of an establishment to be used in the applications initial state,
+        given a mask, indexed by establishment id, of the establishments
+        that were not picked yet and the id of the previously picked one.
 
-        The default implementation returns
-        the last establishment added to the argument dictionary
+        The default implementation returns the unvisited establishment
+        with the highest id
         """
 
-        return establishments.popitem()[1]
+        return len(unvisited) - 1 - int(np.argmax(unvisited[::-1]))
@@ -2,9 +2,10 @@
 Random selection for the initial state
 """
 
-from random import choice
+from random import randrange
+
+import numpy as np
 
-from models.establishment import Establishment
 from simulation.graph import Graph
 
 from .generator import Generator
@@ -17,8 +18,10 @@ class RandomGenerator(Generator):  # pylint: disable=too-few-public-methods
 
     def next(
         self,
-        establishments: dict[int, Establishment],
-        previous: Establishment,  # pylint: disable=unused-argument
+        unvisited: np.ndarray,
+        previous: int,  # pylint: disable=unused-argument
         graph: Graph,  # pylint: disable=unused-argument
-    ) -> Establishment:
-        return choice(list(establishments.values()))
+    ) -> int:
+        candidates = np.flatnonzero(unvisited)
+
+        return int(candidates[randrange(len(candidates))])
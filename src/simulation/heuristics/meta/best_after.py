@@ -4,6 +4,8 @@ Classes and methods related to generating the best solution after a set number o
 
 from typing import Callable, Generator
 
+import numpy as np
+
 from models.network import Network
 from simulation import State
 from simulation.heuristics.meta.metaheuristic import Metaheuristic
@@ -22,28 +24,32 @@ class BestAfterN(Metaheuristic):
         network: Network,
         num_iters: int,
     ):
-        self.generator = generator
-        self.fitness_func = fitness_func
+        super().__init__(generator, fitness_func)
         self.establish_network = network
         self.num_iters = num_iters
 
     def optimize(self, initial_state: State) -> Generator[State, None, State]:
         best_state = initial_state.copy()
-        best_value = self.fitness_func(best_state)
+        yield best_state
 
         while True:
-            for _ in range(self.num_iters):
-                new_state = self.generator.apply(best_state)
+            moves = [self.generator.propose(best_state) for _ in range(self.num_iters)]
+
+            # score every candidate at once and only build the best one
+            deltas = self.fitness_deltas(best_state, moves)
+            best_move = int(np.argmax(deltas))
 
-                if (candidate := self.fitness_func(new_state)) > best_value:
-                    best_state = new_state
-                    best_value = candidate
+            for index, (move, delta) in enumerate(zip(moves, deltas)):
+                applied = index == best_move and delta > 0
+                self.report_outcome(move, float(delta), applied, new_best=applied)
 
-            if best_value == self.fitness_func(
-                initial_state
-            ):  # this will get stuck in a local optimum
+            # none of the sampled moves improves the state, so it is taken
+            # to be a local optimum
+            if deltas[best_move] <= 0:
                 break
 
+            best_state = moves[best_move].apply(best_state)
+
             yield best_state
 
         return best_state
@@ -0,0 +1,193 @@
+"""
+Classes and methods related to limiting how long a metaheuristic runs
+"""
+
+from dataclasses import dataclass, field
+from time import perf_counter, time
+from typing import Any, Optional
+
+# how often the clock is read, in seconds: the number of checks between reads
+# adapts to how long the iterations of the metaheuristic take
+CLOCK_PERIOD = 0.01
+
+
+@dataclass
+class Budget:  # pylint: disable=too-many-instance-attributes
+    """
+    The limits a run of a metaheuristic must stay within, along with
+    how much of them has been used so far. A limit that is not set never runs out.
+
+    Checking whether the budget ran out only compares counters,
+    and reads the clock once every few checks, so it can be done at every iteration
+
+    Attributes:
+        time_limit (float, optional): the number of seconds the run may take
+        max_evaluations (int, optional): the number of moves or individuals
+            whose fitness the run may evaluate
+        max_iterations_without_improvement (int, optional): the number of iterations
+            without improving the best fitness before the run stops
+        target_fitness (float, optional): the fitness that is good enough
+            to stop the run as soon as it is reached
+    """
+
+    time_limit: Optional[float] = None
+    max_evaluations: Optional[int] = None
+    max_iterations_without_improvement: Optional[int] = None
+    target_fitness: Optional[float] = None
+
+    start_time: float = field(default=0.0, init=False)
+    evaluations: int = field(default=0, init=False)
+    iterations: int = field(default=0, init=False)
+    best_iteration: int = field(default=0, init=False)
+    best_fitness: float = field(default=float("-inf"), init=False)
+
+    # the limit that ran out, if any
+    reason: Optional[str] = field(default=None, init=False)
+
+    # checks left until the clock is read, and how many checks there are between reads
+    countdown: int = field(default=0, init=False)
+    check_interval: int = field(default=1, init=False)
+    last_clock: float = field(default=0.0, init=False)
+
+    # when a share of another budget was handed out, as a wall-clock time,
+    # since the clock of perf_counter may differ between processes
+    issued: Optional[float] = field(default=None, init=False)
+
+    def start(self):
+        """
+        Starts a new run, with nothing used yet.
+
+        A share of another budget only starts when its part of the run does,
+        so the time that went by since it was handed out is taken from its time limit
+        """
+
+        if self.issued is not None and self.time_limit is not None:
+            self.time_limit = max(self.time_limit - (time() - self.issued), 0.0)
+        self.issued = None
+
+        self.start_time = self.last_clock = perf_counter()
+        self.evaluations = self.iterations = self.best_iteration = 0
+        self.best_fitness = float("-inf")
+        self.reason = None
+        self.countdown = self.check_interval = 1
+
+    def elapsed(self) -> float:
+        """
+        Returns the number of seconds since the run started
+        """
+
+        return perf_counter() - self.start_time
+
+    def evaluated(self, count: int = 1):
+        """
+        Records that the fitness of the given number of moves or individuals
+        was evaluated
+        """
+
+        self.evaluations += count
+
+    def update(self, fitness: float):
+        """
+        Records an iteration of the run, which reached a state with the given fitness
+        """
+
+        self.iterations += 1
+
+        if fitness > self.best_fitness:
+            self.best_fitness = fitness
+            self.best_iteration = self.iterations
+
+    def exhausted(self) -> bool:
+        """
+        Returns whether any of the limits ran out
+        """
+
+        if self.reason is not None:
+            return True
+
+        if (
+            self.max_evaluations is not None
+            and self.evaluations >= self.max_evaluations
+        ):
+            self.reason = "evaluations"
+        elif (
+            self.max_iterations_without_improvement is not None
+            and self.iterations - self.best_iteration
+            >= self.max_iterations_without_improvement
+        ):
+            self.reason = "stagnation"
+        elif (
+            self.target_fitness is not None and self.best_fitness >= self.target_fitness
+        ):
+            self.reason = "target"
+        elif self.time_limit is not None and self.clock() - self.start_time >= (
+            self.time_limit
+        ):
+            self.reason = "time"
+
+        return self.reason is not None
+
+    def clock(self) -> float:
+        """
+        Returns the time of the last clock read, reading the clock again
+        if enough checks went by since then.
+
+        The number of checks between reads doubles while reads are too close
+        to each other, and halves while they are too far apart
+        """
+
+        self.countdown -= 1
+
+        if self.countdown > 0:
+            return self.last_clock
+
+        now = perf_counter()
+
+        if now - self.last_clock < CLOCK_PERIOD / 2:
+            self.check_interval *= 2
+        elif now - self.last_clock > CLOCK_PERIOD:
+            self.check_interval = max(self.check_interval // 2, 1)
+
+        self.countdown = self.check_interval
+        self.last_clock = now
+
+        return now
+
+    def remaining(self, shares: int = 1) -> "Budget":
+        """
+        Returns the budget left for a part of the run that is carried out
+        in another process, split evenly among the given number of parts
+        running at the same time.
+
+        Only the time and evaluations carry over,
+        since the other limits depend on the whole run
+        """
+
+        share = Budget(
+            (
+                max(self.time_limit - self.elapsed(), 0.0)
+                if self.time_limit is not None
+                else None
+            ),
+            (
+                max(self.max_evaluations - self.evaluations, 0) // shares
+                if self.max_evaluations is not None
+                else None
+            ),
+        )
+        share.issued = time()
+
+        return share
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns how much of the budget the run used and which limit ran out, if any,
+        as a dict of JSON serializable values
+        """
+
+        return {
+            "evaluations": self.evaluations,
+            "iterations": self.iterations,
+            "best_iteration": self.best_iteration,
+            "exhausted": self.reason,
+        }
@@ -1,46 +1,201 @@
+"""
+Classes and methods related to genetic algorithms
+"""
+
 import random
-from typing import Callable, Generator
+from dataclasses import dataclass
+from typing import Any, Callable, Generator
 
-from .metaheuristic import Metaheuristic
+import numpy as np
 
 from simulation import State
+from simulation.evaluation import evaluate_tours
 from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
 
+from .metaheuristic import Metaheuristic, waiting_time_fitness
+
+
+@dataclass
+class Population:
+    """
+    The individuals of a genetic algorithm and their fitness.
+
+    Each individual is a giant tour, a permutation of the establishment ids
+    that every individual splits into routes at the same offsets,
+    as encoded by **State.encode**
+
+    Attributes:
+        tours (np.ndarray): an (individuals x establishments) matrix of giant tours
+        fitness (np.ndarray): the fitness of each individual,
+            computed once when the individual is created
+    """
+
+    tours: np.ndarray
+    fitness: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.tours)
+
+    def best(self) -> int:
+        """
+        Returns the index of the fittest individual
+        """
+        return int(np.argmax(self.fitness))
+
+
+def order_crossover(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Order crossover (OX): the child copies a random segment of the first parent
+    and visits the remaining establishments in the order of the second parent,
+    starting after the segment.
+
+    Args:
+        first (np.ndarray): the giant tour of the first parent
+        second (np.ndarray): the giant tour of the second parent
+
+    Returns:
+        np.ndarray: the giant tour of the child
+    """
+    start, end = sorted(random.sample(range(len(first) + 1), 2))
+
+    segment = first[start:end]
+    rest = np.roll(second, -end)
+    rest = rest[~np.isin(rest, segment)]
+
+    # the rest fills the tour from the end of the segment, wrapping around
+    child = np.empty_like(first)
+    child[start:end] = segment
+    child[end:] = rest[: len(first) - end]
+    child[:start] = rest[len(first) - end :]
+
+    return child
+
+
+def partially_mapped_crossover(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Partially mapped crossover (PMX): the child copies a random segment
+    of the first parent and the other positions of the second parent,
+    following the mapping between the segments to resolve repeated establishments.
+
+    Args:
+        first (np.ndarray): the giant tour of the first parent
+        second (np.ndarray): the giant tour of the second parent
+
+    Returns:
+        np.ndarray: the giant tour of the child
+    """
+    start, end = sorted(random.sample(range(len(first) + 1), 2))
+
+    child = second.copy()
+    child[start:end] = first[start:end]
+
+    # position of each establishment in the first parent's segment
+    mapping = {int(e): start + i for i, e in enumerate(first[start:end].tolist())}
+
+    for position in [*range(start), *range(end, len(first))]:
+        establishment = int(second[position])
+
+        while establishment in mapping:
+            establishment = int(second[mapping[establishment]])
+
+        child[position] = establishment
+
+    return child
+
+
+def swap_mutation(tour: np.ndarray) -> np.ndarray:
+    """
+    Swaps two random establishments of the giant tour
+    """
+    mutated = tour.copy()
+
+    if len(tour) > 1:
+        i, j = random.sample(range(len(tour)), 2)
+        mutated[i], mutated[j] = tour[j], tour[i]
+
+    return mutated
+
+
+def inversion_mutation(tour: np.ndarray) -> np.ndarray:
+    """
+    Reverses a random segment of the giant tour
+    """
+    start, end = sorted(random.sample(range(len(tour) + 1), 2))
+
+    mutated = tour.copy()
+    mutated[start:end] = tour[start:end][::-1]
+
+    return mutated
+
+
+CROSSOVERS: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "ox": order_crossover,
+    "pmx": partially_mapped_crossover,
+}
+
+MUTATIONS: list[Callable[[np.ndarray], np.ndarray]] = [
+    swap_mutation,
+    inversion_mutation,
+]
+
 
 class GeneticAlgorithm(Metaheuristic):
     """
     A class for implementing genetic algorithms.
 
+    Individuals are giant tours that keep the route lengths of the initial state,
+    so crossovers and mutations move establishments between brigades
+    by moving them across the route boundaries.
+
     Attributes:
         generator (NeighborGenerator): the generator for generating neighboring states
         fitness_func (Callable[[State], float]): the fitness function
-        population_size (int): the size of the population to use in the genetic algorithm
+        population_size (int): the number of individuals
+                in the population of the genetic algorithm
         crossover_rate (float): the probability that two parents will breed
-        mutation_rate (float): the probability that a single gene will mutate
+        mutation_rate (float): the probability that a child will mutate
+        crossover (str): the crossover to use, either "ox" or "pmx"
+        num_generations (int): the maximum number of generations
+        max_generations_without_improvement (int): the number of generations
+            without improvement before the algorithm terminates
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         generator: NeighborGenerator,
         fitness_func: Callable[[State], float],
         population_size: int,
         crossover_rate: float,
         mutation_rate: float,
+        crossover: str = "ox",
+        num_generations: int = 1000,
+        max_generations_without_improvement: int = 100,
     ):
         """
         Initializes the genetic algorithm.
 
         Args:
-            generator (NeighborGenerator): the generator for generating neighboring states
+            generator (NeighborGenerator): the generator for generating
+                neighboring states
             fitness_func (Callable[[State], float]): the fitness function
-            population_size (int): the size of the population to use in the genetic algorithm
+            population_size (int): the number of individuals
+                in the population of the genetic algorithm
             crossover_rate (float): the probability that two parents will breed
-            mutation_rate (float): the probability that a single gene will mutate
+            mutation_rate (float): the probability that a child will mutate
+            crossover (str): the crossover to use, either "ox" or "pmx"
+            num_generations (int): the maximum number of generations
+            max_generations_without_improvement (int): the number of generations
+                without improvement before the algorithm terminates
         """
         super().__init__(generator, fitness_func)
         self.population_size = population_size
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
+        self.crossover = crossover
+        self.num_generations = num_generations
+        self.max_generations_without_improvement = max_generations_without_improvement
+
+        self.generations = 0
 
     def optimize(self, initial_state: State) -> Generator[State, None, State]:
         """
@@ -49,144 +204,233 @@ class GeneticAlgorithm(Metaheuristic):
         Returns:
             State: the final state that was reached by the genetic algorithm
         """
+        tour, offsets = initial_state.encode()
+        network = initial_state.network
+
         # Create initial population
-        population = [initial_state.copy() for _ in range(self.population_size)]
+        population = self.initial_population(tour, offsets, initial_state)
+
+        best_fitness = population.fitness[population.best()]
+        generations_without_improvement = 0
 
         # Run iterations until termination condition is met
+        self.generations = 0
         while True:
-            yield max(population, key=self.fitness_func)
-
-            # Evaluate fitness of all individuals
-            fitness_scores = [
-                self.fitness_func(individual) for individual in population
-            ]
+            yield State.decode(population.tours[population.best()], offsets, network)
 
             # Check if termination condition is met
-            if self.is_termination_condition_met(population, fitness_scores):
+            if self.is_termination_condition_met(generations_without_improvement):
                 break
 
-            # Select parents for reproduction
-            parents = self.select_parents(population, fitness_scores)
+            population = self.evolve(population, offsets, initial_state)
+            self.generations += 1
+
+            if population.fitness[population.best()] > best_fitness:
+                best_fitness = population.fitness[population.best()]
+                generations_without_improvement = 0
+                print(f"Better individual found! (generation: {self.generations})")
+            else:
+                generations_without_improvement += 1
+
+        return State.decode(population.tours[population.best()], offsets, network)
+
+    def initial_population(
+        self, tour: np.ndarray, offsets: np.ndarray, initial_state: State
+    ) -> Population:
+        """
+        Creates the initial population: the initial state's giant tour
+        and mutations of it.
+
+        Args:
+            tour (np.ndarray): the giant tour of the initial state
+            offsets (np.ndarray): the route offsets of every giant tour
+            initial_state (State): the initial state
+
+        Returns:
+            Population: the initial population
+        """
+        tours = np.empty((self.population_size, len(tour)), dtype=tour.dtype)
+        tours[0] = tour
 
-            # Breed new individuals from parents
-            offspring = self.breed(parents)
+        for i in range(1, self.population_size):
+            tours[i] = random.choice(MUTATIONS)(tour)
 
-            # Mutate offspring
-            mutated_offspring = self.mutate(offspring)
+        return Population(tours, self.population_fitness(tours, offsets, initial_state))
 
-            # Add mutated offspring to population
-            population += mutated_offspring
+    def evolve(
+        self, population: Population, offsets: np.ndarray, initial_state: State
+    ) -> Population:
+        """
+        Runs a generation of the genetic algorithm.
 
-            # Keep the best individuals
-            population = self.keep_best_individuals(population)
+        Args:
+            population (Population): the current population
+            offsets (np.ndarray): the route offsets of every giant tour
+            initial_state (State): the state the giant tours are evaluated against
 
-        return max(population, key=self.fitness_func)
+        Returns:
+            Population: the next population
+        """
+        # Select parents for reproduction
+        parents = self.select_parents(population)
+
+        # Breed new individuals from parents
+        offspring = self.breed(parents)
+
+        # Mutate offspring
+        mutated_offspring = self.mutate(offspring)
+
+        # Add mutated offspring to population, only evaluating the new individuals
+        population = Population(
+            np.concatenate([population.tours, mutated_offspring]),
+            np.concatenate(
+                [
+                    population.fitness,
+                    self.population_fitness(mutated_offspring, offsets, initial_state),
+                ]
+            ),
+        )
+
+        # Keep the best individuals
+        return self.keep_best_individuals(population)
+
+    def population_fitness(
+        self, tours: np.ndarray, offsets: np.ndarray, initial_state: State
+    ) -> np.ndarray:
+        """
+        Returns the fitness of each of the given giant tours.
+
+        With the default fitness function the whole population is evaluated
+        in a single vectorized pass.
+
+        Args:
+            tours (np.ndarray): an (individuals x establishments) matrix of giant tours
+            offsets (np.ndarray): the route offsets of every giant tour
+            initial_state (State): the state the giant tours are evaluated against
+
+        Returns:
+            np.ndarray: the fitness of each giant tour
+        """
+        self.budget.evaluated(len(tours))
+
+        if self.fitness_func is waiting_time_fitness:
+            return -evaluate_tours(tours, offsets, initial_state.network)
+
+        return np.array(
+            [
+                self.fitness_func(State.decode(tour, offsets, initial_state.network))
+                for tour in tours
+            ]
+        )
 
-    # TODO: Change the termination condition
     def is_termination_condition_met(
-        self, population: list[State], fitness_scores: list[float]
+        self, generations_without_improvement: int
     ) -> bool:
         """
         Checks if the termination condition is met for the genetic algorithm.
 
-        In this implementation, the termination condition is met when the maximum fitness
-        score is equal to 1.
+        In this implementation, the termination condition is met when
+        the maximum number of generations is reached,
+        or when the best individual has not improved for too many generations.
 
         Args:
-            population (list): the current population
-            fitness_scores (list): the fitness scores of the individuals in the population
+            generations_without_improvement (int): the number of generations
+                since the best individual last improved
 
         Returns:
             bool: True if the termination condition is met, False otherwise
         """
-        return max(fitness_scores) == 1.0
+        return (
+            self.generations >= self.num_generations
+            or generations_without_improvement
+            >= self.max_generations_without_improvement
+        )
 
-    def select_parents(
-        self, population: list[State], fitness_scores: list[float]
-    ) -> list[State]:
+    def select_parents(self, population: Population) -> np.ndarray:
         """
         Selects parents for reproduction in the genetic algorithm.
 
         In this implementation, the parents are selected using tournament selection.
 
         Args:
-            population (list): the current population
-            fitness_scores (list): the fitness scores of the individuals in the population
+            population (Population): the current population
 
         Returns:
-            list: the selected parents
+            np.ndarray: the giant tours of the selected parents
         """
-        parents: list[State] = []
+        parents: list[int] = []
         for _ in range(len(population)):
             tournament = random.sample(range(len(population)), 2)
-            if fitness_scores[tournament[0]] > fitness_scores[tournament[1]]:
-                parents.append(population[tournament[0]])
+            if population.fitness[tournament[0]] > population.fitness[tournament[1]]:
+                parents.append(tournament[0])
             else:
-                parents.append(population[tournament[1]])
+                parents.append(tournament[1])
 
-        return parents
+        return population.tours[parents]
 
-    def breed(self, parents: list[State]) -> list[State]:
+    def breed(self, parents: np.ndarray) -> np.ndarray:
         """
         Breeds new individuals from parents in the genetic algorithm.
 
-        In this implementation, the offspring is created using uniform crossover.
+        In this implementation, the offspring is created using
+        order crossover (OX) or partially mapped crossover (PMX),
+        which keep every child a permutation of the establishments.
 
         Args:
-            parents (list): the selected parents
+            parents (np.ndarray): the giant tours of the selected parents
 
         Returns:
-            list: the offspring
+            np.ndarray: the giant tours of the offspring
         """
-        offspring: list[State] = []
-        for _ in range(self.population_size):
-            parent1 = random.choice(parents)
-            parent2 = random.choice(parents)
+        crossover = CROSSOVERS[self.crossover]
+
+        offspring = np.empty((self.population_size, parents.shape[1]), parents.dtype)
+        for i in range(self.population_size):
+            parent1 = parents[random.randrange(len(parents))]
+            parent2 = parents[random.randrange(len(parents))]
             if random.random() < self.crossover_rate:
-                child = parent1.copy()
-                for j in range(len(child)):
-                    if random.random() < 0.5:
-                        child[j] = parent2[j]
-                offspring.append(child)
+                offspring[i] = crossover(parent1, parent2)
             else:
-                offspring.append(parent1)
+                offspring[i] = parent1
         return offspring
 
-    def mutate(self, offspring: list) -> list:
+    def mutate(self, offspring: np.ndarray) -> np.ndarray:
         """
         Mutates offspring in the genetic algorithm.
 
-        In this implementation, the mutation is performed using bit flip mutation.
+        In this implementation, the mutation either swaps two establishments
+        or reverses a segment of the giant tour.
 
         Args:
-            offspring (list): the offspring to mutate
+            offspring (np.ndarray): the giant tours of the offspring to mutate
 
         Returns:
-            list: the mutated offspring
-        """
-        mutated_offspring = []
-        for i in range(len(offspring)):
-            individual = offspring[i]
-            for j in range(len(individual)):
-                if random.random() < self.mutation_rate:
-                    individual[j] = 1 - individual[j]
-            mutated_offspring.append(individual)
+            np.ndarray: the giant tours of the mutated offspring
+        """
+        mutated_offspring = offspring.copy()
+        for i, individual in enumerate(offspring):
+            if random.random() < self.mutation_rate:
+                mutated_offspring[i] = random.choice(MUTATIONS)(individual)
         return mutated_offspring
 
-    def keep_best_individuals(self, population: list[State]) -> list[State]:
+    def keep_best_individuals(self, population: Population) -> Population:
         """
         Keeps the best individuals in the population.
 
-        In this implementation, the best individuals are determined using elitism.
+        In this implementation, the best individuals are determined using elitism,
+        ranking the individuals by their cached fitness.
 
         Args:
-            population (list): the population to select the best individuals from
+            population (Population): the population to select the best individuals from
 
         Returns:
-            list: the best individuals
+            Population: the best individuals
+        """
+        best = np.argsort(-population.fitness, kind="stable")[: self.population_size]
+        return Population(population.tours[best], population.fitness[best])
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the number of generations the population evolved
         """
-        fitness_scores = [self.fitness_func(individual) for individual in population]
-        sorted_population = [
-            x for _, x in sorted(zip(fitness_scores, population), reverse=True)
-        ]
-        return sorted_population[: self.population_size]
+        return {"generations": self.generations}
@@ -0,0 +1,300 @@
+"""
+Classes and methods related to running a genetic algorithm on islands
+that evolve in parallel and exchange individuals
+"""
+
+import multiprocessing
+import os
+import random
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Generator
+
+import numpy as np
+
+from simulation import State
+from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
+
+from .genetic_algorithm import GeneticAlgorithm, Population
+from .parallel import initialize_worker, num_establishments_to_parse, worker_network
+
+
+def send_tours(connection: Connection, tours: np.ndarray):
+    """
+    Sends a matrix of giant tours through the connection as raw int32 data
+    """
+
+    connection.send_bytes(np.ascontiguousarray(tours, dtype=np.int32).tobytes())
+
+
+def receive_tours(connection: Connection, tour_length: int) -> np.ndarray:
+    """
+    Receives a matrix of giant tours sent with **send_tours**
+    """
+
+    tours = np.frombuffer(connection.recv_bytes(), dtype=np.int32)
+
+    return tours.reshape(-1, tour_length)
+
+
+class IslandGeneticAlgorithm(GeneticAlgorithm):
+    """
+    A class for running a genetic algorithm on several islands,
+    each evolving its own population in a separate process.
+
+    Every few generations, each island sends its best individuals
+    to the next island in a ring, where they replace the worst ones.
+    The islands exchange individuals as raw giant tours through pipes,
+    and the parent process only receives the best individual of each island.
+
+    Attributes:
+        num_islands (int): the number of islands
+        migration_interval (int): the number of generations between migrations
+        num_migrants (int): the number of individuals each island sends per migration
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        generator: NeighborGenerator,
+        fitness_func: Callable[[State], float],
+        population_size: int,
+        crossover_rate: float,
+        mutation_rate: float,
+        crossover: str = "ox",
+        num_generations: int = 1000,
+        max_generations_without_improvement: int = 100,
+        num_islands: int = os.cpu_count() or 1,
+        migration_interval: int = 10,
+        num_migrants: int = 2,
+    ):
+        """
+        Initializes the island model genetic algorithm.
+
+        Args:
+            generator (NeighborGenerator): the generator for generating
+                neighboring states
+            fitness_func (Callable[[State], float]): the fitness function
+            population_size (int): the size of the population of each island
+            crossover_rate (float): the probability that two parents will breed
+            mutation_rate (float): the probability that a child will mutate
+            crossover (str): the crossover to use, either "ox" or "pmx"
+            num_generations (int): the maximum number of generations
+            max_generations_without_improvement (int): the number of generations
+                without improvement before the algorithm terminates
+            num_islands (int): the number of islands
+            migration_interval (int): the number of generations between migrations
+            num_migrants (int): the number of individuals
+                each island sends per migration
+        """
+        super().__init__(
+            generator,
+            fitness_func,
+            population_size,
+            crossover_rate,
+            mutation_rate,
+            crossover,
+            num_generations,
+            max_generations_without_improvement,
+        )
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = min(num_migrants, population_size)
+
+        self.generations = 0
+        self.island_fitness: list[float] = []
+
+    def optimize(self, initial_state: State) -> Generator[State, None, State]:
+        """
+        Runs the islands until the termination condition is met,
+        yielding the best state found so far after each migration.
+
+        Returns:
+            State: the best state found by any of the islands
+        """
+        tour, offsets = initial_state.encode()
+        network = initial_state.network
+
+        best_state = initial_state
+        best_fitness = self.fitness_func(initial_state)
+        generations_without_improvement = 0
+        yield best_state
+
+        # island i sends its migrants to island i + 1
+        ring = [multiprocessing.Pipe(duplex=False) for _ in range(self.num_islands)]
+        controls = [multiprocessing.Pipe() for _ in range(self.num_islands)]
+
+        islands = [
+            multiprocessing.Process(
+                target=run_island,
+                args=(
+                    self,
+                    island,
+                    random.getrandbits(32),
+                    num_establishments_to_parse(network),
+                    (tour, offsets),
+                    ring[island - 1][0],
+                    ring[island][1],
+                    controls[island][1],
+                ),
+                daemon=True,
+            )
+            for island in range(self.num_islands)
+        ]
+
+        for island in islands:
+            island.start()
+
+        self.generations = 0
+        self.island_fitness = [best_fitness] * self.num_islands
+
+        try:
+            while not self.is_termination_condition_met(
+                generations_without_improvement
+            ):
+                print(f"Evolving islands... (generation: {self.generations})")
+
+                improved = False
+                for island, (control, _) in enumerate(controls):
+                    self.island_fitness[island] = control.recv()
+                    island_best = receive_tours(control, len(tour))[0]
+
+                    if self.island_fitness[island] > best_fitness:
+                        best_state = State.decode(island_best, offsets, network)
+                        best_fitness = self.island_fitness[island]
+                        improved = True
+
+                self.generations += self.migration_interval
+                # the offspring the islands evaluated, out of sight of the budget
+                self.budget.evaluated(
+                    self.num_islands * self.migration_interval * self.population_size
+                )
+                generations_without_improvement = (
+                    0
+                    if improved
+                    else generations_without_improvement + self.migration_interval
+                )
+
+                yield best_state
+
+                # the islands migrate while the parent checks the termination condition
+                for control, _ in controls:
+                    control.send(
+                        not self.is_termination_condition_met(
+                            generations_without_improvement
+                        )
+                    )
+        finally:
+            for island, (control, _) in zip(islands, controls):
+                if island.is_alive():
+                    try:
+                        control.send(False)
+                    except OSError:
+                        pass
+
+                island.join(timeout=1)
+                if island.is_alive():
+                    island.terminate()
+
+        return best_state
+
+    def migrate(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        population: Population,
+        offsets: np.ndarray,
+        initial_state: State,
+        incoming: Connection,
+        outgoing: Connection,
+        send_first: bool,
+    ) -> Population:
+        """
+        Sends the best individuals of the population to the next island
+        and replaces the worst ones with the individuals of the previous island.
+
+        Islands alternate between sending and receiving first,
+        so that no two neighbors block on a full pipe at the same time.
+
+        Args:
+            population (Population): the population of this island
+            offsets (np.ndarray): the route offsets of every giant tour
+            initial_state (State): the state the giant tours are evaluated against
+            incoming (Connection): the connection to the previous island
+            outgoing (Connection): the connection to the next island
+            send_first (bool): whether this island sends before receiving
+
+        Returns:
+            Population: the population with the migrants
+        """
+        ranking = np.argsort(-population.fitness, kind="stable")
+        emigrants = population.tours[ranking[: self.num_migrants]]
+
+        if send_first:
+            send_tours(outgoing, emigrants)
+            immigrants = receive_tours(incoming, population.tours.shape[1])
+        else:
+            immigrants = receive_tours(incoming, population.tours.shape[1])
+            send_tours(outgoing, emigrants)
+
+        worst = ranking[len(population) - len(immigrants) :]
+
+        tours = population.tours.copy()
+        fitness = population.fitness.copy()
+        tours[worst] = immigrants
+        fitness[worst] = self.population_fitness(immigrants, offsets, initial_state)
+
+        return Population(tours, fitness)
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the number of generations the islands evolved
+        and the best waiting time each island reached
+        """
+        return {
+            "generations": self.generations,
+            "island_best_values": [-fitness for fitness in self.island_fitness],
+        }
+
+
+def run_island(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    algorithm: IslandGeneticAlgorithm,
+    island: int,
+    seed: int,
+    establishments_to_parse: int,
+    encoding: tuple[np.ndarray, np.ndarray],
+    incoming: Connection,
+    outgoing: Connection,
+    control: Connection,
+):
+    """
+    Evolves the population of an island in a worker process.
+
+    After every migration interval, the island reports its best individual
+    to the parent process, migrates, and waits to know whether to keep evolving
+    """
+
+    random.seed(seed)
+    initialize_worker(establishments_to_parse)
+
+    tour, offsets = encoding
+    initial_state = State.decode(tour, offsets, worker_network())
+
+    population = algorithm.initial_population(tour, offsets, initial_state)
+
+    while True:
+        for _ in range(algorithm.migration_interval):
+            population = algorithm.evolve(population, offsets, initial_state)
+
+        best = population.best()
+        control.send(float(population.fitness[best]))
+        send_tours(control, population.tours[best][np.newaxis])
+
+        if algorithm.num_islands > 1:
+            population = algorithm.migrate(
+                population,
+                offsets,
+                initial_state,
+                incoming,
+                outgoing,
+                send_first=island % 2 == 0,
+            )
+
+        if not control.recv():
+            break
@@ -0,0 +1,325 @@
+"""
+Classes and methods related to variable neighborhood descent
+and iterated local search
+"""
+
+from typing import Any, Callable, Generator
+
+import numpy as np
+
+from simulation import State
+from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
+from simulation.heuristics.neighborhood.move import Move
+
+from .metaheuristic import Metaheuristic, waiting_time_fitness
+
+# the number of moves evaluated together when looking for an improvement
+BATCH_SIZE = 1024
+
+
+class VariableNeighborhoodDescent(Metaheuristic):
+    """
+    A class for implementing variable neighborhood descent.
+
+    The state descends through an ordered list of neighborhoods: it moves
+    to a better neighbor in the first neighborhood that has one, and goes back
+    to the first neighborhood after every improvement, until no neighborhood
+    has a better neighbor, which makes the state a local optimum of all of them.
+
+    Neighborhoods are scanned in batches of moves evaluated together.
+    With first improvement, the scan stops at the first batch with an improving move,
+    and with best improvement the whole neighborhood is scanned.
+    Either way, the best improving move is applied, and so are the next best ones
+    that change different brigades, as long as the fitness is the default one,
+    since the change in waiting time of different brigades adds up.
+
+    With the default fitness, a move only depends on the routes it changes,
+    so a neighborhood remembers the routes of the last state it was fully scanned in,
+    and is only scanned again for the moves that change a route
+    that is no longer the same
+
+    Attributes:
+        generator (Generator): the generator for generating neighboring states
+        fitness_func (Callable[[State], float]): the fitness function
+        neighborhoods (list[Generator]): the neighborhoods to descend through, in order
+        first_improvement (bool): whether to stop scanning a neighborhood
+            at the first batch with an improving move
+    """
+
+    def __init__(
+        self,
+        generator: NeighborGenerator,
+        fitness_func: Callable[[State], float],
+        neighborhoods: list[NeighborGenerator],
+        first_improvement: bool = False,
+    ):
+        """
+        Initializes the variable neighborhood descent algorithm.
+
+        Args:
+            generator (Generator): the generator for generating neighboring states
+            fitness_func (Callable[[State], float]): the fitness function
+            neighborhoods (list[Generator]): the neighborhoods to descend through,
+                in order
+            first_improvement (bool): whether to stop scanning a neighborhood
+                at the first batch with an improving move
+        """
+        super().__init__(generator, fitness_func)
+        self.neighborhoods = neighborhoods
+        self.first_improvement = first_improvement
+
+        self.evaluations = 0
+        self.improvements = [0] * len(neighborhoods)
+
+        # routes of the last state each neighborhood was fully scanned in,
+        # where no move left unapplied improved it
+        self.scanned: list[list[np.ndarray] | None] = [None] * len(neighborhoods)
+
+    def unscanned_moves(self, state: State, neighborhood: int) -> list[Move]:
+        """
+        Returns the moves of a neighborhood that may improve the state:
+        the ones that change a route that is not the same as
+        when the neighborhood was last fully scanned
+        """
+
+        generator = self.neighborhoods[neighborhood]
+
+        if (scanned := self.scanned[neighborhood]) is None:
+            return generator.neighborhood(state)
+
+        changed = {
+            brigade
+            for brigade, (route, scanned_route) in enumerate(zip(state.routes, scanned))
+            if route is not scanned_route
+        }
+
+        return [
+            move
+            for move in generator.neighborhood(state, changed)
+            if not changed.isdisjoint(move.brigades(state))
+        ]
+
+    def improving_moves(self, state: State, moves: list[Move]) -> list[Move]:
+        """
+        Returns the moves to apply out of the given ones, best first:
+        the best improving move, followed by the next best improving moves
+        that do not change the same brigades, if the fitness allows it
+        """
+
+        best: list[tuple[float, Move]] = []
+
+        for start in range(0, len(moves), BATCH_SIZE):
+            batch = moves[start : start + BATCH_SIZE]
+            deltas = self.fitness_deltas(state, batch)
+            self.evaluations += len(batch)
+
+            best.extend(
+                (float(deltas[index]), batch[index])
+                for index in np.flatnonzero(deltas > 0).tolist()
+            )
+
+            if (self.first_improvement and best) or self.budget.exhausted():
+                break
+
+        best.sort(key=lambda improvement: improvement[0], reverse=True)
+
+        if self.fitness_func is not waiting_time_fitness:
+            return [move for _, move in best[:1]]
+
+        chosen: list[Move] = []
+        changed: set[int] = set()
+
+        for _, move in best:
+            brigades = move.routes(state).keys()
+
+            if changed.isdisjoint(brigades):
+                chosen.append(move)
+                changed |= brigades
+
+        return chosen
+
+    def descend(self, state: State) -> Generator[State, None, State]:
+        """
+        Descends from the given state to a local optimum of every neighborhood,
+        yielding the state after each improvement,
+        unless the budget runs out on the way down.
+
+        Returns:
+            State: the local optimum
+        """
+        neighborhood = 0
+
+        while neighborhood < len(self.neighborhoods) and not self.budget.exhausted():
+            moves = self.improving_moves(
+                state, self.unscanned_moves(state, neighborhood)
+            )
+
+            # every improving move left unapplied changes a brigade that the applied
+            # ones change too, unless only the best one was applied
+            # or the scan stopped early
+            if (
+                self.fitness_func is waiting_time_fitness
+                and (not moves or not self.first_improvement)
+                and not self.budget.exhausted()
+            ):
+                self.scanned[neighborhood] = state.routes
+
+            if not moves:
+                neighborhood += 1
+                continue
+
+            # the moves change different brigades, so they can be applied in turn
+            for move in moves:
+                state = move.apply(state)
+
+            self.improvements[neighborhood] += len(moves)
+            neighborhood = 0
+
+            yield state
+
+        return state
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the number of evaluated moves
+        and the number of improvements found in each neighborhood
+        """
+        return {
+            "evaluations": self.evaluations,
+            "improvements": {
+                neighborhood.name(): improvements
+                for neighborhood, improvements in zip(
+                    self.neighborhoods, self.improvements
+                )
+            },
+        }
+
+    def optimize(self, initial_state: State) -> Generator[State, None, State]:
+        """
+        Runs the variable neighborhood descent algorithm
+        from the specified initial state.
+
+        Returns:
+            State: the local optimum that was reached
+        """
+        self.evaluations = 0
+        self.improvements = [0] * len(self.neighborhoods)
+        self.scanned = [None] * len(self.neighborhoods)
+
+        yield initial_state
+
+        return (yield from self.descend(initial_state))
+
+
+class IteratedLocalSearch(VariableNeighborhoodDescent):
+    """
+    A class for implementing iterated local search.
+
+    After descending to a local optimum, the state is perturbed by applying
+    a few random moves of the generator, and then descends again.
+    The new local optimum replaces the current one if it is at least as good
+
+    Attributes:
+        generator (Generator): the generator of the perturbation moves
+        fitness_func (Callable[[State], float]): the fitness function
+        neighborhoods (list[Generator]): the neighborhoods to descend through, in order
+        first_improvement (bool): whether to stop scanning a neighborhood
+            at the first batch with an improving move
+        perturbation_strength (int): the number of moves applied by a perturbation
+        max_iterations (int): the maximum number of perturbations
+        max_iterations_without_improvement (int): the number of perturbations
+            without improving the best state before the algorithm terminates
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        generator: NeighborGenerator,
+        fitness_func: Callable[[State], float],
+        neighborhoods: list[NeighborGenerator],
+        first_improvement: bool = False,
+        perturbation_strength: int = 3,
+        max_iterations: int = 100,
+        max_iterations_without_improvement: int = 20,
+    ):
+        """
+        Initializes the iterated local search algorithm.
+
+        Args:
+            generator (Generator): the generator of the perturbation moves
+            fitness_func (Callable[[State], float]): the fitness function
+            neighborhoods (list[Generator]): the neighborhoods to descend through,
+                in order
+            first_improvement (bool): whether to stop scanning a neighborhood
+                at the first batch with an improving move
+            perturbation_strength (int): the number of moves applied by a perturbation
+            max_iterations (int): the maximum number of perturbations
+            max_iterations_without_improvement (int): the number of perturbations
+                without improving the best state before the algorithm terminates
+        """
+        super().__init__(generator, fitness_func, neighborhoods, first_improvement)
+        self.perturbation_strength = perturbation_strength
+        self.max_iterations = max_iterations
+        self.max_iterations_without_improvement = max_iterations_without_improvement
+
+        self.iterations = 0
+
+    def perturb(self, state: State) -> State:
+        """
+        Returns the state reached by applying random moves to the given state
+        """
+
+        for _ in range(self.perturbation_strength):
+            state = self.generator.propose(state).apply(state)
+
+        return state
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the statistics of the descents, along with the number of perturbations
+        """
+        return {**super().statistics(), "iterations": self.iterations}
+
+    def optimize(self, initial_state: State) -> Generator[State, None, State]:
+        """
+        Runs the iterated local search algorithm to optimize
+        the specified initial state, yielding the state after each improvement
+        and the best state at the end.
+
+        Returns:
+            State: the best local optimum that was reached
+        """
+        self.evaluations = 0
+        self.improvements = [0] * len(self.neighborhoods)
+        self.scanned = [None] * len(self.neighborhoods)
+        self.iterations = 0
+
+        yield initial_state
+
+        current_state = best_state = yield from self.descend(initial_state)
+        current_fitness = best_fitness = self.fitness_func(current_state)
+        iterations_without_improvement = 0
+
+        while (
+            self.iterations < self.max_iterations
+            and iterations_without_improvement < self.max_iterations_without_improvement
+            and not self.budget.exhausted()
+        ):
+            print(f"Perturbing... (iteration: {self.iterations})")
+            self.iterations += 1
+
+            state = yield from self.descend(self.perturb(current_state))
+            fitness = self.fitness_func(state)
+
+            if fitness >= current_fitness:
+                current_state, current_fitness = state, fitness
+
+            if fitness > best_fitness:
+                best_state, best_fitness = state, fitness
+                iterations_without_improvement = 0
+                print("Better state found!")
+            else:
+                iterations_without_improvement += 1
+
+        yield best_state
+
+        return best_state
@@ -1,6 +1,22 @@
-from typing import Callable, Generator
+from time import perf_counter
+from typing import Any, Callable, Generator
+
+import numpy as np
+
 from simulation import State
 from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
+from simulation.heuristics.neighborhood.generator import MoveOutcome
+from simulation.heuristics.neighborhood.move import Move, evaluate_moves
+
+from .budget import Budget
+
+
+def waiting_time_fitness(state: State) -> float:
+    """
+    The default fitness function: the less time the brigades wait, the fitter
+    """
+
+    return -state.value()
 
 
 class Metaheuristic:
@@ -10,6 +26,8 @@ class Metaheuristic:
     Attributes:
         generator (Generator): the generator for generating neighboring states
         fitness_func (Callable[[State], float]): the fitness function
+        budget (Budget): the limits every run of the metaheuristic stays within,
+            none by default
     """
 
     def __init__(
@@ -24,10 +42,160 @@ class Metaheuristic:
         """
         self.generator = generator
         self.fitness_func = fitness_func
+        self.budget = Budget()
+
+    def fitness_delta(self, state: State, move: Move) -> float:
+        """
+        Returns how much the fitness of the given state changes if the move is applied.
+
+        With the default fitness function this only evaluates the routes
+        changed by the move, without building the neighboring state.
+
+        Args:
+            state (State): the state the move was proposed for
+            move (Move): the move to evaluate
+
+        Returns:
+            float: the fitness of the neighbor minus the fitness of the state
+        """
+        self.budget.evaluated()
+        start = perf_counter()
+
+        if self.fitness_func is waiting_time_fitness:
+            delta = -move.delta(state)
+        else:
+            delta = self.fitness_func(move.apply(state)) - self.fitness_func(state)
+
+        move.evaluation_time += perf_counter() - start
+
+        return delta
+
+    def fitness_deltas(self, state: State, moves: list[Move]) -> np.ndarray:
+        """
+        Returns how much the fitness of the given state changes
+        for each of the given moves.
+
+        With the default fitness function every move is evaluated
+        in a single vectorized pass.
+
+        Args:
+            state (State): the state the moves were proposed for
+            moves (list[Move]): the moves to evaluate
+
+        Returns:
+            np.ndarray: the fitness of each neighbor minus the fitness of the state
+        """
+        if self.fitness_func is waiting_time_fitness:
+            self.budget.evaluated(len(moves))
+
+            for move in moves:
+                start = perf_counter()
+                move.routes(state)
+                move.evaluation_time += perf_counter() - start
+
+            # the routes of every move are evaluated together,
+            # so each move is charged an even share of the time it takes
+            start = perf_counter()
+            deltas = -evaluate_moves(state, moves)
+            share = (perf_counter() - start) / max(len(moves), 1)
+
+            for move in moves:
+                move.evaluation_time += share
+
+            return deltas
+
+        return np.array([self.fitness_delta(state, move) for move in moves])
+
+    def report_outcome(
+        self, move: Move, fitness_delta: float, accepted: bool, new_best: bool = False
+    ):
+        """
+        Tells the generator what happened to a move it proposed.
+
+        Args:
+            move (Move): the move that was proposed
+            fitness_delta (float): how much the move changes the fitness of the state
+            accepted (bool): whether the move was applied
+            new_best (bool): whether the move led to the best state found so far
+        """
+        if new_best:
+            outcome = MoveOutcome.NEW_BEST
+        elif accepted and fitness_delta > 0:
+            outcome = MoveOutcome.IMPROVED
+        elif accepted:
+            outcome = MoveOutcome.ACCEPTED
+        else:
+            outcome = MoveOutcome.REJECTED
+
+        self.generator.feedback(move, outcome, fitness_delta)
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns statistics specific to this metaheuristic about its last run,
+        as a dict of JSON serializable values.
+
+        The default implementation has no statistics to report.
+        """
+        return {}
+
+    def run(self, initial_state: State) -> Generator[State, None, State]:
+        """
+        Runs the metaheuristic to optimize the specified initial state
+        until it terminates or its budget runs out.
+
+        Returns:
+            State: the best state that was reached by the metaheuristic
+        """
+        self.budget.start()
+
+        return (yield from self.within_budget(self.optimize(initial_state)))
+
+    def within_budget(
+        self, states: Generator[State, None, State]
+    ) -> Generator[State, None, State]:
+        """
+        Yields the states of a run of the metaheuristic until it terminates
+        or the budget runs out, followed by the best of them if it was not the last.
+
+        Every state yielded by the run counts as an iteration of the budget.
+
+        Args:
+            states (Generator[State, None, State]): the run of the metaheuristic
+
+        Returns:
+            State: the best state of the run
+        """
+        best_state, best_fitness = None, float("-inf")
+        state = None
+
+        try:
+            for state in states:
+                fitness = self.fitness_func(state)
+                self.budget.update(fitness)
+
+                if fitness > best_fitness:
+                    best_state, best_fitness = state, fitness
+
+                yield state
+
+                if self.budget.exhausted():
+                    print(f"Budget exhausted! ({self.budget.reason})")
+                    break
+        finally:
+            states.close()
+
+        assert best_state is not None, "The metaheuristic yielded no states"
+
+        if best_state is not state:
+            yield best_state
+
+        return best_state
 
     def optimize(self, initial_state: State) -> Generator[State, None, State]:
         """
-        Runs the metaheuristic to optimize the specified initial state.
+        Runs the metaheuristic to optimize the specified initial state,
+        checking its budget as often as it needs to stop in time.
+        Use **run** to stop it when the budget runs out.
 
         The default implementation of this method is a simple hill climbing algorithm.
 
@@ -37,10 +205,14 @@ class Metaheuristic:
         current_state = initial_state
         while True:
             yield current_state
-            new_state = self.generator.apply(current_state)
+            move = self.generator.propose(current_state)
+            delta = self.fitness_delta(current_state, move)
+
+            # every improvement of a hill climb is a new best state
+            self.report_outcome(move, delta, accepted=delta > 0, new_best=delta > 0)
 
-            if self.fitness_func(new_state) > self.fitness_func(current_state):
-                current_state = new_state
+            if delta > 0:
+                current_state = move.apply(current_state)
             else:
                 break
 
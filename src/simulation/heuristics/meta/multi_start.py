@@ -0,0 +1,287 @@
+"""
+Classes and methods related to running several simulated annealing chains in parallel
+"""
+
+import os
+import queue
+import random
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import Manager
+from time import perf_counter
+from typing import Any, Callable, Generator, Optional
+
+import numpy as np
+
+from simulation import State
+from simulation.heuristics.initial_state.generator import (
+    Generator as InitialStateGenerator,
+)
+from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
+
+from .budget import Budget
+from .parallel import initialize_worker, num_establishments_to_parse, worker_network
+from .simulated_annealing import MAX_ITERATIONS_WITHOUT_IMPROVEMENT, SimulatedAnnealing
+
+# how often a chain reports its best state so far to the main process, in seconds,
+# since sending a state takes much longer than an iteration of the chain
+PROGRESS_INTERVAL = 0.1
+
+
+@dataclass
+class ChainStatistics:
+    """
+    Statistics about a single simulated annealing chain
+    """
+
+    chain: int
+    seed: int
+    initial_value: float
+    best_value: float
+    iterations: int
+    evaluations: int
+    runtime: float
+
+
+class MultiStartSimulatedAnnealing(SimulatedAnnealing):
+    """
+    A class for running several independent simulated annealing chains
+    in a pool of worker processes, keeping the best solution found by any of them.
+
+    Every worker loads the network once, so only the compact encoding
+    of the states is sent between processes.
+    While they run, the chains report their best states so far through a queue,
+    so the best state found by any of them is known before they finish.
+
+    Attributes:
+        num_chains (int): the number of chains to run
+        initial_state_generator (InitialStateGenerator, optional): the generator
+            each chain but the first uses to build its own initial state.
+            If not set, every chain starts from the given initial state
+        max_workers (int, optional): the number of worker processes,
+            defaults to the number of processors
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        generator: NeighborGenerator,
+        fitness_func: Callable[[State], float],
+        initial_temperature: float = 100.0,
+        cooling_factor: float = 0.95,
+        limit_temp: float = 1,
+        max_iterations_without_improvement: int = MAX_ITERATIONS_WITHOUT_IMPROVEMENT,
+        num_chains: int = os.cpu_count() or 1,
+        initial_state_generator: Optional[InitialStateGenerator] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initializes the multi-start simulated annealing algorithm.
+
+        The fitness function and generators are sent to the worker processes,
+        so they must be picklable.
+
+        Args:
+            generator (Generator): the generator for generating neighboring states
+            fitness_func (Callable[[State], float]): the fitness function
+            initial_temperature (float): the initial temperature of each chain
+            cooling_factor (float): the cooling factor of each chain
+            limit_temp (float): the limit temperature of each chain
+            max_iterations_without_improvement (int): the number of iterations
+                without improvement before a chain terminates
+            num_chains (int): the number of chains to run
+            initial_state_generator (InitialStateGenerator, optional): the generator
+                each chain but the first uses to build its own initial state
+            max_workers (int, optional): the number of worker processes
+        """
+        super().__init__(
+            generator,
+            fitness_func,
+            initial_temperature,
+            cooling_factor,
+            limit_temp,
+            max_iterations_without_improvement,
+        )
+        self.num_chains = num_chains
+        self.initial_state_generator = initial_state_generator
+        self.max_workers = max_workers
+
+        self.chain_statistics: list[ChainStatistics] = []
+
+    def anneal(self, initial_state: State) -> Generator[State, None, State]:
+        """
+        Runs a single simulated annealing chain from the specified initial state.
+        """
+
+        return (yield from super().optimize(initial_state))
+
+    def optimize(  # pylint: disable=too-many-locals
+        self, initial_state: State
+    ) -> Generator[State, None, State]:
+        """
+        Runs every chain in parallel, yielding the best state found so far
+        by any of them each time it improves.
+
+        Returns:
+            State: the best state found by any of the chains
+        """
+
+        self.chain_statistics = []
+
+        best_state = initial_state
+        best_fitness = self.fitness_func(best_state)
+        yield best_state
+
+        encoding = initial_state.encode()
+        seeds = [random.getrandbits(32) for _ in range(self.num_chains)]
+
+        # every chain starts from a copy of the generator as it is now,
+        # so what the copies learned is merged once the chains are over
+        generators: list[NeighborGenerator] = []
+        chains: list[Future] = []
+
+        try:
+            with Manager() as manager, ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=initialize_worker,
+                initargs=(num_establishments_to_parse(initial_state.network),),
+            ) as executor:
+                progress = manager.Queue()
+
+                chains = [
+                    executor.submit(
+                        run_chain,
+                        self,
+                        chain,
+                        seed,
+                        (
+                            encoding
+                            if chain == 0 or self.initial_state_generator is None
+                            else None
+                        ),
+                        initial_state.num_brigades,
+                        self.budget.remaining(self.num_chains),
+                        progress,
+                    )
+                    for chain, seed in enumerate(seeds)
+                ]
+
+                # the queue is emptied once more after the chains finish,
+                # since they report their best states right before finishing
+                while not (finished := all(chain.done() for chain in chains)) or (
+                    not progress.empty()
+                ):
+                    try:
+                        fitness, (tour, offsets) = progress.get(
+                            timeout=0 if finished else PROGRESS_INTERVAL
+                        )
+                    except queue.Empty:
+                        continue
+
+                    if fitness > best_fitness:
+                        best_state = State.decode(tour, offsets, initial_state.network)
+                        best_fitness = fitness
+                        print("Better state found!")
+
+                        yield best_state
+
+                # a chain that failed raises its error here
+                for chain in chains:
+                    chain.result()
+        finally:
+            # the pool waits for every chain, even if the run is cut short,
+            # so what they did is known either way
+            for chain in chains:
+                if chain.done() and chain.exception() is None:
+                    statistics, generator = chain.result()
+                    self.chain_statistics.append(statistics)
+                    generators.append(generator)
+                    self.budget.evaluated(statistics.evaluations)
+
+            self.generator.merge(generators)
+
+        return best_state
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the statistics of each chain, ordered by chain
+        """
+        return {
+            "chains": [
+                asdict(statistics)
+                for statistics in sorted(self.chain_statistics, key=lambda s: s.chain)
+            ]
+        }
+
+
+def run_chain(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    annealing: MultiStartSimulatedAnnealing,
+    chain: int,
+    seed: int,
+    encoding: Optional[tuple[np.ndarray, np.ndarray]],
+    num_carriers: int,
+    budget: Budget,
+    progress: "queue.Queue[tuple[float, tuple[np.ndarray, np.ndarray]]]",
+) -> tuple[ChainStatistics, NeighborGenerator]:
+    """
+    Runs a simulated annealing chain in a worker process,
+    starting from the encoded state or, if there is none,
+    from a state built with the chain's initial state generator,
+    within its share of the remaining budget.
+
+    Every so often, and once the chain is over, the fitness and encoding
+    of the best state found so far are put in the progress queue,
+    if it improved since they were last put there.
+
+    Returns the chain's statistics and the chain's copy of the generator,
+    with the feedback of its moves
+    """
+
+    random.seed(seed)
+    network = worker_network()
+
+    if encoding is not None:
+        state = State.decode(*encoding, network)
+    else:
+        assert annealing.initial_state_generator is not None
+        state = State.initial_state(
+            network, num_carriers, annealing.initial_state_generator
+        )
+
+    annealing.budget = budget
+    budget.start()
+
+    start = perf_counter()
+    initial_value = state.value()
+
+    best_state = state
+    best_fitness = annealing.fitness_func(state)
+    reported_fitness, reported = float("-inf"), perf_counter()
+    iterations = 0
+
+    for new_state in annealing.within_budget(annealing.anneal(state)):
+        iterations += 1
+
+        if (fitness := annealing.fitness_func(new_state)) > best_fitness:
+            best_state = new_state
+            best_fitness = fitness
+
+        if best_fitness > reported_fitness and (
+            perf_counter() - reported >= PROGRESS_INTERVAL
+        ):
+            progress.put((best_fitness, best_state.encode()))
+            reported_fitness, reported = best_fitness, perf_counter()
+
+    if best_fitness > reported_fitness:
+        progress.put((best_fitness, best_state.encode()))
+
+    statistics = ChainStatistics(
+        chain,
+        seed,
+        initial_value,
+        best_state.value(),
+        iterations,
+        budget.evaluations,
+        perf_counter() - start,
+    )
+
+    return statistics, annealing.generator
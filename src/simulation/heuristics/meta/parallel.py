@@ -0,0 +1,51 @@
+"""
+Utilities for running metaheuristics in worker processes
+"""
+
+import os
+import sys
+from typing import Optional
+
+from models.network import Network
+from simulation.simulation import load_dataset
+
+# the network of the worker process, loaded once when the worker starts
+_worker_network: Optional[Network] = None
+
+
+def num_establishments_to_parse(network: Network) -> int:
+    """
+    Returns the amount of lines of the dataset a worker needs to parse
+    to load the same network as the given one, depot included
+    """
+
+    return len(network.establishments) + 1
+
+
+def initialize_worker(establishments_to_parse: int):
+    """
+    Loads the network a worker process operates on.
+
+    The distance matrix is memory-mapped from its compiled cache,
+    so every worker shares the same physical pages.
+    Progress messages of the metaheuristics are discarded,
+    since they would interleave with the ones from other workers
+    """
+
+    global _worker_network  # pylint: disable=global-statement
+    _worker_network = Network(*load_dataset(establishments_to_parse))
+
+    # the worker lives as long as its pool, so the file is never closed
+    sys.stdout = open(  # pylint: disable=consider-using-with
+        os.devnull, mode="w", encoding="utf-8"
+    )
+
+
+def worker_network() -> Network:
+    """
+    Returns the network loaded by **initialize_worker** in this process
+    """
+
+    assert _worker_network is not None, "Worker was not initialized"
+
+    return _worker_network
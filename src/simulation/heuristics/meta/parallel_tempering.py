@@ -0,0 +1,286 @@
+"""
+Classes and methods related to parallel tempering (replica exchange)
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generator, Optional
+
+import numpy as np
+
+from simulation import State
+from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
+
+from .budget import Budget
+from .metaheuristic import Metaheuristic
+from .parallel import initialize_worker, num_establishments_to_parse, worker_network
+
+# a state encoded as returned by State.encode
+Encoding = tuple[np.ndarray, np.ndarray]
+
+
+@dataclass
+class ReplicaResult:
+    """
+    The outcome of sampling a replica at a fixed temperature
+    """
+
+    encoding: Encoding
+    fitness: float
+    best_encoding: Encoding
+    best_fitness: float
+    accepted: int
+    evaluations: int
+
+    # the replica's copy of the generator, with the feedback of its moves
+    generator: NeighborGenerator
+
+
+class ParallelTempering(Metaheuristic):
+    """
+    A class for implementing parallel tempering, also known as replica exchange.
+
+    Each replica samples states at a fixed temperature of a geometric ladder,
+    in its own worker process. After a number of steps, replicas at neighboring
+    temperatures exchange their states according to the Metropolis criterion,
+    so good states found while exploring at high temperatures
+    move down the ladder to be refined.
+
+    Attributes:
+        generator (Generator): the generator for generating neighboring states
+        fitness_func (Callable[[State], float]): the fitness function
+        temperatures (list[float]): the temperature of each replica, coldest first
+        steps_per_exchange (int): the steps each replica takes between exchanges
+        num_exchanges (int): the number of exchange rounds
+        max_workers (int, optional): the number of worker processes,
+            defaults to one per replica
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        generator: NeighborGenerator,
+        fitness_func: Callable[[State], float],
+        num_replicas: int = os.cpu_count() or 1,
+        min_temperature: float = 1.0,
+        max_temperature: float = 1000.0,
+        steps_per_exchange: int = 1000,
+        num_exchanges: int = 50,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initializes the parallel tempering algorithm.
+
+        The fitness function and generator are sent to the worker processes,
+        so they must be picklable.
+
+        Args:
+            generator (Generator): the generator for generating neighboring states
+            fitness_func (Callable[[State], float]): the fitness function
+            num_replicas (int): the number of replicas
+            min_temperature (float): the temperature of the coldest replica
+            max_temperature (float): the temperature of the hottest replica
+            steps_per_exchange (int): the steps each replica takes between exchanges
+            num_exchanges (int): the number of exchange rounds
+            max_workers (int, optional): the number of worker processes
+        """
+        super().__init__(generator, fitness_func)
+
+        self.temperatures = [
+            min_temperature
+            * (max_temperature / min_temperature) ** (i / max(num_replicas - 1, 1))
+            for i in range(num_replicas)
+        ]
+        self.steps_per_exchange = steps_per_exchange
+        self.num_exchanges = num_exchanges
+        self.max_workers = max_workers
+
+        self.swaps_attempted = [0] * (num_replicas - 1)
+        self.swaps_accepted = [0] * (num_replicas - 1)
+        self.moves_accepted = [0] * num_replicas
+
+    def sample(
+        self, state: State, temperature: float, steps: int
+    ) -> tuple[State, State, int]:
+        """
+        Runs the Metropolis algorithm at a fixed temperature,
+        until it took the given number of steps or the budget ran out.
+
+        Args:
+            state (State): the state to start from
+            temperature (float): the temperature to sample at
+            steps (int): the number of moves to propose
+
+        Returns:
+            tuple[State, State, int]: the final state, the best state that was visited
+                and the number of accepted moves
+        """
+        current_state = best_state = state
+        fitness = best_fitness = self.fitness_func(state)
+        accepted = 0
+
+        for _ in range(steps):
+            if self.budget.exhausted():
+                break
+
+            move = self.generator.propose(current_state)
+            delta = self.fitness_delta(current_state, move)
+
+            if delta > 0 or random.random() < math.exp(delta / temperature):
+                current_state = move.apply(current_state)
+                fitness += delta
+                accepted += 1
+
+                self.report_outcome(
+                    move, delta, accepted=True, new_best=fitness > best_fitness
+                )
+
+                if fitness > best_fitness:
+                    best_state = current_state
+                    best_fitness = fitness
+            else:
+                self.report_outcome(move, delta, accepted=False)
+
+        return current_state, best_state, accepted
+
+    def optimize(  # pylint: disable=too-many-locals
+        self, initial_state: State
+    ) -> Generator[State, None, State]:
+        """
+        Runs the parallel tempering algorithm to optimize the specified initial state,
+        yielding the best state found so far after each exchange round.
+
+        Returns:
+            State: the best state found by any of the replicas
+        """
+        num_replicas = len(self.temperatures)
+
+        self.swaps_attempted = [0] * (num_replicas - 1)
+        self.swaps_accepted = [0] * (num_replicas - 1)
+        self.moves_accepted = [0] * num_replicas
+
+        best_state = initial_state
+        best_fitness = self.fitness_func(initial_state)
+        yield best_state
+
+        # every replica starts from the initial state
+        encodings = [initial_state.encode()] * num_replicas
+        fitnesses = [best_fitness] * num_replicas
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers or num_replicas,
+            initializer=initialize_worker,
+            initargs=(num_establishments_to_parse(initial_state.network),),
+        ) as executor:
+            for exchange in range(self.num_exchanges):
+                print(f"Tempering... (exchange: {exchange})")
+
+                replicas = [
+                    executor.submit(
+                        run_replica,
+                        self,
+                        encoding,
+                        temperature,
+                        random.getrandbits(32),
+                        self.budget.remaining(num_replicas),
+                    )
+                    for encoding, temperature in zip(encodings, self.temperatures)
+                ]
+
+                results = [replica.result() for replica in replicas]
+
+                # the replicas told their own copies of the generator
+                # what happened to their moves
+                self.generator.merge([result.generator for result in results])
+
+                for replica, result in enumerate(results):
+                    encodings[replica] = result.encoding
+                    fitnesses[replica] = result.fitness
+                    self.moves_accepted[replica] += result.accepted
+                    self.budget.evaluated(result.evaluations)
+
+                    if result.best_fitness > best_fitness:
+                        best_state = State.decode(
+                            *result.best_encoding, initial_state.network
+                        )
+                        best_fitness = result.best_fitness
+                        print("Better state found!")
+
+                yield best_state
+
+                # alternate between even and odd pairs, so every pair gets a chance
+                for first in range(exchange % 2, num_replicas - 1, 2):
+                    second = first + 1
+                    self.swaps_attempted[first] += 1
+
+                    exponent = (fitnesses[second] - fitnesses[first]) * (
+                        1 / self.temperatures[first] - 1 / self.temperatures[second]
+                    )
+
+                    if exponent >= 0 or random.random() < math.exp(exponent):
+                        encodings[first], encodings[second] = (
+                            encodings[second],
+                            encodings[first],
+                        )
+                        fitnesses[first], fitnesses[second] = (
+                            fitnesses[second],
+                            fitnesses[first],
+                        )
+                        self.swaps_accepted[first] += 1
+
+        return best_state
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the temperature of each replica, how often its moves were accepted
+        and how often it swapped states with the next replica
+        """
+        steps = self.steps_per_exchange * self.num_exchanges
+
+        return {
+            "temperatures": self.temperatures,
+            "move_acceptance_rates": [
+                accepted / steps if steps > 0 else 0 for accepted in self.moves_accepted
+            ],
+            "swap_acceptance_rates": [
+                accepted / attempted if attempted > 0 else 0
+                for accepted, attempted in zip(
+                    self.swaps_accepted, self.swaps_attempted
+                )
+            ],
+        }
+
+
+def run_replica(
+    tempering: ParallelTempering,
+    encoding: Encoding,
+    temperature: float,
+    seed: int,
+    budget: Budget,
+) -> ReplicaResult:
+    """
+    Samples a replica in a worker process for one round of parallel tempering,
+    starting from the encoded state, within its share of the remaining budget
+    """
+
+    random.seed(seed)
+
+    tempering.budget = budget
+    budget.start()
+
+    state = State.decode(*encoding, worker_network())
+    state, best_state, accepted = tempering.sample(
+        state, temperature, tempering.steps_per_exchange
+    )
+
+    return ReplicaResult(
+        state.encode(),
+        tempering.fitness_func(state),
+        best_state.encode(),
+        tempering.fitness_func(best_state),
+        accepted,
+        budget.evaluations,
+        tempering.generator,
+    )
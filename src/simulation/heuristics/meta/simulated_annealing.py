@@ -10,7 +10,7 @@ from .metaheuristic import Metaheuristic
 
 
 MAX_ITERATIONS_WITHOUT_IMPROVEMENT = int(
-    Config.get("SA_MAX_ITERATIONS_WITHOUT_IMPROVEMENT")
+    Config.get("SA_MAX_ITERATIONS_WITHOUT_IMPROVEMENT", "5")
 )
 
 
@@ -24,15 +24,18 @@ class SimulatedAnnealing(Metaheuristic):
         initial_temperature (float): the initial temperature for simulated annealing
         cooling_factor (float): the cooling factor for simulated annealing
         limit_temp (float): the limit temperature for simulated annealing
+        max_iterations_without_improvement (int): the number of iterations
+            without improvement before the algorithm terminates
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         generator: NeighborGenerator,
         fitness_func: Callable[[State], float],
         initial_temperature: float = 100.0,
         cooling_factor: float = 0.95,
         limit_temp: float = 1,
+        max_iterations_without_improvement: int = MAX_ITERATIONS_WITHOUT_IMPROVEMENT,
     ):
         """
         Initializes the simulated annealing algorithm.
@@ -43,11 +46,14 @@ class SimulatedAnnealing(Metaheuristic):
             initial_temperature (float): the initial temperature for simulated annealing
             cooling_factor (float): the cooling factor for simulated annealing
             limit_temp (float): the limit temperature for simulated annealing
+            max_iterations_without_improvement (int): the number of iterations
+                without improvement before the algorithm terminates
         """
         super().__init__(generator, fitness_func)
         self.initial_temperature = initial_temperature
         self.cooling_factor = cooling_factor
         self.limit_temp = limit_temp
+        self.max_iterations_without_improvement = max_iterations_without_improvement
 
     def optimize(self, initial_state: State) -> Generator[State, None, State]:
         """
@@ -58,41 +64,51 @@ class SimulatedAnnealing(Metaheuristic):
         """
 
         prev_deltas: list[float] = [
-            -1 for _ in range(MAX_ITERATIONS_WITHOUT_IMPROVEMENT)
+            -1 for _ in range(self.max_iterations_without_improvement)
         ]
 
         current_state = initial_state
-        current_fitness = self.fitness_func(current_state)
         temperature = self.initial_temperature
 
+        # tracked from the deltas, only to tell the generator about new best states
+        fitness = best_fitness = self.fitness_func(initial_state)
+
         while temperature > self.limit_temp:
             yield current_state
             print(f"Annealing... (temp: {temperature})")
-            neighbor = self.generator.apply(current_state)
-            neighbor_fitness = self.fitness_func(neighbor)
+            move = self.generator.propose(current_state)
 
-            delta = neighbor_fitness - current_fitness
+            # only neighbors that are accepted are built
+            delta = self.fitness_delta(current_state, move)
 
             if delta > 0:
-                current_state = neighbor
-                current_fitness = neighbor_fitness
+                current_state = move.apply(current_state)
                 print("Better state found!")
+
+                fitness += delta
+                self.report_outcome(
+                    move, delta, accepted=True, new_best=fitness > best_fitness
+                )
+                best_fitness = max(best_fitness, fitness)
             else:
-                delta = neighbor_fitness - current_fitness
                 prev_deltas.append(delta)
-                if len(prev_deltas) > MAX_ITERATIONS_WITHOUT_IMPROVEMENT:
+                if len(prev_deltas) > self.max_iterations_without_improvement:
                     prev_deltas.pop(0)
 
                 if all(val == 0 for val in prev_deltas) or len(set(prev_deltas)) == 1:
+                    self.report_outcome(move, delta, accepted=False)
                     break
 
                 probability = math.exp(delta / temperature)
+                accepted = random.random() < probability
 
-                if random.random() < probability:
-                    current_state = neighbor
-                    current_fitness = neighbor_fitness
+                if accepted:
+                    current_state = move.apply(current_state)
+                    fitness += delta
                     print(f"Worse state accepted with probability {probability}!")
 
+                self.report_outcome(move, delta, accepted)
+
             temperature *= self.cooling_factor
 
         return current_state
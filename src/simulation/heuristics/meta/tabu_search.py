@@ -0,0 +1,243 @@
+"""
+Classes and methods related to tabu search
+"""
+
+from typing import Any, Callable, Generator
+
+import numpy as np
+
+from simulation import State
+from simulation.heuristics.neighborhood.generator import Generator as NeighborGenerator
+from simulation.heuristics.neighborhood.move import Move
+
+from .metaheuristic import Metaheuristic
+
+
+class TabuList:
+    """
+    The short-term memory of tabu search: attributes of the recently visited states
+    that moves must not bring back, each until a given iteration.
+
+    Attributes are hashed into a dict, so checking and recording them is O(1),
+    and expired attributes are only purged once in a while
+    """
+
+    def __init__(self):
+        self.expirations: dict[int, int] = {}
+        self.next_purge = 0
+
+    def is_tabu(self, attribute: int, iteration: int) -> bool:
+        """
+        Returns whether the given attribute is tabu at the given iteration
+        """
+
+        return self.expirations.get(attribute, -1) > iteration
+
+    def add(self, attribute: int, expiration: int):
+        """
+        Makes the given attribute tabu until the given iteration, exclusive
+        """
+
+        self.expirations[attribute] = expiration
+
+    def purge(self, iteration: int):
+        """
+        Forgets the attributes that are no longer tabu at the given iteration,
+        at most once every few iterations
+        """
+
+        if iteration < self.next_purge:
+            return
+
+        self.expirations = {
+            attribute: expiration
+            for attribute, expiration in self.expirations.items()
+            if expiration > iteration
+        }
+        self.next_purge = iteration + max(len(self.expirations), 1)
+
+
+class TabuSearch(Metaheuristic):  # pylint: disable=too-many-instance-attributes
+    """
+    A class for implementing tabu search.
+
+    Each iteration samples a neighborhood of moves, evaluates them in a single batch
+    and applies the best one that is not tabu, even if it makes the state worse.
+
+    The attributes of a state are the legs its brigades travel: which establishment
+    a brigade visits right after another. When a move is applied, the legs it removes
+    become tabu for a number of iterations, so moves that travel them again,
+    such as the move that undoes it, are not applied unless they lead to
+    a state better than the best one found so far (aspiration)
+
+    Attributes:
+        generator (Generator): the generator for generating neighboring states
+        fitness_func (Callable[[State], float]): the fitness function
+        neighborhood_size (int): the number of moves sampled each iteration
+        tenure (int): the number of iterations the removed legs stay tabu
+        max_iterations (int): the maximum number of iterations
+        max_iterations_without_improvement (int): the number of iterations
+            without improving the best state before the algorithm terminates
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        generator: NeighborGenerator,
+        fitness_func: Callable[[State], float],
+        neighborhood_size: int = 50,
+        tenure: int = 20,
+        max_iterations: int = 1000,
+        max_iterations_without_improvement: int = 100,
+    ):
+        """
+        Initializes the tabu search algorithm.
+
+        Args:
+            generator (Generator): the generator for generating neighboring states
+            fitness_func (Callable[[State], float]): the fitness function
+            neighborhood_size (int): the number of moves sampled each iteration
+            tenure (int): the number of iterations the removed legs stay tabu
+            max_iterations (int): the maximum number of iterations
+            max_iterations_without_improvement (int): the number of iterations
+                without improving the best state before the algorithm terminates
+        """
+        super().__init__(generator, fitness_func)
+        self.neighborhood_size = neighborhood_size
+        self.tenure = tenure
+        self.max_iterations = max_iterations
+        self.max_iterations_without_improvement = max_iterations_without_improvement
+
+        self.iterations = 0
+        self.tabu_moves = 0
+        self.aspirations = 0
+        self.best_iteration = 0
+
+    def leg_attributes(
+        self, state: State, brigade: int, route: list[int] | np.ndarray
+    ) -> set[int]:
+        """
+        Returns the attributes of the legs the given brigade travels
+        when following the given route
+        """
+
+        size = len(state.network.graph.mat)
+        previous = state.network.depot.establishment_id
+
+        attributes: set[int] = set()
+        for establishment in route.tolist() if isinstance(route, np.ndarray) else route:
+            attributes.add((brigade * size + previous) * size + establishment)
+            previous = establishment
+
+        return attributes
+
+    def move_legs(self, state: State, move: Move) -> tuple[set[int], set[int]]:
+        """
+        Returns the attributes of the legs added and removed by the given move
+        """
+
+        added: set[int] = set()
+        removed: set[int] = set()
+
+        for brigade, route in move.routes(state).items():
+            old_legs = self.leg_attributes(state, brigade, state.route(brigade))
+            new_legs = self.leg_attributes(state, brigade, route)
+
+            added |= new_legs - old_legs
+            removed |= old_legs - new_legs
+
+        return added, removed
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns the number of iterations, how many moves were tabu
+        or accepted by aspiration, and the iteration of the best state
+        """
+        return {
+            "iterations": self.iterations,
+            "tabu_moves": self.tabu_moves,
+            "aspirations": self.aspirations,
+            "best_iteration": self.best_iteration,
+        }
+
+    def optimize(  # pylint: disable=too-many-locals
+        self, initial_state: State
+    ) -> Generator[State, None, State]:
+        """
+        Runs the tabu search algorithm to optimize the specified initial state,
+        yielding the current state after each iteration and the best one at the end.
+
+        Returns:
+            State: the best state found by the tabu search algorithm
+        """
+        tabu_list = TabuList()
+
+        current_state = best_state = initial_state
+        fitness = best_fitness = self.fitness_func(initial_state)
+
+        self.iterations = self.tabu_moves = self.aspirations = 0
+        self.best_iteration = 0
+
+        while (
+            self.iterations < self.max_iterations
+            and self.iterations - self.best_iteration
+            < self.max_iterations_without_improvement
+        ):
+            yield current_state
+            print(f"Searching... (iteration: {self.iterations})")
+
+            moves = [
+                self.generator.propose(current_state)
+                for _ in range(self.neighborhood_size)
+            ]
+            deltas = self.fitness_deltas(current_state, moves)
+
+            chosen, chosen_removed = None, set()
+
+            for index in np.argsort(-deltas, kind="stable").tolist():
+                added, removed = self.move_legs(current_state, moves[index])
+
+                if not any(tabu_list.is_tabu(leg, self.iterations) for leg in added):
+                    chosen, chosen_removed = index, removed
+                    break
+
+                self.tabu_moves += 1
+
+                if fitness + deltas[index] > best_fitness:
+                    self.aspirations += 1
+                    chosen, chosen_removed = index, removed
+                    break
+
+            for index, (move, delta) in enumerate(zip(moves, deltas.tolist())):
+                if index != chosen:
+                    self.report_outcome(move, delta, accepted=False)
+
+            self.iterations += 1
+
+            # every sampled move is tabu
+            if chosen is None:
+                continue
+
+            move = moves[chosen]
+            current_state = move.apply(current_state)
+            fitness += float(deltas[chosen])
+
+            self.report_outcome(
+                move,
+                float(deltas[chosen]),
+                accepted=True,
+                new_best=fitness > best_fitness,
+            )
+
+            if fitness > best_fitness:
+                best_state, best_fitness = current_state, fitness
+                self.best_iteration = self.iterations
+                print("Better state found!")
+
+            for leg in chosen_removed:
+                tabu_list.add(leg, self.iterations + self.tenure)
+
+            tabu_list.purge(self.iterations)
+
+        yield best_state
+
+        return best_state
@@ -3,4 +3,5 @@ Classes and functions related to generating neighborhood states
 """
 
 from .generator import *
+from .move import *
 from .crossover import *
@@ -0,0 +1,252 @@
+"""
+Classes and methods related to generating neighboring states
+by applying a generator chosen according to how productive it has been
+"""
+
+import random
+from dataclasses import dataclass, fields
+from time import perf_counter
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from config import Config
+from simulation.state import State
+
+from .generator import Generator, MoveOutcome
+from .move import Move
+
+SEGMENT_LENGTH = int(Config.get("ALNS_SEGMENT_LENGTH", "100"))
+REACTION_FACTOR = float(Config.get("ALNS_REACTION_FACTOR", "0.1"))
+
+# the score a generator earns for each outcome of the moves it proposes
+OUTCOME_SCORES = {
+    MoveOutcome.NEW_BEST: 33.0,
+    MoveOutcome.IMPROVED: 9.0,
+    MoveOutcome.ACCEPTED: 13.0,
+    MoveOutcome.REJECTED: 0.0,
+}
+
+
+@dataclass
+class OperatorStatistics:  # pylint: disable=too-many-instance-attributes
+    """
+    What happened to the moves proposed by one of the generators
+    of an adaptive generator
+    """
+
+    calls: int = 0
+    new_best: int = 0
+    improved: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    total_fitness_delta: float = 0.0
+    propose_time: float = 0.0
+    evaluation_time: float = 0.0
+
+    # score and uses during the current segment
+    segment_score: float = 0.0
+    segment_uses: int = 0
+
+    def record(self, outcome: MoveOutcome, fitness_delta: float, move: Move):
+        """
+        Records the outcome of a move proposed by the generator,
+        along with the time the metaheuristic spent evaluating it
+        """
+
+        if outcome is MoveOutcome.NEW_BEST:
+            self.new_best += 1
+        elif outcome is MoveOutcome.IMPROVED:
+            self.improved += 1
+        elif outcome is MoveOutcome.ACCEPTED:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+
+        self.total_fitness_delta += fitness_delta
+        self.evaluation_time += move.evaluation_time
+
+        self.segment_score += OUTCOME_SCORES[outcome]
+        self.segment_uses += 1
+
+    def merge(self, copies: list["OperatorStatistics"]):
+        """
+        Adds to these statistics what copies of them recorded since they were copied
+        """
+
+        for statistic in fields(self):
+            value = getattr(self, statistic.name)
+
+            setattr(
+                self,
+                statistic.name,
+                value + sum(getattr(copy, statistic.name) - value for copy in copies),
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Returns these statistics as a dict of JSON serializable values
+        """
+
+        reported = self.new_best + self.improved + self.accepted + self.rejected
+
+        return {
+            "calls": self.calls,
+            "new_best": self.new_best,
+            "improved": self.improved,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "accept_rate": (
+                (reported - self.rejected) / reported if reported > 0 else 0.0
+            ),
+            "average_fitness_delta": (
+                self.total_fitness_delta / reported if reported > 0 else 0.0
+            ),
+            "propose_time": self.propose_time,
+            "evaluation_time": self.evaluation_time,
+            "total_time": self.propose_time + self.evaluation_time,
+        }
+
+
+class AdaptiveGenerator(Generator):
+    """
+    A class for generating neighboring states, applying one of the given generators
+    chosen by roulette wheel selection, in the style of adaptive large neighborhood
+    search.
+
+    Every generator earns a score for each move it proposes, depending on
+    whether the metaheuristic found a new best state with it, improved the current
+    state, accepted a worse state or rejected it. At the end of each segment
+    of proposals, the weight of every generator used in it moves towards
+    its average score, so the generators that pay off are chosen more often.
+
+    Moves are only built when the metaheuristic evaluates them, so the time
+    of every generator is reported both for proposing its moves
+    and for evaluating them
+
+    Attributes:
+        generators (list[Generator]): the generators to choose from
+        segment_length (int): the number of proposals between weight updates
+        reaction_factor (float): how much the weights move towards the scores
+            of the last segment, between 0 and 1
+        weights (list[float]): the current selection weight of each generator
+    """
+
+    def __init__(
+        self,
+        generators: list[Generator],
+        segment_length: int = SEGMENT_LENGTH,
+        reaction_factor: float = REACTION_FACTOR,
+    ):
+        assert len(generators) > 0, "No generators provided"
+
+        self.generators = generators
+        self.segment_length = segment_length
+        self.reaction_factor = reaction_factor
+
+        self.weights = [1.0] * len(generators)
+        self.operator_statistics = [OperatorStatistics() for _ in generators]
+        self.proposals = 0
+
+        # generator that proposed each move whose outcome is not known yet,
+        # forgotten along with the move if it is never reported
+        self.pending: WeakKeyDictionary[Move, int] = WeakKeyDictionary()
+
+    def propose(self, state: State) -> Move:
+        [operator] = random.choices(range(len(self.generators)), self.weights)
+        statistics = self.operator_statistics[operator]
+
+        start = perf_counter()
+        move = self.generators[operator].propose(state)
+        statistics.propose_time += perf_counter() - start
+        statistics.calls += 1
+
+        self.pending[move] = operator
+
+        self.proposals += 1
+        if self.proposals % self.segment_length == 0:
+            self.update_weights()
+
+        return move
+
+    def feedback(self, move: Move, outcome: MoveOutcome, fitness_delta: float):
+        operator = self.pending.pop(move, None)
+
+        if operator is None:
+            return
+
+        self.operator_statistics[operator].record(outcome, fitness_delta, move)
+        self.generators[operator].feedback(move, outcome, fitness_delta)
+
+    def update_weights(self):
+        """
+        Moves the weight of each generator used in the last segment
+        towards its average score in it, and starts a new segment
+        """
+
+        for operator, statistics in enumerate(self.operator_statistics):
+            if statistics.segment_uses == 0:
+                continue
+
+            average_score = statistics.segment_score / statistics.segment_uses
+
+            weight = self.weights[operator]
+            self.weights[operator] = weight + self.reaction_factor * (
+                average_score - weight
+            )
+
+            statistics.segment_score = 0.0
+            statistics.segment_uses = 0
+
+        # generators that never paid off are still chosen once in a while
+        floor = 0.01 * max(self.weights)
+        if floor == 0:
+            self.weights = [1.0] * len(self.weights)
+        else:
+            self.weights = [max(weight, floor) for weight in self.weights]
+
+    def merge(self, copies: list[Generator]):
+        adaptive_copies = [
+            copy for copy in copies if isinstance(copy, AdaptiveGenerator)
+        ]
+
+        if not adaptive_copies:
+            return
+
+        for operator, statistics in enumerate(self.operator_statistics):
+            statistics.merge(
+                [copy.operator_statistics[operator] for copy in adaptive_copies]
+            )
+            self.generators[operator].merge(
+                [copy.generators[operator] for copy in adaptive_copies]
+            )
+
+        self.proposals += sum(
+            copy.proposals - self.proposals for copy in adaptive_copies
+        )
+
+        # every copy adapted the weights to its own moves, so they are averaged
+        self.weights = [
+            sum(weights) / len(adaptive_copies)
+            for weights in zip(*(copy.weights for copy in adaptive_copies))
+        ]
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "operators": {
+                generator.name(): {**statistics.as_dict(), "weight": weight}
+                for generator, statistics, weight in zip(
+                    self.generators, self.operator_statistics, self.weights
+                )
+            }
+        }
+
+    def __getstate__(self):
+        # moves are not sent to other processes, so neither are their operators
+        return {key: value for key, value in self.__dict__.items() if key != "pending"}
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self.pending = WeakKeyDictionary()
+
+    def name(self) -> str:
+        return "Adaptive Generator"
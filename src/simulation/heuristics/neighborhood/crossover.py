@@ -4,11 +4,36 @@ Classes and functions related to performing a crossover on a given state
 
 import random
 
-from models.brigade import Brigade
-from models.route import Route
+import numpy as np
+
 from simulation.state import State
 
 from .generator import Generator
+from .move import Move
+
+
+class CrossoverMove(Move):
+    """
+    Exchanges the tails of two brigades' routes, starting at the same position
+    """
+
+    def __init__(self, first: int, second: int, crossover_point: int):
+        super().__init__()
+        self.first = first
+        self.second = second
+        self.crossover_point = crossover_point
+
+    def brigades(self, state: State) -> set[int]:
+        return {self.first, self.second}
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        point = self.crossover_point
+        first_route, second_route = state.route(self.second), state.route(self.first)
+
+        return {
+            self.first: np.concatenate((first_route[:point], second_route[point:])),
+            self.second: np.concatenate((second_route[:point], first_route[point:])),
+        }
 
 
 class CrossoverGenerator(Generator):
@@ -16,50 +41,22 @@ class CrossoverGenerator(Generator):
     Neighborhood generator that performs a crossover on the given state.
     """
 
-    def apply(self, state: State) -> State:
-        new_state = state.copy()
+    def propose(self, state: State) -> Move:
+        num_brigades = state.num_brigades
 
-        num_brigades = len(new_state.brigades)
+        # there is no other brigade to cross the routes with
+        if num_brigades < 2:
+            return Move()
 
         # select 2 random brigades
         i, j = random.sample(range(num_brigades), 2)
-        first_brigade, second_brigade = (
-            new_state.brigades[j],
-            new_state.brigades[i],
-        )
-
-        # remove the old brigades from the previous state
-        new_state.brigades = new_state.brigades[:i] + new_state.brigades[i + 1 :]
-
-        # need to account for the element being removed from the list
-        if i < j:
-            j -= 1
-
-        new_state.brigades = new_state.brigades[:j] + new_state.brigades[j + 1 :]
 
         # perform a crossover on the selected brigades
         crossover_point = random.randint(
-            0, (min(len(first_brigade.route), len(second_brigade.route)) - 1) // 2
-        )
-
-        new_state.brigades.append(
-            Brigade(
-                Route(
-                    first_brigade.route[:crossover_point]
-                    + second_brigade.route[crossover_point:]
-                )
-            )
-        )
-        new_state.brigades.append(
-            Brigade(
-                Route(
-                    second_brigade.route[:crossover_point]
-                    + first_brigade.route[crossover_point:]
-                )
-            )
+            0, min(len(state.route(i)), len(state.route(j))) // 2
         )
 
-        return new_state
+        return CrossoverMove(i, j, crossover_point)
 
     def name(self) -> str:
         return "Crossover"
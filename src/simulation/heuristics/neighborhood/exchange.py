@@ -0,0 +1,70 @@
+"""
+Classes and functions related to exchanging establishments between brigades
+"""
+
+import random
+
+import numpy as np
+
+from simulation.state import State
+
+from .generator import Generator
+from .move import Move, ScheduledMove
+
+
+class ExchangeMove(ScheduledMove):
+    """
+    Swaps the establishment at a position of a brigade's route
+    with the establishment at a position of another brigade's route
+    """
+
+    def __init__(
+        self, first: int, first_position: int, second: int, second_position: int
+    ):
+        super().__init__(
+            {
+                first: (first_position, first_position),
+                second: (second_position, second_position),
+            }
+        )
+        self.first = first
+        self.first_position = first_position
+        self.second = second
+        self.second_position = second_position
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        first_route = state.route(self.first).tolist()
+        second_route = state.route(self.second).tolist()
+
+        first_route[self.first_position], second_route[self.second_position] = (
+            second_route[self.second_position],
+            first_route[self.first_position],
+        )
+
+        return {self.first: first_route, self.second: second_route}
+
+
+class ExchangeGenerator(Generator):
+    """
+    Swaps two random establishments of different brigades
+    """
+
+    def propose(self, state: State) -> Move:
+        # there is no other brigade to move establishments to
+        if state.num_brigades < 2:
+            return Move()
+
+        first, second = random.sample(range(state.num_brigades), 2)
+
+        if len(state.route(first)) == 0 or len(state.route(second)) == 0:
+            return Move()
+
+        return ExchangeMove(
+            first,
+            random.randrange(len(state.route(first))),
+            second,
+            random.randrange(len(state.route(second))),
+        )
+
+    def name(self) -> str:
+        return "Exchange"
@@ -2,18 +2,74 @@
 Classes and methods related to generating neighboring states
 """
 
+from enum import Enum
+from typing import Any, Optional
+
 from simulation.state import State
 
+from .move import Move
+
+# the number of moves sampled by generators that cannot list their whole neighborhood
+NEIGHBORHOOD_SAMPLE_SIZE = 100
+
+
+class MoveOutcome(Enum):
+    """
+    What a metaheuristic did with a move it was proposed
+    """
+
+    NEW_BEST = "new_best"
+    IMPROVED = "improved"
+    ACCEPTED = "accepted"
+    REJECTED = "rejected"
+
 
 class Generator:
     """
     A class for generating neighboring states given a specific one.
     """
 
+    def propose(self, state: State) -> Move:  # pylint: disable=unused-argument
+        """Proposes a move from the specified state to one of its neighbors,
+        without building the neighboring state.
+
+        The default implementation proposes a move that changes nothing.
+
+        Args:
+            state (State): the old state
+
+        Returns:
+            Move: the move that leads to a "neighbor" of the old state
+        """
+        return Move()
+
+    def neighborhood(  # pylint: disable=unused-argument
+        self, state: State, brigades: Optional[set[int]] = None
+    ) -> list[Move]:
+        """Returns every move this generator can propose from the specified state,
+        so that a local search can tell when the state is a local optimum.
+
+        If brigades are given, only the moves that change the route of any of them
+        are needed, but moves that change other routes may be returned as well.
+
+        The default implementation returns a sample of the moves proposed
+        by **propose**, since not every generator can list its neighborhood.
+
+        Args:
+            state (State): the old state
+            brigades (set[int], optional): the brigades whose moves are needed,
+                all of them if not given
+
+        Returns:
+            list[Move]: the moves that lead to the "neighbors" of the old state
+        """
+        return [self.propose(state) for _ in range(NEIGHBORHOOD_SAMPLE_SIZE)]
+
     def apply(self, state: State) -> State:
         """Generates a neighboring state from the specified one.
 
-        The default implementation simply returns a copy of the old state.
+        The default implementation builds the state reached
+        by the move returned by **propose**.
 
         Args:
             state (State): the old state
@@ -21,7 +77,42 @@ class Generator:
         Returns:
             State:  new state, which should be a "neighbor" of the old one
         """
-        return state.copy()
+        return self.propose(state).apply(state)
+
+    def feedback(  # pylint: disable=unused-argument
+        self, move: Move, outcome: MoveOutcome, fitness_delta: float
+    ):
+        """Tells this generator what happened to a move it proposed,
+        so that it can adapt its future proposals.
+
+        The default implementation ignores it.
+
+        Args:
+            move (Move): the move that was proposed by this generator
+            outcome (MoveOutcome): what the metaheuristic did with the move
+            fitness_delta (float): how much the move changed the fitness of the state
+        """
+
+    def merge(self, copies: list["Generator"]):  # pylint: disable=unused-argument
+        """Merges into this generator what copies of it learned from feedback
+        in other processes, where they were sent as copies of this generator.
+
+        The default implementation learns nothing from feedback,
+        so there is nothing to merge.
+
+        Args:
+            copies (list[Generator]): the copies of this generator
+        """
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Returns statistics about the moves proposed by this generator,
+        as a dict of JSON serializable values.
+
+        The default implementation has no statistics to report.
+        """
+
+        return {}
 
     def name(self) -> str:
         """
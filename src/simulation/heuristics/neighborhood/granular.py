@@ -0,0 +1,224 @@
+"""
+Classes and functions related to generating neighbors that only make
+establishments adjacent to their nearest establishments
+"""
+
+import random
+from typing import Optional
+
+import numpy as np
+
+from config import Config
+from models.network import Network
+from simulation.state import State
+
+from .exchange import ExchangeMove
+from .generator import Generator
+from .move import Move
+from .mutation import SwapMove
+from .or_opt import OrOptMove
+from .relocate import RelocateMove
+from .two_opt import TwoOptMove
+from .two_opt_star import TwoOptStarMove
+
+NUM_NEAREST_NEIGHBORS = int(Config.get("GRANULAR_NEIGHBORS", "10"))
+
+
+class GranularGenerator(Generator):
+    """
+    A generator that picks a random establishment and one of its nearest neighbors,
+    and proposes a move that makes the neighbor follow the establishment.
+
+    Moves between establishments that are far apart are rarely improvements,
+    so restricting moves to candidate lists of nearby establishments
+    wastes far fewer evaluations on large instances.
+    The default implementation proposes a move that changes nothing.
+
+    Attributes:
+        num_neighbors (int): the number of nearest neighbors of each establishment
+            that moves can make adjacent to it
+    """
+
+    def __init__(self, num_neighbors: int = NUM_NEAREST_NEIGHBORS):
+        self.num_neighbors = num_neighbors
+
+        # nearest neighbors of each establishment, built for the first network seen
+        self.network: Optional[Network] = None
+        self.neighbors: list[list[int]] = []
+
+    def nearest_neighbors(self, network: Network) -> list[list[int]]:
+        """
+        Returns the nearest neighbors of every establishment in the given network,
+        indexed by establishment id, only building them once per network
+        """
+
+        if self.network is not network:
+            candidates = np.array([e.establishment_id for e in network.establishments])
+
+            self.neighbors = network.graph.nearest_neighbors(
+                self.num_neighbors, candidates
+            ).tolist()
+            self.network = network
+
+        return self.neighbors
+
+    def propose(self, state: State) -> Move:
+        establishments = state.network.establishments
+
+        if len(establishments) < 2:
+            return Move()
+
+        establishment = random.choice(establishments).establishment_id
+        neighbor = random.choice(self.nearest_neighbors(state.network)[establishment])
+
+        return self.propose_adjacent(
+            state, state.locate(establishment), state.locate(neighbor)
+        )
+
+    def neighborhood(
+        self, state: State, brigades: Optional[set[int]] = None
+    ) -> list[Move]:
+        neighbors = self.nearest_neighbors(state.network)
+        moves = []
+
+        for establishment in (e.establishment_id for e in state.network.establishments):
+            location = state.locate(establishment)
+
+            for neighbor in neighbors[establishment]:
+                neighbor_location = state.locate(neighbor)
+
+                # a move only changes the routes of the establishment and the neighbor
+                if (
+                    brigades is None
+                    or location[0] in brigades
+                    or neighbor_location[0] in brigades
+                ):
+                    moves.append(
+                        self.propose_adjacent(state, location, neighbor_location)
+                    )
+
+        return moves
+
+    def propose_adjacent(  # pylint: disable=unused-argument
+        self,
+        state: State,
+        establishment: tuple[int, int],
+        neighbor: tuple[int, int],
+    ) -> Move:
+        """
+        Proposes a move after which the neighbor follows the establishment,
+        given the brigade and position of each of them.
+
+        The default implementation proposes a move that changes nothing.
+        """
+
+        return Move()
+
+    def __getstate__(self):
+        # the candidate lists are rebuilt for the network of each process
+        return {**self.__dict__, "network": None, "neighbors": []}
+
+    def name(self) -> str:
+        return "Granular"
+
+
+class GranularRelocateGenerator(GranularGenerator):
+    """
+    Relocates the neighbor of a random establishment right after it
+    """
+
+    def propose_adjacent(
+        self,
+        state: State,
+        establishment: tuple[int, int],
+        neighbor: tuple[int, int],
+    ) -> Move:
+        brigade, position = establishment
+        neighbor_brigade, neighbor_position = neighbor
+
+        if neighbor_brigade != brigade:
+            return RelocateMove(
+                neighbor_brigade, neighbor_position, brigade, position + 1
+            )
+
+        if neighbor_position == position + 1:
+            return Move()
+
+        # the establishment moves back once the neighbor is taken out before it
+        destination = position if neighbor_position < position else position + 1
+
+        return OrOptMove(brigade, neighbor_position, 1, destination)
+
+    def name(self) -> str:
+        return "Granular Relocate"
+
+
+class GranularExchangeGenerator(GranularGenerator):
+    """
+    Swaps the neighbor of a random establishment
+    with the establishment that follows it
+    """
+
+    def propose_adjacent(
+        self,
+        state: State,
+        establishment: tuple[int, int],
+        neighbor: tuple[int, int],
+    ) -> Move:
+        brigade, position = establishment
+        neighbor_brigade, neighbor_position = neighbor
+
+        if position + 1 >= len(state.route(brigade)):
+            return Move()
+
+        if neighbor_brigade != brigade:
+            return ExchangeMove(
+                brigade, position + 1, neighbor_brigade, neighbor_position
+            )
+
+        if neighbor_position == position + 1:
+            return Move()
+
+        return SwapMove(brigade, position + 1, neighbor_position)
+
+    def name(self) -> str:
+        return "Granular Exchange"
+
+
+class GranularTwoOptGenerator(GranularGenerator):
+    """
+    Connects a random establishment to its neighbor, reversing the segment
+    between them if they share a route, or exchanging the tails of their routes
+    otherwise
+    """
+
+    def propose_adjacent(
+        self,
+        state: State,
+        establishment: tuple[int, int],
+        neighbor: tuple[int, int],
+    ) -> Move:
+        brigade, position = establishment
+        neighbor_brigade, neighbor_position = neighbor
+
+        if neighbor_brigade != brigade:
+            return TwoOptStarMove(
+                brigade,
+                position + 1,
+                neighbor_brigade,
+                neighbor_position,
+                len(state.route(brigade)),
+                len(state.route(neighbor_brigade)),
+            )
+
+        if neighbor_position > position + 1:
+            return TwoOptMove(brigade, position + 1, neighbor_position)
+
+        if neighbor_position < position - 1:
+            # the neighbor ends up right before the establishment instead
+            return TwoOptMove(brigade, neighbor_position, position - 1)
+
+        return Move()
+
+    def name(self) -> str:
+        return "Granular 2-opt"
@@ -0,0 +1,253 @@
+"""
+Classes and methods related to describing changes to a state
+without building the resulting state
+"""
+
+import numpy as np
+
+from simulation.evaluation import MIN_ROUTES_TO_VECTORIZE, route_waiting_times
+from simulation.schedule import changed_route_waiting_time
+from simulation.state import State
+
+
+class Move:
+    """
+    A change to a state, which is only applied to it once accepted.
+
+    A move is bound to the state it was proposed for,
+    and caches the routes and costs it computes for that state.
+    The default implementation changes nothing.
+    """
+
+    def __init__(self):
+        self.cached_routes: dict[int, list[int] | np.ndarray] | None = None
+        self.cached_waiting_times: dict[int, float] | None = None
+        self.cached_hashes: dict[int, int] | None = None
+
+        # seconds the metaheuristic spent building and evaluating this move's routes
+        self.evaluation_time = 0.0
+
+    def new_routes(
+        self, state: State  # pylint: disable=unused-argument
+    ) -> dict[int, list[int] | np.ndarray]:
+        """
+        Returns the routes of the brigades changed by this move, keyed by brigade.
+
+        The default implementation changes no routes.
+        """
+
+        return {}
+
+    def routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        """
+        Returns the routes of the brigades changed by this move,
+        only building them the first time
+        """
+
+        if self.cached_routes is None:
+            self.cached_routes = self.new_routes(state)
+
+        return self.cached_routes
+
+    def brigades(self, state: State) -> set[int]:
+        """
+        Returns the brigades whose routes this move changes.
+
+        The default implementation builds the new routes to find out.
+        """
+
+        return set(self.routes(state))
+
+    def new_hashes(
+        self, state: State  # pylint: disable=unused-argument
+    ) -> dict[int, int]:
+        """
+        Returns the hashes in the route cache of the routes changed by this move
+        that can be computed without hashing the whole routes, keyed by brigade.
+
+        The default implementation knows none of them,
+        so the routes are hashed when they are evaluated.
+        """
+
+        return {}
+
+    def route_hashes(self, state: State) -> dict[int, int]:
+        """
+        Returns the hashes of the routes changed by this move
+        that are known without hashing the whole routes,
+        only computing them the first time
+        """
+
+        if self.cached_hashes is None:
+            self.cached_hashes = self.new_hashes(state)
+
+        return self.cached_hashes
+
+    def delta(self, state: State) -> float:
+        """
+        Returns how much the value of the given state changes if this move is applied,
+        only evaluating the routes the move changes
+        """
+
+        routes = self.routes(state)
+
+        if self.cached_waiting_times is None:
+            hashes = self.route_hashes(state)
+
+            self.cached_waiting_times = dict(
+                zip(
+                    routes.keys(),
+                    route_waiting_times(
+                        list(routes.values()),
+                        state.network,
+                        [hashes.get(brigade) for brigade in routes],
+                    ),
+                )
+            )
+
+        return sum(self.cached_waiting_times.values()) - sum(
+            state.route_waiting_time(brigade) for brigade in routes
+        )
+
+    def apply(self, state: State) -> State:
+        """
+        Returns the state that results from applying this move to the given state
+        """
+
+        return state.with_routes(
+            self.routes(state), self.cached_waiting_times, self.route_hashes(state)
+        )
+
+
+class RoutesMove(Move):
+    """
+    A move that replaces the routes of some brigades with the given ones
+    """
+
+    def __init__(self, routes: dict[int, list[int] | np.ndarray]):
+        super().__init__()
+        self.replacement_routes = routes
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        return self.replacement_routes
+
+
+class ScheduledMove(Move):
+    """
+    A move that knows which positions of each route it changes,
+    given as the first and last changed positions of each new route, inclusive.
+
+    Its delta resumes each route's prefix schedule at the first change
+    instead of walking the whole route again
+    """
+
+    def __init__(self, changed_positions: dict[int, tuple[int, int]]):
+        super().__init__()
+        self.changed_positions = changed_positions
+
+    def brigades(self, state: State) -> set[int]:
+        return set(self.changed_positions)
+
+    def new_hashes(self, state: State) -> dict[int, int]:
+        cache = state.network.route_cache
+
+        if not cache.enabled:
+            return {}
+
+        # only the legs around the changed positions are hashed again
+        return {
+            brigade: cache.updated_hash(
+                state.route_hash(brigade),
+                state.route(brigade),
+                route,
+                *self.changed_positions[brigade],
+            )
+            for brigade, route in self.routes(state).items()
+        }
+
+    def delta(self, state: State) -> float:
+        routes = self.routes(state)
+
+        if self.cached_waiting_times is None:
+            self.cached_waiting_times = {
+                brigade: changed_route_waiting_time(
+                    state.schedule(brigade),
+                    list(route),
+                    *self.changed_positions[brigade],
+                    state.network,
+                )
+                for brigade, route in routes.items()
+            }
+
+        return sum(self.cached_waiting_times.values()) - sum(
+            state.route_waiting_time(brigade) for brigade in routes
+        )
+
+
+class IntraRouteMove(ScheduledMove):
+    """
+    A move that rearranges the establishments of a single brigade's route,
+    only changing the positions between *first_change* and *last_change*, inclusive
+    """
+
+    def __init__(self, brigade: int, first_change: int, last_change: int):
+        super().__init__({brigade: (first_change, last_change)})
+        self.brigade = brigade
+
+    def new_route(self, route: list[int]) -> list[int]:
+        """
+        Returns the given route of the brigade, rearranged by this move.
+
+        The default implementation changes nothing.
+        """
+
+        return route
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        # copy only the route being changed, the others are shared with the old state
+        return {self.brigade: self.new_route(state.route(self.brigade).tolist())}
+
+
+def evaluate_moves(state: State, moves: list[Move]) -> np.ndarray:
+    """
+    Returns the change in the given state's value caused by each of the given moves,
+    evaluating the routes changed by all of them together,
+    in a single vectorized pass when there are enough of them
+    """
+
+    routes = [move.routes(state) for move in moves]
+    new_routes = [route for changes in routes for route in changes.values()]
+
+    if len(new_routes) == 0:
+        return np.zeros(len(moves))
+
+    # hashing many routes at once in a vectorized pass is faster than
+    # updating their hashes one move at a time, so only few routes are updated
+    hashes = (
+        [
+            move.route_hashes(state).get(brigade)
+            for move, changes in zip(moves, routes)
+            for brigade in changes
+        ]
+        if state.network.route_cache.enabled
+        and len(new_routes) < MIN_ROUTES_TO_VECTORIZE
+        else None
+    )
+
+    waiting_times = route_waiting_times(new_routes, state.network, hashes)
+
+    deltas = np.empty(len(moves))
+    position = 0
+
+    for index, (move, changes) in enumerate(zip(moves, routes)):
+        move_waiting_times = waiting_times[position : position + len(changes)]
+        position += len(changes)
+
+        # the moves reuse these costs if they end up being applied
+        move.cached_waiting_times = dict(zip(changes.keys(), move_waiting_times))
+
+        deltas[index] = sum(move_waiting_times) - sum(
+            state.route_waiting_time(brigade) for brigade in changes
+        )
+
+    return deltas
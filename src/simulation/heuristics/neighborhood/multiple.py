@@ -5,6 +5,7 @@ Classes and methods related to generating neighboring states by applying several
 from simulation.state import State
 
 from .generator import Generator
+from .move import Move, RoutesMove
 
 
 class MultiGenerator(Generator):
@@ -15,13 +16,21 @@ class MultiGenerator(Generator):
     def __init__(self, generators: list[Generator]):
         self.generators = generators
 
-    def apply(self, state: State) -> State:
-        new_state = state.copy()
+    def propose(self, state: State) -> Move:
+        new_state = state
 
+        # each move is proposed for the state left by the previous one,
+        # so the intermediate states have to be built
         for generator in self.generators:
-            new_state = generator.apply(new_state)
-
-        return new_state
+            new_state = generator.propose(new_state).apply(new_state)
+
+        return RoutesMove(
+            {
+                brigade: route
+                for brigade, route in enumerate(new_state.routes)
+                if route is not state.route(brigade)
+            }
+        )
 
     def name(self) -> str:
         return "Multi Generator"
@@ -4,36 +4,52 @@ Classes and functions related to performing a mutation on a given state
 
 
 import random
-from models.brigade import Brigade
+
+import numpy as np
+
 from simulation.state import State
 
 from .generator import Generator
+from .move import Move
 
 
-class MutationGenerator(Generator):
+class SwapMove(Move):
     """
-    Performs a mutation on a given state, changing a single route
+    Swaps the establishments at two positions of a brigade's route
     """
 
-    def apply(self, state: State) -> State:
-        new_state = state.copy()
+    def __init__(self, brigade: int, first: int, second: int):
+        super().__init__()
+        self.brigade = brigade
+        self.first = first
+        self.second = second
 
-        brigade_index = random.randint(0, len(new_state.brigades) - 1)
+    def brigades(self, state: State) -> set[int]:
+        return {self.brigade}
 
-        brigade = new_state.brigades[brigade_index]
-        new_state.brigades = (
-            new_state.brigades[:brigade_index] + new_state.brigades[brigade_index + 1 :]
-        )
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        # copy only the route being changed, the others are shared with the old state
+        route = state.route(self.brigade).tolist()
+        route[self.first], route[self.second] = route[self.second], route[self.first]
 
-        num_establishments = len(brigade.route)
-        i, j = random.sample(range(num_establishments), 2)
+        return {self.brigade: route}
 
-        old_route = brigade.route
-        old_route[i], old_route[j] = old_route[j], old_route[i]
 
-        new_state.brigades.append(Brigade(old_route))
+class MutationGenerator(Generator):
+    """
+    Performs a mutation on a given state, changing a single route
+    """
+
+    def propose(self, state: State) -> Move:
+        brigade_index = random.randint(0, state.num_brigades - 1)
+
+        num_establishments = len(state.route(brigade_index))
+        if num_establishments < 2:
+            return Move()
+
+        i, j = random.sample(range(num_establishments), 2)
 
-        return new_state
+        return SwapMove(brigade_index, i, j)
 
     def name(self) -> str:
         return "Mutation"
@@ -0,0 +1,79 @@
+"""
+Classes and functions related to performing an Or-opt move on a given state
+"""
+
+import random
+from typing import Optional
+
+from simulation.state import State
+
+from .generator import Generator
+from .move import IntraRouteMove, Move
+
+# the longest segment that an Or-opt move relocates
+MAX_SEGMENT_LENGTH = 3
+
+
+class OrOptMove(IntraRouteMove):
+    """
+    Moves a short segment of a brigade's route to another position of the same route
+    """
+
+    def __init__(self, brigade: int, start: int, length: int, destination: int):
+        super().__init__(
+            brigade,
+            min(start, destination),
+            max(start, destination) + length - 1,
+        )
+        self.start = start
+        self.length = length
+        self.destination = destination
+
+    def new_route(self, route: list[int]) -> list[int]:
+        segment = route[self.start : self.start + self.length]
+        del route[self.start : self.start + self.length]
+
+        # the destination is a position of the route without the segment
+        route[self.destination : self.destination] = segment
+
+        return route
+
+
+class OrOptGenerator(Generator):
+    """
+    Performs an Or-opt move on a given state, relocating a segment
+    of up to three establishments within a single route
+    """
+
+    def propose(self, state: State) -> Move:
+        brigade_index = random.randint(0, state.num_brigades - 1)
+        num_establishments = len(state.route(brigade_index))
+
+        if num_establishments < 2:
+            return Move()
+
+        length = random.randint(1, min(MAX_SEGMENT_LENGTH, num_establishments - 1))
+        start = random.randrange(num_establishments - length + 1)
+
+        # any other position of the route without the segment
+        destination = random.randrange(num_establishments - length)
+        if destination >= start:
+            destination += 1
+
+        return OrOptMove(brigade_index, start, length, destination)
+
+    def neighborhood(
+        self, state: State, brigades: Optional[set[int]] = None
+    ) -> list[Move]:
+        return [
+            OrOptMove(brigade, start, length, destination)
+            for brigade, route in enumerate(state.routes)
+            if brigades is None or brigade in brigades
+            for length in range(1, min(MAX_SEGMENT_LENGTH, len(route) - 1) + 1)
+            for start in range(len(route) - length + 1)
+            for destination in range(len(route) - length + 1)
+            if destination != start
+        ]
+
+    def name(self) -> str:
+        return "Or-opt"
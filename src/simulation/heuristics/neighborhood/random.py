@@ -1,12 +1,15 @@
 """
-Classes and methods related to generating 
+Classes and methods related to generating
 neighboring states by applying a random generator
 """
 
 import random
+from typing import Optional
+
 from simulation.state import State
 
 from .generator import Generator
+from .move import Move
 
 
 class RandomGenerator(Generator):
@@ -22,13 +25,23 @@ class RandomGenerator(Generator):
         self.generators = generators
         self.generator = self.random_generator()
 
-    def apply(self, state: State) -> State:
-        new_state = self.generator.apply(state)
+    def propose(self, state: State) -> Move:
+        move = self.generator.propose(state)
 
         if self.randomize:
             self.generator = self.random_generator()
 
-        return new_state
+        return move
+
+    def neighborhood(
+        self, state: State, brigades: Optional[set[int]] = None
+    ) -> list[Move]:
+        # any of the generators may be applied, so the neighborhoods add up
+        return [
+            move
+            for generator in self.generators
+            for move in generator.neighborhood(state, brigades)
+        ]
 
     def random_generator(self) -> Generator:
         """Returns a random generator from the list of generators
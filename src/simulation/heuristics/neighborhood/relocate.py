@@ -0,0 +1,111 @@
+"""
+Classes and functions related to relocating an establishment to another brigade
+"""
+
+import random
+
+import numpy as np
+
+from simulation.segment import stop_summary
+from simulation.state import State
+
+from .generator import Generator
+from .move import Move, ScheduledMove
+
+
+class RelocateMove(ScheduledMove):
+    """
+    Removes the establishment at a position of a brigade's route
+    and inserts it at a position of another brigade's route
+    """
+
+    def __init__(self, source: int, position: int, target: int, insertion: int):
+        super().__init__(
+            {
+                # nothing is inserted in the source route, only removed
+                source: (position, position - 1),
+                target: (insertion, insertion),
+            }
+        )
+        self.source = source
+        self.position = position
+        self.target = target
+        self.insertion = insertion
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        source_route = state.route(self.source).tolist()
+        target_route = state.route(self.target).tolist()
+
+        target_route.insert(self.insertion, source_route.pop(self.position))
+
+        return {self.source: source_route, self.target: target_route}
+
+
+def best_insertion(  # pylint: disable=too-many-locals
+    state: State, brigade: int, establishment: int
+) -> tuple[int, float]:
+    """
+    Returns the position of the given brigade's route where inserting
+    the given establishment results in the least waiting time,
+    along with the waiting time of the resulting route.
+
+    Each insertion is evaluated from the prefix schedule of the route,
+    the summary of the inserted establishment and the summary of the route's suffix,
+    so no part of the route is walked again
+    """
+
+    network = state.network
+    graph = network.graph
+
+    schedule = state.schedule(brigade)
+    suffixes = state.suffixes(brigade)
+    stop = stop_summary(establishment, network)
+
+    route = state.route(brigade).tolist()
+    previous = network.depot.establishment_id
+
+    best_position, best_waiting_time = 0, float("inf")
+
+    for position in range(len(route) + 1):
+        arrival = schedule.departures[position] + graph.get(previous, establishment)
+        departure = stop.departure(arrival)
+
+        waiting_time = schedule.waiting_times[position] + stop.waiting_time(arrival)
+
+        if position < len(route):
+            waiting_time += suffixes[position].waiting_time(
+                departure + graph.get(establishment, route[position])
+            )
+            previous = route[position]
+
+        if waiting_time < best_waiting_time:
+            best_position, best_waiting_time = position, waiting_time
+
+    return best_position, best_waiting_time
+
+
+class RelocateGenerator(Generator):
+    """
+    Relocates a random establishment to the best position of another brigade's route
+    """
+
+    def propose(self, state: State) -> Move:
+        # there is no other brigade to move establishments to
+        if state.num_brigades < 2:
+            return Move()
+
+        source, target = random.sample(range(state.num_brigades), 2)
+        num_establishments = len(state.route(source))
+
+        if num_establishments == 0:
+            return Move()
+
+        position = random.randrange(num_establishments)
+        establishment = int(state.route(source)[position])
+
+        insertion, _ = best_insertion(state, target, establishment)
+
+        return RelocateMove(source, position, target, insertion)
+
+    def name(self) -> str:
+        return "Relocate"
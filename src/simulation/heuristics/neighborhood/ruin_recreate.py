@@ -0,0 +1,452 @@
+"""
+Classes and functions related to removing establishments from the brigades' routes
+and inserting them back where they make the brigades wait the least
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from config import Config
+from models.establishment import HOURS_PER_DAY
+from models.network import Network
+from simulation.segment import SECONDS_PER_DAY, SECONDS_PER_HOUR
+from simulation.state import State
+
+from .generator import Generator
+from .move import Move
+
+NUM_REMOVED = int(Config.get("RUIN_NUM_REMOVED", "10"))
+REGRET = int(Config.get("RUIN_REGRET", "2"))
+
+# the higher, the more worst removal sticks to the establishments that wait the most
+WORST_REMOVAL_DETERMINISM = 3
+
+
+@dataclass(frozen=True)
+class InsertionSlots:  # pylint: disable=too-many-instance-attributes
+    """
+    Every position of some brigades' routes where an establishment can be inserted,
+    with what is needed to evaluate the insertion without walking the route:
+    the prefix schedule before the position and the summary of the suffix after it.
+
+    Slot *k* of a route of length *n* inserts before its *k*-th establishment,
+    and slot *n* appends to it. The slots of each brigade are contiguous
+    """
+
+    brigades: np.ndarray
+    positions: np.ndarray
+    previous: np.ndarray
+    next: np.ndarray
+    departures: np.ndarray
+    prefix_waiting_times: np.ndarray
+    route_waiting_times: np.ndarray
+    suffix_durations: np.ndarray
+    suffix_starts: np.ndarray
+    suffix_departures: np.ndarray
+
+    @staticmethod
+    def of_brigade(state: State, brigade: int) -> "InsertionSlots":
+        """
+        Returns the insertion slots of the given brigade's route
+        """
+
+        depot = state.network.depot.establishment_id
+        route = state.route(brigade).tolist()
+
+        schedule = state.schedule(brigade)
+        suffixes = state.suffixes(brigade)
+
+        width = max(len(suffix.starts) for suffix in suffixes)
+
+        # missing pieces never start, and a brigade that never waits has no departure
+        suffix_starts = np.array(
+            [
+                suffix.starts + [math.inf] * (width - len(suffix.starts))
+                for suffix in suffixes
+            ]
+        )
+        suffix_departures = np.array(
+            [
+                [math.nan if d is None else d for d in suffix.departures]
+                + [math.nan] * (width - len(suffix.departures))
+                for suffix in suffixes
+            ]
+        )
+
+        return InsertionSlots(
+            np.full(len(route) + 1, brigade, dtype=np.intp),
+            np.arange(len(route) + 1),
+            np.array([depot, *route], dtype=np.intp),
+            np.array([*route, depot], dtype=np.intp),
+            np.array(schedule.departures),
+            np.array(schedule.waiting_times),
+            np.full(len(route) + 1, schedule.waiting_time),
+            np.array([suffix.duration for suffix in suffixes]),
+            suffix_starts,
+            suffix_departures,
+        )
+
+    @staticmethod
+    def concatenate(slots: list["InsertionSlots"]) -> "InsertionSlots":
+        """
+        Returns the slots of every one of the given slots, in order
+        """
+
+        width = max(s.suffix_starts.shape[1] for s in slots)
+        size = sum(len(s.brigades) for s in slots)
+
+        suffix_starts = np.full((size, width), np.inf)
+        suffix_departures = np.full((size, width), np.nan)
+
+        start = 0
+        for s in slots:
+            end = start + len(s.brigades)
+            suffix_starts[start:end, : s.suffix_starts.shape[1]] = s.suffix_starts
+            suffix_departures[start:end, : s.suffix_departures.shape[1]] = (
+                s.suffix_departures
+            )
+            start = end
+
+        return InsertionSlots(
+            np.concatenate([s.brigades for s in slots]),
+            np.concatenate([s.positions for s in slots]),
+            np.concatenate([s.previous for s in slots]),
+            np.concatenate([s.next for s in slots]),
+            np.concatenate([s.departures for s in slots]),
+            np.concatenate([s.prefix_waiting_times for s in slots]),
+            np.concatenate([s.route_waiting_times for s in slots]),
+            np.concatenate([s.suffix_durations for s in slots]),
+            suffix_starts,
+            suffix_departures,
+        )
+
+    def insertion_costs(  # pylint: disable=too-many-locals
+        self, establishments: np.ndarray, network: Network
+    ) -> np.ndarray:
+        """
+        Returns how much the waiting time of the routes increases
+        when inserting each of the given establishments at each slot,
+        as an (establishments x slots) matrix, evaluating every insertion at once
+        """
+
+        graph = network.graph.mat
+        establishment = establishments[:, np.newaxis]
+
+        # the brigade waits for the inserted establishment to open, if needed
+        arrival = self.departures + graph[self.previous, establishment]
+        cur_hour = (arrival // SECONDS_PER_HOUR).astype(np.intp)
+
+        hours_to_wait = network.hours_until_open[
+            establishment, cur_hour % HOURS_PER_DAY
+        ]
+        waiting_time = np.where(
+            hours_to_wait == 0,
+            0.0,
+            (cur_hour + hours_to_wait) * SECONDS_PER_HOUR - arrival,
+        )
+
+        departure = (
+            arrival + waiting_time + network.inspection_times_array[establishment]
+        )
+
+        # and then for the rest of the route, read from the piece it arrives in
+        next_arrival = departure + graph[establishment, self.next]
+
+        day = np.floor(next_arrival / SECONDS_PER_DAY)
+        time_of_day = next_arrival - day * SECONDS_PER_DAY
+
+        piece = (self.suffix_starts <= time_of_day[..., np.newaxis]).sum(axis=-1) - 1
+        suffix_departure = self.suffix_departures[np.arange(len(self.next)), piece]
+
+        suffix_waiting_time = np.where(
+            np.isnan(suffix_departure),
+            0.0,
+            day * SECONDS_PER_DAY
+            + suffix_departure
+            - next_arrival
+            - self.suffix_durations,
+        )
+
+        return (
+            self.prefix_waiting_times
+            + waiting_time
+            + suffix_waiting_time
+            - self.route_waiting_times
+        )
+
+
+def recreate(  # pylint: disable=too-many-locals
+    state: State,
+    establishments: list[int],
+    regret: int,
+    slots: Optional[list[InsertionSlots]] = None,
+) -> tuple[State, set[int]]:
+    """
+    Inserts the given establishments into the routes of the given state,
+    one at a time, and returns the resulting state along with the brigades
+    whose routes changed.
+
+    With a regret of 1, the establishment that is cheapest to insert goes first.
+    Otherwise, the establishment that would lose the most by not being inserted
+    into its best route now, compared to its next *regret - 1* best routes, goes first,
+    at its cheapest position.
+
+    The insertion slots of each brigade's route are built from the state,
+    unless they are given
+    """
+
+    slots = (
+        slots
+        if slots is not None
+        else [InsertionSlots.of_brigade(state, b) for b in range(state.num_brigades)]
+    )
+    changed: set[int] = set()
+
+    remaining = np.array(establishments, dtype=np.intp)
+    regret = min(regret, state.num_brigades)
+
+    while len(remaining) > 0:
+        all_slots = InsertionSlots.concatenate(slots)
+        costs = all_slots.insertion_costs(remaining, state.network)
+
+        best_slots = np.argmin(costs, axis=1)
+        best_costs = costs[np.arange(len(remaining)), best_slots]
+
+        if regret <= 1:
+            chosen = int(np.argmin(best_costs))
+        else:
+            # cheapest insertion into each brigade's route
+            first_slots = np.flatnonzero(all_slots.positions == 0)
+            brigade_costs = np.minimum.reduceat(costs, first_slots, axis=1)
+            brigade_costs = np.partition(brigade_costs, regret - 1, axis=1)
+
+            # the best route is among the first ones, in no particular order
+            regrets = brigade_costs[:, :regret].sum(axis=1) - regret * best_costs
+
+            # ties go to the establishment that is cheapest to insert
+            chosen = int(np.lexsort((best_costs, -regrets))[0])
+
+        slot = int(best_slots[chosen])
+        brigade = int(all_slots.brigades[slot])
+        position = int(all_slots.positions[slot])
+
+        route = state.route(brigade).tolist()
+        route.insert(position, int(remaining[chosen]))
+
+        state = state.with_routes({brigade: route})
+        state.waiting_times[brigade] = state.schedule(brigade).waiting_time
+
+        slots[brigade] = InsertionSlots.of_brigade(state, brigade)
+        changed.add(brigade)
+
+        remaining = np.delete(remaining, chosen)
+
+    return state, changed
+
+
+class RuinRecreateMove(Move):
+    """
+    Removes the given establishments from the brigades' routes
+    and inserts them back with **recreate**
+    """
+
+    def __init__(
+        self,
+        removed: list[int],
+        regret: int = REGRET,
+        slots_cache: Optional[dict[int, tuple[np.ndarray, InsertionSlots]]] = None,
+    ):
+        super().__init__()
+        self.removed = removed
+        self.regret = regret
+
+        # insertion slots of each brigade's route, along with that route,
+        # shared by the moves proposed for states that keep the route
+        self.slots_cache = slots_cache if slots_cache is not None else {}
+
+    def route_slots(self, state: State, brigade: int) -> InsertionSlots:
+        """
+        Returns the insertion slots of the given brigade's route,
+        only building them if the route changed since they were cached
+        """
+
+        route = state.route(brigade)
+        cached_route, slots = self.slots_cache.get(brigade, (None, None))
+
+        if cached_route is not route or slots is None:
+            slots = InsertionSlots.of_brigade(state, brigade)
+            self.slots_cache[brigade] = (route, slots)
+
+        return slots
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        ruined: dict[int, list[int]] = {}
+
+        for establishment in self.removed:
+            brigade, _ = state.locate(establishment)
+            route = ruined.setdefault(brigade, state.route(brigade).tolist())
+            route.remove(establishment)
+
+        ruined_state = state.with_routes(ruined)
+
+        slots = [
+            (
+                InsertionSlots.of_brigade(ruined_state, brigade)
+                if brigade in ruined
+                else self.route_slots(state, brigade)
+            )
+            for brigade in range(state.num_brigades)
+        ]
+
+        recreated, changed = recreate(ruined_state, self.removed, self.regret, slots)
+        changed |= ruined.keys()
+
+        # the routes were evaluated while recreating them
+        self.cached_waiting_times = {
+            brigade: recreated.schedule(brigade).waiting_time for brigade in changed
+        }
+
+        return {brigade: recreated.route(brigade) for brigade in changed}
+
+
+class RuinRecreateGenerator(Generator):
+    """
+    A generator that ruins part of a state, by removing some establishments
+    from the brigades' routes, and recreates it by inserting them back
+    with cheapest or regret insertion.
+
+    The default implementation removes random establishments
+
+    Attributes:
+        num_removed (int): the number of establishments to remove
+        regret (int): the number of best routes compared by regret insertion,
+            1 for cheapest insertion
+    """
+
+    def __init__(self, num_removed: int = NUM_REMOVED, regret: int = REGRET):
+        self.num_removed = num_removed
+        self.regret = regret
+
+        # insertion slots shared by the moves this generator proposes
+        self.slots_cache: dict[int, tuple[np.ndarray, InsertionSlots]] = {}
+
+    def propose(self, state: State) -> Move:
+        routed = [
+            establishment for route in state.routes for establishment in route.tolist()
+        ]
+
+        if len(routed) == 0 or state.num_brigades == 0:
+            return Move()
+
+        return RuinRecreateMove(
+            self.ruin(state, routed, min(self.num_removed, len(routed))),
+            self.regret,
+            self.slots_cache,
+        )
+
+    def ruin(  # pylint: disable=unused-argument
+        self, state: State, routed: list[int], num_removed: int
+    ) -> list[int]:
+        """
+        Returns the establishments to remove out of the routed ones
+        """
+
+        return random.sample(routed, num_removed)
+
+    def __getstate__(self):
+        # the slots belong to the states of this process
+        return {**self.__dict__, "slots_cache": {}}
+
+    def name(self) -> str:
+        return "Random Ruin and Recreate"
+
+
+class ProximityRuinRecreateGenerator(RuinRecreateGenerator):
+    """
+    Removes a random establishment along with the establishments
+    closest to it, by their coordinates, so that they can be rearranged together
+    """
+
+    def __init__(self, num_removed: int = NUM_REMOVED, regret: int = REGRET):
+        super().__init__(num_removed, regret)
+
+        # coordinates of each establishment, built for the first network seen
+        self.network: Optional[Network] = None
+        self.latitudes = np.empty(0)
+        self.longitudes = np.empty(0)
+
+    def coordinates(self, network: Network) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the latitude and longitude of every establishment,
+        indexed by establishment id, only building them once per network
+        """
+
+        if self.network is not network:
+            self.latitudes = np.full(len(network.graph.mat), np.nan)
+            self.longitudes = np.full(len(network.graph.mat), np.nan)
+
+            for establishment_id, establishment in network.establishments_by_id.items():
+                self.latitudes[establishment_id] = establishment.coords.latitude
+                self.longitudes[establishment_id] = establishment.coords.longitude
+
+            self.network = network
+
+        return self.latitudes, self.longitudes
+
+    def ruin(self, state: State, routed: list[int], num_removed: int) -> list[int]:
+        latitudes, longitudes = self.coordinates(state.network)
+        candidates = np.array(routed, dtype=np.intp)
+
+        seed = random.choice(routed)
+        distances = state.network.establishments_by_id[seed].coords.round_dists_to(
+            latitudes[candidates], longitudes[candidates]
+        )
+
+        # the seed is at distance 0, so it is always removed
+        return candidates[np.argsort(distances)[:num_removed]].tolist()
+
+    def __getstate__(self):
+        # the coordinates are rebuilt for the network of each process
+        return {
+            **super().__getstate__(),
+            "network": None,
+            "latitudes": np.empty(0),
+            "longitudes": np.empty(0),
+        }
+
+    def name(self) -> str:
+        return "Proximity Ruin and Recreate"
+
+
+class WorstRuinRecreateGenerator(RuinRecreateGenerator):
+    """
+    Removes the establishments the brigades wait the longest for,
+    with some randomness so that the same ones are not always removed
+    """
+
+    def ruin(self, state: State, routed: list[int], num_removed: int) -> list[int]:
+        waiting_times = np.concatenate(
+            [
+                np.diff(state.schedule(brigade).waiting_times)
+                for brigade in range(state.num_brigades)
+            ]
+        )
+
+        # routed establishments are listed route by route, like their waiting times
+        ranking = np.argsort(-waiting_times, kind="stable").tolist()
+        removed: list[int] = []
+
+        for _ in range(num_removed):
+            rank = math.floor(
+                random.random() ** WORST_REMOVAL_DETERMINISM * len(ranking)
+            )
+            removed.append(routed[ranking.pop(rank)])
+
+        return removed
+
+    def name(self) -> str:
+        return "Worst Ruin and Recreate"
@@ -4,11 +4,10 @@ Classes and functions related to performing a mutation on a given state
 
 
 import random
-from models.brigade import Brigade
-from models.route import Route
 from simulation.state import State
 
 from .generator import Generator
+from .move import Move, RoutesMove
 
 
 class ShuffleGenerator(Generator):
@@ -16,22 +15,14 @@ class ShuffleGenerator(Generator):
     Performs a shuffle on a given state, changing every route
     """
 
-    def apply(self, state: State) -> State:
-        new_state = state.copy()
+    def propose(self, state: State) -> Move:
+        brigade_index = random.randint(0, state.num_brigades - 1)
 
-        brigade_index = random.randint(0, len(new_state.brigades) - 1)
+        # copy only the route being changed, the others are shared with the old state
+        route = state.route(brigade_index).tolist()
+        random.shuffle(route)
 
-        brigade = new_state.brigades[brigade_index]
-        new_state.brigades = (
-            new_state.brigades[:brigade_index] + new_state.brigades[brigade_index + 1 :]
-        )
-
-        route_establishments = brigade.route.route_establishments
-        random.shuffle(route_establishments)
-
-        new_state.brigades.append(Brigade(Route(route_establishments)))
-
-        return new_state
+        return RoutesMove({brigade_index: route})
 
     def name(self) -> str:
         return "Shuffle"
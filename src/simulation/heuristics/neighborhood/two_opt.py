@@ -0,0 +1,58 @@
+"""
+Classes and functions related to performing a 2-opt move on a given state
+"""
+
+import random
+from typing import Optional
+
+from simulation.state import State
+
+from .generator import Generator
+from .move import IntraRouteMove, Move
+
+
+class TwoOptMove(IntraRouteMove):
+    """
+    Reverses the segment of a brigade's route between two positions, inclusive
+    """
+
+    def __init__(self, brigade: int, start: int, end: int):
+        super().__init__(brigade, start, end)
+        self.start = start
+        self.end = end
+
+    def new_route(self, route: list[int]) -> list[int]:
+        route[self.start : self.end + 1] = route[self.start : self.end + 1][::-1]
+
+        return route
+
+
+class TwoOptGenerator(Generator):
+    """
+    Performs a 2-opt move on a given state, reversing a segment of a single route
+    """
+
+    def propose(self, state: State) -> Move:
+        brigade_index = random.randint(0, state.num_brigades - 1)
+        num_establishments = len(state.route(brigade_index))
+
+        if num_establishments < 2:
+            return Move()
+
+        start, end = sorted(random.sample(range(num_establishments), 2))
+
+        return TwoOptMove(brigade_index, start, end)
+
+    def neighborhood(
+        self, state: State, brigades: Optional[set[int]] = None
+    ) -> list[Move]:
+        return [
+            TwoOptMove(brigade, start, end)
+            for brigade, route in enumerate(state.routes)
+            if brigades is None or brigade in brigades
+            for start in range(len(route) - 1)
+            for end in range(start + 1, len(route))
+        ]
+
+    def name(self) -> str:
+        return "2-opt"
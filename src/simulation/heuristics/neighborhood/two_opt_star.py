@@ -0,0 +1,103 @@
+"""
+Classes and functions related to performing a 2-opt* move on a given state
+"""
+
+import random
+
+import numpy as np
+
+from simulation.schedule import spliced_route_waiting_time
+from simulation.state import State
+
+from .generator import Generator
+from .move import Move, ScheduledMove
+
+
+class TwoOptStarMove(ScheduledMove):
+    """
+    Exchanges the tails of two brigades' routes, each starting at its own position,
+    given the lengths of both routes in the state the move is proposed for
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        first: int,
+        first_point: int,
+        second: int,
+        second_point: int,
+        first_length: int,
+        second_length: int,
+    ):
+        # every position after the crossing points changes
+        super().__init__(
+            {
+                first: (first_point, first_point + second_length - second_point - 1),
+                second: (second_point, second_point + first_length - first_point - 1),
+            }
+        )
+        self.first = first
+        self.first_point = first_point
+        self.second = second
+        self.second_point = second_point
+
+    def new_routes(self, state: State) -> dict[int, list[int] | np.ndarray]:
+        first_route = state.route(self.first)
+        second_route = state.route(self.second)
+
+        new_first = np.concatenate(
+            (first_route[: self.first_point], second_route[self.second_point :])
+        )
+        new_second = np.concatenate(
+            (second_route[: self.second_point], first_route[self.first_point :])
+        )
+
+        return {self.first: new_first, self.second: new_second}
+
+    def delta(self, state: State) -> float:
+        if self.cached_waiting_times is None:
+            # each new route is a prefix of its old route followed by a suffix
+            # of the other one, so neither is walked past the crossing point
+            self.cached_waiting_times = {
+                brigade: spliced_route_waiting_time(
+                    state.schedule(brigade),
+                    state.route(brigade),
+                    point,
+                    state.suffixes(other)[other_point],
+                    state.network,
+                )
+                for brigade, point, other, other_point in (
+                    (self.first, self.first_point, self.second, self.second_point),
+                    (self.second, self.second_point, self.first, self.first_point),
+                )
+            }
+
+        return sum(self.cached_waiting_times.values()) - (
+            state.route_waiting_time(self.first) + state.route_waiting_time(self.second)
+        )
+
+
+class TwoOptStarGenerator(Generator):
+    """
+    Performs a 2-opt* move on a given state, exchanging the tails
+    of two random brigades' routes at random positions
+    """
+
+    def propose(self, state: State) -> Move:
+        # there is no other brigade to move establishments to
+        if state.num_brigades < 2:
+            return Move()
+
+        first, second = random.sample(range(state.num_brigades), 2)
+        first_length, second_length = len(state.route(first)), len(state.route(second))
+
+        return TwoOptStarMove(
+            first,
+            random.randint(0, first_length),
+            second,
+            random.randint(0, second_length),
+            first_length,
+            second_length,
+        )
+
+    def name(self) -> str:
+        return "2-opt*"
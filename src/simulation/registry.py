@@ -0,0 +1,307 @@
+"""
+The heuristics that can be picked by name through the configuration
+"""
+
+import os
+from typing import Callable
+
+from config import Config
+
+from .heuristics.initial_state.closest import ClosestGenerator
+from .heuristics.initial_state.generator import Generator as InitialStateGenerator
+from .heuristics.initial_state.random import (
+    RandomGenerator as RandomInitialStateGenerator,
+)
+from .heuristics.meta.budget import Budget
+from .heuristics.meta.genetic_algorithm import GeneticAlgorithm
+from .heuristics.meta.island_model import IslandGeneticAlgorithm
+from .heuristics.meta.local_search import (
+    IteratedLocalSearch,
+    VariableNeighborhoodDescent,
+)
+from .heuristics.meta.metaheuristic import Metaheuristic, waiting_time_fitness
+from .heuristics.meta.multi_start import MultiStartSimulatedAnnealing
+from .heuristics.meta.parallel_tempering import ParallelTempering
+from .heuristics.meta.simulated_annealing import SimulatedAnnealing
+from .heuristics.meta.tabu_search import TabuSearch
+from .heuristics.neighborhood.adaptive import AdaptiveGenerator
+from .heuristics.neighborhood.crossover import CrossoverGenerator
+from .heuristics.neighborhood.exchange import ExchangeGenerator
+from .heuristics.neighborhood.generator import Generator as NeighborhoodGenerator
+from .heuristics.neighborhood.granular import (
+    GranularExchangeGenerator,
+    GranularRelocateGenerator,
+    GranularTwoOptGenerator,
+)
+from .heuristics.neighborhood.multiple import MultiGenerator
+from .heuristics.neighborhood.mutation import MutationGenerator
+from .heuristics.neighborhood.or_opt import OrOptGenerator
+from .heuristics.neighborhood.random import (
+    RandomGenerator as RandomNeighborhoodGenerator,
+)
+from .heuristics.neighborhood.relocate import RelocateGenerator
+from .heuristics.neighborhood.ruin_recreate import (
+    ProximityRuinRecreateGenerator,
+    RuinRecreateGenerator,
+    WorstRuinRecreateGenerator,
+)
+from .heuristics.neighborhood.shuffle import ShuffleGenerator
+from .heuristics.neighborhood.two_opt import TwoOptGenerator
+from .heuristics.neighborhood.two_opt_star import TwoOptStarGenerator
+from .simulation import SimulationConfig
+from .state import State
+
+# the initial state generators, keyed by their configuration name
+INITIAL_STATE_GENERATORS: dict[str, Callable[[], InitialStateGenerator]] = {
+    "default": InitialStateGenerator,
+    "closest": ClosestGenerator,
+    "random": RandomInitialStateGenerator,
+}
+
+# the neighborhood generators, keyed by their configuration name
+NEIGHBORHOOD_GENERATORS: dict[str, Callable[[], NeighborhoodGenerator]] = {
+    "default": NeighborhoodGenerator,
+    "crossover": CrossoverGenerator,
+    "mutation": MutationGenerator,
+    "random": lambda: RandomNeighborhoodGenerator(
+        [
+            CrossoverGenerator(),
+            MutationGenerator(),
+            ShuffleGenerator(),
+        ],
+        randomize=True,
+    ),
+    "multi": lambda: MultiGenerator(
+        [
+            CrossoverGenerator(),
+            MutationGenerator(),
+            ShuffleGenerator(),
+        ]
+    ),
+    "shuffle": ShuffleGenerator,
+    "two-opt": TwoOptGenerator,
+    "or-opt": OrOptGenerator,
+    "relocate": RelocateGenerator,
+    "exchange": ExchangeGenerator,
+    "two-opt-star": TwoOptStarGenerator,
+    "granular-relocate": GranularRelocateGenerator,
+    "granular-exchange": GranularExchangeGenerator,
+    "granular-two-opt": GranularTwoOptGenerator,
+    "granular": lambda: RandomNeighborhoodGenerator(
+        [
+            GranularRelocateGenerator(),
+            GranularExchangeGenerator(),
+            GranularTwoOptGenerator(),
+        ],
+        randomize=True,
+    ),
+    "ruin-random": RuinRecreateGenerator,
+    "ruin-proximity": ProximityRuinRecreateGenerator,
+    "ruin-worst": WorstRuinRecreateGenerator,
+    "ruin-recreate": lambda: RandomNeighborhoodGenerator(
+        [
+            RuinRecreateGenerator(),
+            ProximityRuinRecreateGenerator(),
+            WorstRuinRecreateGenerator(),
+        ],
+        randomize=True,
+    ),
+    "adaptive": lambda: AdaptiveGenerator(
+        [
+            CrossoverGenerator(),
+            MutationGenerator(),
+            ShuffleGenerator(),
+            TwoOptGenerator(),
+            OrOptGenerator(),
+            RelocateGenerator(),
+            ExchangeGenerator(),
+            TwoOptStarGenerator(),
+            GranularRelocateGenerator(),
+            GranularExchangeGenerator(),
+            GranularTwoOptGenerator(),
+            RuinRecreateGenerator(),
+            ProximityRuinRecreateGenerator(),
+            WorstRuinRecreateGenerator(),
+        ]
+    ),
+}
+
+
+def local_search_neighborhoods() -> list[NeighborhoodGenerator]:
+    """
+    Returns the neighborhoods local search descends through,
+    in the order picked in the configuration
+    """
+
+    names = [
+        name.strip()
+        for name in Config.get(
+            "VND_NEIGHBORHOODS",
+            "two-opt,or-opt,granular-relocate,granular-exchange,granular-two-opt",
+        ).split(",")
+    ]
+
+    if unknown := [name for name in names if name not in NEIGHBORHOOD_GENERATORS]:
+        raise ValueError(
+            f"Unknown neighborhoods {unknown} in VND_NEIGHBORHOODS, "
+            f"expected names among {list(NEIGHBORHOOD_GENERATORS)}"
+        )
+
+    return [NEIGHBORHOOD_GENERATORS[name]() for name in names]
+
+
+def chains_initial_state_generator() -> InitialStateGenerator | None:
+    """
+    Returns the initial state generator of the chains of multi-start
+    simulated annealing picked in the configuration,
+    or None if the chains start from the initial state of the simulation
+    """
+
+    name = Config.get("SA_CHAINS_INITIAL_STATE_GENERATOR", "")
+
+    return INITIAL_STATE_GENERATORS[name]() if name else None
+
+
+# the metaheuristics, keyed by their configuration name, built from
+# the neighborhood generator and fitness function to use,
+# with their parameters read from the configuration when they are built
+METAHEURISTICS: dict[
+    str,
+    Callable[[NeighborhoodGenerator, Callable[[State], float]], Metaheuristic],
+] = {
+    "default": Metaheuristic,
+    "sa": lambda neighborhood_generator, fitness_function: SimulatedAnnealing(
+        neighborhood_generator,
+        fitness_function,
+        float(Config.get("SA_INITIAL_TEMPERATURE", "1000")),
+        float(Config.get("SA_COOLDOWN_RATE", "0.999")),
+        float(Config.get("SA_MIN_TEMPERATURE", "0.00001")),
+        int(Config.get("SA_MAX_ITERATIONS_WITHOUT_IMPROVEMENT", "5")),
+    ),
+    "multi-sa": lambda neighborhood_generator, fitness_function: (
+        MultiStartSimulatedAnnealing(
+            neighborhood_generator,
+            fitness_function,
+            float(Config.get("SA_INITIAL_TEMPERATURE", "1000")),
+            float(Config.get("SA_COOLDOWN_RATE", "0.999")),
+            float(Config.get("SA_MIN_TEMPERATURE", "0.00001")),
+            int(Config.get("SA_MAX_ITERATIONS_WITHOUT_IMPROVEMENT", "5")),
+            int(Config.get("SA_NUM_CHAINS", str(os.cpu_count() or 1))),
+            chains_initial_state_generator(),
+        )
+    ),
+    "pt": lambda neighborhood_generator, fitness_function: ParallelTempering(
+        neighborhood_generator,
+        fitness_function,
+        int(Config.get("PT_NUM_REPLICAS", str(os.cpu_count() or 1))),
+        float(Config.get("PT_MIN_TEMPERATURE", "1")),
+        float(Config.get("PT_MAX_TEMPERATURE", "1000")),
+        int(Config.get("PT_STEPS_PER_EXCHANGE", "1000")),
+        int(Config.get("PT_NUM_EXCHANGES", "50")),
+    ),
+    "tabu": lambda neighborhood_generator, fitness_function: TabuSearch(
+        neighborhood_generator,
+        fitness_function,
+        int(Config.get("TABU_NEIGHBORHOOD_SIZE", "50")),
+        int(Config.get("TABU_TENURE", "20")),
+        int(Config.get("TABU_MAX_ITERATIONS", "1000")),
+        int(Config.get("TABU_MAX_ITERATIONS_WITHOUT_IMPROVEMENT", "100")),
+    ),
+    "vnd": lambda neighborhood_generator, fitness_function: (
+        VariableNeighborhoodDescent(
+            neighborhood_generator,
+            fitness_function,
+            local_search_neighborhoods(),
+            Config.get("VND_FIRST_IMPROVEMENT", "false") == "true",
+        )
+    ),
+    "ils": lambda neighborhood_generator, fitness_function: IteratedLocalSearch(
+        neighborhood_generator,
+        fitness_function,
+        local_search_neighborhoods(),
+        Config.get("VND_FIRST_IMPROVEMENT", "false") == "true",
+        int(Config.get("ILS_PERTURBATION_STRENGTH", "3")),
+        int(Config.get("ILS_MAX_ITERATIONS", "100")),
+        int(Config.get("ILS_MAX_ITERATIONS_WITHOUT_IMPROVEMENT", "20")),
+    ),
+    "genetic": lambda neighborhood_generator, fitness_function: GeneticAlgorithm(
+        neighborhood_generator,
+        fitness_function,
+        int(Config.get("GA_POPULATION_SIZE", "50")),
+        float(Config.get("GA_CROSSOVER_RATE", "0.9")),
+        float(Config.get("GA_MUTATION_RATE", "0.2")),
+        Config.get("GA_CROSSOVER", "ox"),
+        int(Config.get("GA_NUM_GENERATIONS", "1000")),
+        int(Config.get("GA_MAX_GENERATIONS_WITHOUT_IMPROVEMENT", "100")),
+    ),
+    "island-genetic": lambda neighborhood_generator, fitness_function: (
+        IslandGeneticAlgorithm(
+            neighborhood_generator,
+            fitness_function,
+            int(Config.get("GA_POPULATION_SIZE", "50")),
+            float(Config.get("GA_CROSSOVER_RATE", "0.9")),
+            float(Config.get("GA_MUTATION_RATE", "0.2")),
+            Config.get("GA_CROSSOVER", "ox"),
+            int(Config.get("GA_NUM_GENERATIONS", "1000")),
+            int(Config.get("GA_MAX_GENERATIONS_WITHOUT_IMPROVEMENT", "100")),
+            int(Config.get("GA_NUM_ISLANDS", str(os.cpu_count() or 1))),
+            int(Config.get("GA_MIGRATION_INTERVAL", "10")),
+            int(Config.get("GA_NUM_MIGRANTS", "2")),
+        )
+    ),
+}
+
+
+def initial_state_generator_from_config() -> InitialStateGenerator:
+    """
+    Returns the initial state generator picked in the configuration
+    """
+
+    return INITIAL_STATE_GENERATORS[Config.get("INITIAL_STATE_GENERATOR", "default")]()
+
+
+def budget_from_config() -> Budget:
+    """
+    Returns the budget picked in the configuration,
+    where an empty value leaves the limit unset
+    """
+
+    time_limit = Config.get("BUDGET_TIME_LIMIT", "")
+    max_evaluations = Config.get("BUDGET_MAX_EVALUATIONS", "")
+    max_iterations_without_improvement = Config.get(
+        "BUDGET_MAX_ITERATIONS_WITHOUT_IMPROVEMENT", ""
+    )
+    target_value = Config.get("BUDGET_TARGET_VALUE", "")
+
+    return Budget(
+        float(time_limit) if time_limit else None,
+        int(max_evaluations) if max_evaluations else None,
+        (
+            int(max_iterations_without_improvement)
+            if max_iterations_without_improvement
+            else None
+        ),
+        # the fitness is the opposite of the waiting time
+        -float(target_value) if target_value else None,
+    )
+
+
+def simulation_config_from_config() -> SimulationConfig:
+    """
+    Returns the simulation configuration built from the heuristics
+    picked in the configuration
+    """
+
+    # could add support for more in the future
+    fitness_function: Callable[[State], float] = waiting_time_fitness
+
+    neighborhood_generator = NEIGHBORHOOD_GENERATORS[
+        Config.get("NEIGHBORHOOD_GENERATOR", "default")
+    ]()
+
+    metaheuristic = METAHEURISTICS[Config.get("METAHEURISTIC", "default")](
+        neighborhood_generator, fitness_function
+    )
+    metaheuristic.budget = budget_from_config()
+
+    return SimulationConfig(metaheuristic, fitness_function, neighborhood_generator)
@@ -0,0 +1,181 @@
+"""
+A bounded cache of route costs, keyed by a hash of each route's legs
+"""
+
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from config import Config
+from debug import Printable
+
+# constants of the splitmix64 finalizer, which scatters the bits of each leg
+SPLITMIX_INCREMENT = np.uint64(0x9E3779B97F4A7C15)
+SPLITMIX_FIRST_MULTIPLIER = np.uint64(0xBF58476D1CE4E5B9)
+SPLITMIX_SECOND_MULTIPLIER = np.uint64(0x94D049BB133111EB)
+
+
+def leg_keys(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """
+    Returns a pseudo-random 64-bit key for each leg between the given establishments
+    """
+
+    keys = (np.asarray(origins, dtype=np.uint64) << np.uint64(32)) | np.asarray(
+        destinations, dtype=np.uint64
+    )
+
+    keys = keys + SPLITMIX_INCREMENT
+    keys = (keys ^ (keys >> np.uint64(30))) * SPLITMIX_FIRST_MULTIPLIER
+    keys = (keys ^ (keys >> np.uint64(27))) * SPLITMIX_SECOND_MULTIPLIER
+
+    return keys ^ (keys >> np.uint64(31))
+
+
+class RouteCache(Printable):
+    """
+    A least recently used cache of the waiting time of routes, keyed by route hash.
+
+    The hash of a route that leaves the depot is the XOR of the keys of its legs,
+    in the style of Zobrist hashing. A route from the depot is uniquely identified
+    by its legs, so the hash does not depend on how the route was built,
+    and states that share routes with previously evaluated ones,
+    even if they were built independently, reuse those routes' costs.
+
+    Since XOR is its own inverse, the hash of a route changed by a move
+    is updated from the hash of the old route by only XOR-ing out the legs
+    the move removes and XOR-ing in the legs it adds
+    """
+
+    def __init__(
+        self, depot: int, num_establishments: int, max_size: Optional[int] = None
+    ):
+        self.depot = depot
+        self.max_size = (
+            max_size
+            if max_size is not None
+            else int(Config.get("ROUTE_CACHE_SIZE", "100000"))
+        )
+        self.entries: OrderedDict[int, float] = OrderedDict()
+
+        # key of the leg between every pair of establishments, looked up when hashing
+        ids = np.arange(num_establishments)
+        self.keys = leg_keys(ids[:, np.newaxis], ids[np.newaxis, :])
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Returns whether this cache stores any route,
+        so that callers can skip hashing routes otherwise
+        """
+
+        return self.max_size > 0
+
+    def route_hash(self, route: np.ndarray | list[int]) -> int:
+        """
+        Returns the hash of a route, given the establishment ids it visits
+        after leaving the depot
+        """
+
+        return self.legs_hash(route, 0, len(route) - 1)
+
+    def legs_hash(self, route: np.ndarray | list[int], first: int, last: int) -> int:
+        """
+        Returns the XOR of the keys of the legs a route travels to reach
+        its establishments from position *first* to *last*, inclusive
+        """
+
+        last = min(last, len(route) - 1)
+
+        if first > last:
+            return 0
+
+        establishments = route[first : last + 1]
+        if isinstance(establishments, np.ndarray):
+            establishments = establishments.tolist()
+
+        # the leg to the first establishment leaves the depot
+        previous = int(route[first - 1]) if first > 0 else self.depot
+
+        # short runs of legs are hashed faster one at a time than vectorized
+        keys, legs_hash = self.keys, 0
+        for establishment in establishments:
+            legs_hash ^= keys.item(previous, establishment)
+            previous = establishment
+
+        return legs_hash
+
+    def updated_hash(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        route_hash: int,
+        old_route: np.ndarray | list[int],
+        new_route: np.ndarray | list[int],
+        first_change: int,
+        last_change: int,
+    ) -> int:
+        """
+        Returns the hash of a new route, given the hash of the old route it replaces,
+        when the new route only differs from the old one between positions
+        *first_change* and *last_change*, inclusive, and the rest of the old route
+        follows them unchanged.
+
+        Only the legs reaching the changed positions and the one leaving them
+        are hashed, so the cost depends on the size of the change,
+        not on the length of the route
+        """
+
+        # the last position of the old route that the change replaced
+        last_old_change = last_change + len(old_route) - len(new_route)
+
+        return (
+            route_hash
+            ^ self.legs_hash(old_route, first_change, last_old_change + 1)
+            ^ self.legs_hash(new_route, first_change, last_change + 1)
+        )
+
+    def route_hashes(self, routes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Returns the hash of each route of a padded matrix,
+        as returned by **pad_routes**,
+        where only the first *lengths[row]* ids of a row are used
+        """
+
+        previous = np.empty_like(routes)
+        previous[:, 0] = self.depot
+        previous[:, 1:] = routes[:, :-1]
+
+        used = np.arange(routes.shape[1]) < lengths[:, np.newaxis]
+        keys = np.where(used, self.keys[previous, routes], np.uint64(0))
+
+        return np.bitwise_xor.reduce(keys, axis=1)
+
+    def get(self, key: int) -> float | None:
+        """
+        Returns the cached waiting time of the route with the given hash,
+        or None if it is not cached
+        """
+
+        waiting_time = self.entries.get(key)
+
+        if waiting_time is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        return waiting_time
+
+    def put(self, key: int, waiting_time: float):
+        """
+        Caches the waiting time of the route with the given hash,
+        evicting the least recently used route if the cache is full
+        """
+
+        self.entries[key] = waiting_time
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
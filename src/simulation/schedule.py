@@ -0,0 +1,171 @@
+"""
+Schedules of the brigades' routes, used to evaluate changes to a route
+without walking all of it again
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from debug import Printable
+from models.brigade import Brigade
+from models.establishment import HOURS_PER_DAY
+from models.network import Network
+
+from .segment import SegmentSummary
+
+
+@dataclass(frozen=True)
+class RouteSchedule(Printable):
+    """
+    The prefix schedule of a route: when the brigade leaves each stop
+    and how long it waited so far.
+
+    Index 0 refers to the depot and index *k* to the *k*-th establishment of the route
+
+    Attributes:
+        departures (list[float]): the time at which the brigade leaves each stop
+        waiting_times (list[float]): the total waiting time
+            up to and including each stop
+    """
+
+    departures: list[float]
+    waiting_times: list[float]
+
+    @property
+    def waiting_time(self) -> float:
+        """
+        Returns the total waiting time of the route
+        """
+
+        return self.waiting_times[-1]
+
+
+def route_schedule(route: np.ndarray | list[int], network: Network) -> RouteSchedule:
+    """
+    Walks the given route, after leaving the depot, and returns its prefix schedule,
+    mirroring **evaluate_path**
+    """
+
+    graph = network.graph
+    hours_until_open = network.hours_until_open_rows
+    inspection_times = network.inspection_times
+
+    cur_time = float(Brigade.INSPECTION_START_TIME_SECONDS)
+    total_waiting_time = 0.0
+
+    departures: list[float] = [cur_time]
+    waiting_times: list[float] = [total_waiting_time]
+
+    previous = network.depot.establishment_id
+
+    for establishment_id in route.tolist() if isinstance(route, np.ndarray) else route:
+        cur_time += graph.get(previous, establishment_id)
+
+        cur_hour = int(cur_time // 3600)
+        hours_to_wait = hours_until_open[establishment_id][cur_hour % HOURS_PER_DAY]
+
+        waiting_time = (
+            0 if hours_to_wait == 0 else (cur_hour + hours_to_wait) * 3600 - cur_time
+        )
+
+        cur_time += waiting_time
+        total_waiting_time += waiting_time
+
+        cur_time += inspection_times[establishment_id]
+
+        departures.append(cur_time)
+        waiting_times.append(total_waiting_time)
+        previous = establishment_id
+
+    return RouteSchedule(departures, waiting_times)
+
+
+def changed_route_waiting_time(  # pylint: disable=too-many-locals
+    schedule: RouteSchedule,
+    new_route: list[int],
+    first_change: int,
+    last_change: int,
+    network: Network,
+) -> float:
+    """
+    Returns the waiting time of a route that visits the same establishments
+    as the route of the given schedule, except at the positions
+    between *first_change* and *last_change* of the new route, inclusive.
+    The establishments after the changed positions are the old route's last ones,
+    so the new route may be longer or shorter than the old one.
+
+    The unchanged prefix is read from the schedule. Opening hours make the brigade
+    wait until the same hour regardless of when it arrived, so as soon as
+    the brigade leaves an unchanged stop at the same time as before,
+    the rest of the route is read from the schedule as well
+    """
+
+    graph = network.graph
+    hours_until_open = network.hours_until_open_rows
+    inspection_times = network.inspection_times
+    departures = schedule.departures
+
+    # how many positions the unchanged establishments after the changes moved
+    shift = len(new_route) - (len(departures) - 1)
+
+    previous = (
+        new_route[first_change - 1]
+        if first_change > 0
+        else network.depot.establishment_id
+    )
+
+    cur_time = departures[first_change]
+    total_waiting_time = schedule.waiting_times[first_change]
+
+    for position in range(first_change, len(new_route)):
+        establishment_id = new_route[position]
+        cur_time += graph.get(previous, establishment_id)
+
+        cur_hour = int(cur_time // 3600)
+        hours_to_wait = hours_until_open[establishment_id][cur_hour % HOURS_PER_DAY]
+
+        waiting_time = (
+            0 if hours_to_wait == 0 else (cur_hour + hours_to_wait) * 3600 - cur_time
+        )
+
+        cur_time += waiting_time
+        total_waiting_time += waiting_time
+
+        cur_time += inspection_times[establishment_id]
+
+        # the rest of the route is unchanged and starts at the same time as before
+        if position > last_change and cur_time == departures[position - shift + 1]:
+            return total_waiting_time + (
+                schedule.waiting_time - schedule.waiting_times[position - shift + 1]
+            )
+
+        previous = establishment_id
+
+    return total_waiting_time
+
+
+def spliced_route_waiting_time(
+    schedule: RouteSchedule,
+    route: np.ndarray,
+    position: int,
+    suffix: SegmentSummary,
+    network: Network,
+) -> float:
+    """
+    Returns the waiting time of a route that visits the establishments
+    of the given route, whose schedule is also given, before the given position,
+    and then the establishments of the given suffix of any other route
+    """
+
+    total_waiting_time = schedule.waiting_times[position]
+
+    if suffix.first is None:
+        return total_waiting_time
+
+    previous = (
+        network.depot.establishment_id if position == 0 else route.item(position - 1)
+    )
+    arrival = schedule.departures[position] + network.graph.get(previous, suffix.first)
+
+    return total_waiting_time + suffix.waiting_time(arrival)
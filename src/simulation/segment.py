@@ -0,0 +1,204 @@
+"""
+Summaries of route segments, used to evaluate routes made of pieces
+of other routes without walking those pieces again
+"""
+
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+from debug import Printable
+from models.establishment import HOURS_PER_DAY
+from models.network import Network
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = HOURS_PER_DAY * SECONDS_PER_HOUR
+
+
+@dataclass(frozen=True)
+class SegmentSummary(Printable):
+    """
+    The time at which a brigade leaves the last stop of a segment,
+    as a function of the time at which it arrives at the first stop.
+
+    Opening hours repeat every day and make the brigade wait
+    until the start of an hour, so the function is made of pieces, over the time
+    of the day the brigade arrives at, in which it either never waits
+    and leaves after the segment's duration, or waits and always leaves
+    at the same time, counted from the start of the day it arrived at.
+    There are at most a few pieces per hour of the day,
+    so concatenating two segments or reading a departure time takes
+    a number of steps bounded by the hours of a day, not by the length of the segment
+
+    Attributes:
+        first (Optional[int]): the first establishment of the segment,
+            or None if it is empty
+        last (Optional[int]): the last establishment of the segment,
+            or None if it is empty
+        duration (float): the time spent travelling and inspecting in the segment
+        starts (list[float]): the time of the day at which each piece starts
+        departures (list[Optional[float]]): the departure time of each piece,
+            from the start of the day of arrival, or None if the brigade never waits
+    """
+
+    first: Optional[int]
+    last: Optional[int]
+    duration: float
+    starts: list[float]
+    departures: list[Optional[float]]
+
+    def departure(self, arrival: float) -> float:
+        """
+        Returns the time at which the brigade leaves the last stop of this segment,
+        given the time at which it arrives at the first one
+        """
+
+        day = math.floor(arrival / SECONDS_PER_DAY)
+        piece = bisect_right(self.starts, arrival - day * SECONDS_PER_DAY) - 1
+
+        departure = self.departures[piece]
+
+        return (
+            arrival + self.duration
+            if departure is None
+            else day * SECONDS_PER_DAY + departure
+        )
+
+    def waiting_time(self, arrival: float) -> float:
+        """
+        Returns how long the brigade waits in this segment,
+        given the time at which it arrives at its first stop
+        """
+
+        if self.first is None:
+            return 0.0
+
+        return self.departure(arrival) - arrival - self.duration
+
+
+EMPTY_SEGMENT = SegmentSummary(None, None, 0.0, [0.0], [None])
+
+
+def stop_summary(establishment: int, network: Network) -> SegmentSummary:
+    """
+    Returns the summary of a segment that only inspects the given establishment,
+    only building it once per network
+    """
+
+    if (summary := network.stop_summaries.get(establishment)) is not None:
+        return summary
+
+    inspection_time = network.inspection_times[establishment]
+
+    starts: list[float] = []
+    departures: list[Optional[float]] = []
+
+    for hour, hours_to_wait in enumerate(network.hours_until_open_rows[establishment]):
+        departure = (
+            None
+            if hours_to_wait == 0
+            else (hour + hours_to_wait) * SECONDS_PER_HOUR + inspection_time
+        )
+
+        # consecutive closed hours usually wait until the same opening
+        if not departures or departures[-1] != departure:
+            starts.append(float(hour * SECONDS_PER_HOUR))
+            departures.append(departure)
+
+    summary = SegmentSummary(
+        establishment, establishment, inspection_time, starts, departures
+    )
+    network.stop_summaries[establishment] = summary
+
+    return summary
+
+
+def concatenate(
+    first: SegmentSummary, second: SegmentSummary, network: Network
+) -> SegmentSummary:
+    """
+    Returns the summary of the segment that visits the stops of the first segment
+    and then the stops of the second one
+    """
+
+    if first.last is None:
+        return second
+    if second.last is None:
+        return first
+
+    travel_time = network.graph.get(first.last, second.first)
+
+    # the second segment starts this long after the first one when nobody waits
+    offset = first.duration + travel_time
+
+    starts: list[float] = []
+    departures: list[Optional[float]] = []
+
+    def add_piece(start: float, departure: Optional[float]):
+        if not departures or departures[-1] != departure:
+            starts.append(start)
+            departures.append(departure)
+
+    for piece, (start, departure) in enumerate(zip(first.starts, first.departures)):
+        if departure is not None:
+            add_piece(start, second.departure(departure + travel_time))
+            continue
+
+        end = (
+            first.starts[piece + 1]
+            if piece + 1 < len(first.starts)
+            else float(SECONDS_PER_DAY)
+        )
+
+        # split the arrivals at the second segment by the pieces they fall in
+        arrival = start + offset
+        day = math.floor(arrival / SECONDS_PER_DAY)
+        second_piece = bisect_right(second.starts, arrival - day * SECONDS_PER_DAY) - 1
+
+        piece_start = start
+        while arrival < end + offset:
+            second_departure = second.departures[second_piece]
+            add_piece(
+                piece_start,
+                (
+                    None
+                    if second_departure is None
+                    else day * SECONDS_PER_DAY + second_departure
+                ),
+            )
+
+            second_piece += 1
+            if second_piece == len(second.starts):
+                second_piece = 0
+                day += 1
+
+            arrival = day * SECONDS_PER_DAY + second.starts[second_piece]
+            piece_start = arrival - offset
+
+    return SegmentSummary(
+        first.first,
+        second.last,
+        offset + second.duration,
+        starts,
+        departures,
+    )
+
+
+def route_suffixes(route: list[int], network: Network) -> list[SegmentSummary]:
+    """
+    Returns the summary of every suffix of the given route,
+    where the *k*-th summary covers the establishments from position *k* onwards
+    and the last one is empty
+    """
+
+    suffixes = [EMPTY_SEGMENT]
+
+    for establishment in reversed(route):
+        suffixes.append(
+            concatenate(stop_summary(establishment, network), suffixes[-1], network)
+        )
+
+    suffixes.reverse()
+
+    return suffixes
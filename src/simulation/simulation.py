@@ -2,14 +2,14 @@
 Classes and methods related to running the simulation of the problem
 """
 
-
 import math
 from dataclasses import dataclass, field
 from time import perf_counter
-from typing import Callable, Generator, Optional
+from typing import Any, Callable, Generator, Optional
 
 from config import Config
 from models.establishment import Establishment
+from models.network import Network
 from models.parse import parse_model
 from simulation.heuristics.neighborhood.crossover import CrossoverGenerator
 from simulation.heuristics.neighborhood.generator import (
@@ -20,9 +20,12 @@ from simulation.heuristics.neighborhood.random import RandomGenerator
 from simulation.heuristics.neighborhood.shuffle import ShuffleGenerator
 
 from .graph import Graph, parse_graph
-from .heuristics.meta.metaheuristic import Metaheuristic
+from .heuristics.meta.metaheuristic import Metaheuristic, waiting_time_fitness
 from .state import State
 
+ESTABLISHMENTS_FILE = "./resources/dataset/establishments.csv"
+DISTANCES_FILE = "./resources/dataset/distances.csv"
+
 
 class SimulationConfig:
     """
@@ -49,9 +52,7 @@ class SimulationConfig:
         )
 
         real_fitness_function: Callable[[State], float] = (
-            fitness_function
-            if fitness_function is not None
-            else lambda state: -state.value()
+            fitness_function if fitness_function is not None else waiting_time_fitness
         )
 
         self.heuristic = (
@@ -80,6 +81,58 @@ class SimulationStatistics:  # pylint: disable=too-many-instance-attributes
     metaheuristic_name: str = ""
     initial_state_generator_name: str = ""
 
+    # statistics specific to the metaheuristic that was used
+    metaheuristic_statistics: dict[str, Any] = field(default_factory=dict[str, Any])
+
+    # how much of its budget the metaheuristic used
+    budget_statistics: dict[str, Any] = field(default_factory=dict[str, Any])
+
+    # statistics about the moves proposed by the neighborhood generator,
+    # only counting the main process
+    neighborhood_statistics: dict[str, Any] = field(default_factory=dict[str, Any])
+
+    # lookups of route costs during the run, only counting the main process
+    route_cache_hits: int = 0
+    route_cache_misses: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Returns these statistics, along with the best solution's routes,
+        as a dict of JSON serializable values
+        """
+
+        evaluations = self.best_solution.evaluations()
+
+        return {
+            "metaheuristic": self.metaheuristic_name,
+            "initial_state_generator": self.initial_state_generator_name,
+            "runtime": self.runtime,
+            "total_iterations": self.total_iterations,
+            "values": self.values,
+            "metaheuristic_statistics": self.metaheuristic_statistics,
+            "budget": self.budget_statistics,
+            "neighborhood_statistics": self.neighborhood_statistics,
+            "route_cache": {
+                "hits": self.route_cache_hits,
+                "misses": self.route_cache_misses,
+            },
+            "best_solution": {
+                "depot": self.best_solution.network.depot.establishment_id,
+                "waiting_time": sum(e.waiting_time for e in evaluations),
+                "travel_time": sum(e.travel_time for e in evaluations),
+                "utility": sum(e.utility for e in evaluations),
+                "routes": [
+                    {
+                        "establishments": route.tolist(),
+                        "waiting_time": evaluation.waiting_time,
+                        "travel_time": evaluation.travel_time,
+                        "utility": evaluation.utility,
+                    }
+                    for route, evaluation in zip(self.best_solution.routes, evaluations)
+                ],
+            },
+        }
+
 
 class Simulation:
     """
@@ -102,7 +155,8 @@ class Simulation:
             heuristic (Metaheuristic, optional): The metaheuristic to use when optimizing the problem's solution. Defaults to None.
         """
         self.stats = SimulationStatistics()
-        self.state = State([], depot, establishments, graph)
+        self.network = Network(depot, graph, establishments)
+        self.state = State.from_routes([], self.network)
         self.num_establishments = len(
             establishments
         )  # HACK: this is a hack, but it works
@@ -126,11 +180,14 @@ class Simulation:
         iterations = 0
         start = perf_counter()
 
+        cache = self.network.route_cache
+        hits, misses = cache.hits, cache.misses
+
         values: list[float] = [self.state.value()]
 
-        for new_state in self.heuristic.optimize(self.state):
+        for new_state in self.heuristic.run(self.state):
             self.state = new_state
-            values.append(self.state.cached_value)
+            values.append(self.state.value())
 
             yield self.state
 
@@ -142,6 +199,11 @@ class Simulation:
         self.stats.runtime = end - start
         self.stats.total_iterations = iterations
         self.stats.best_solution = self.state
+        self.stats.metaheuristic_statistics = self.heuristic.statistics()
+        self.stats.budget_statistics = self.heuristic.budget.statistics()
+        self.stats.neighborhood_statistics = self.heuristic.generator.statistics()
+        self.stats.route_cache_hits = cache.hits - hits
+        self.stats.route_cache_misses = cache.misses - misses
 
     @staticmethod
     def setup(simulation_config: SimulationConfig) -> "Simulation":
@@ -150,13 +212,28 @@ class Simulation:
         """
         num_establishments_to_parse = int(Config.get("NUM_MODELS_TO_PARSE"))
 
-        establishments = parse_model(
-            "./resources/dataset/establishments.csv",
-            Establishment,
-            num_establishments_to_parse,
-        )
-        graph = parse_graph("./resources/dataset/distances.csv")
-
-        depot = establishments.pop(0)
+        depot, graph, establishments = load_dataset(num_establishments_to_parse)
 
         return Simulation(depot, establishments, graph, simulation_config)
+
+
+def load_dataset(
+    num_establishments_to_parse: int,
+) -> tuple[Establishment, Graph, list[Establishment]]:
+    """
+    Loads the depot, the graph and the other establishments from the dataset files,
+    in the order the network takes them.
+
+    A negative amount of establishments to parse means that all of them are parsed
+    """
+
+    establishments = parse_model(
+        ESTABLISHMENTS_FILE,
+        Establishment,
+        num_establishments_to_parse,
+    )
+    graph = parse_graph(DISTANCES_FILE)
+
+    depot = establishments.pop(0)
+
+    return depot, graph, establishments
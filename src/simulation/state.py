@@ -2,89 +2,350 @@
 State representation in this simulation
 """
 
-
-from copy import deepcopy
+import numpy as np
 
 from debug import Printable
-from models.brigade import Brigade
-from models.establishment import Establishment
+from models.brigade import Brigade, RouteEvaluation, evaluate_path
 from models.network import Network
 from models.route import Route
 
-from .graph import Graph
+from .evaluation import route_waiting_times
+from .schedule import RouteSchedule, route_schedule
+from .segment import SegmentSummary, route_suffixes
 from .heuristics.initial_state.generator import Generator
 from .heuristics.initial_state.random import RandomGenerator
 
 
 class State(Printable):
     """
-    The state of the problem, encoding every useful parameter
+    The state of the problem, encoding every useful parameter.
+
+    Each brigade's route is an array of the establishment ids it visits,
+    without the depot that starts it. Route arrays are never modified once built,
+    so copies of a state share them and a neighbor only allocates
+    the routes it changes. The network is shared by every state and is never copied
     """
 
     def __init__(
         self,
-        brigades: list[Brigade],
-        depot: Establishment,
-        establishments: list[Establishment],
-        graph: Graph,
+        routes: list[np.ndarray],
+        network: Network,
+        waiting_times: np.ndarray | None = None,
     ):
-        self.brigades = brigades
+        self.routes = routes
+        self.network = network
+
+        # waiting time of each brigade's route, NaN if it must be recomputed
+        self.waiting_times = (
+            waiting_times
+            if waiting_times is not None
+            else np.full(len(routes), np.nan)
+        )
+
+        # prefix schedule of each brigade's route, only built when needed
+        self.schedules: dict[int, RouteSchedule] = {}
+
+        # summaries of every suffix of each brigade's route, only built when needed
+        self.suffix_summaries: dict[int, list[SegmentSummary]] = {}
+
+        # hash of each brigade's route in the network's route cache,
+        # only computed when needed or updated by the move that changed the route
+        self.hashes: dict[int, int] = {}
 
-        self.network = Network(depot, graph, establishments)
+        # brigade and position of every establishment, only built when needed
+        self.locations: tuple[list[int], list[int]] | None = None
 
-        self.establishments = establishments
         self.cached_value = 0
 
+    @staticmethod
+    def freeze_route(route: list[int] | np.ndarray) -> np.ndarray:
+        """
+        Returns the given route as a read-only array of establishment ids,
+        so that it can be shared between states
+        """
+
+        frozen = np.array(route, dtype=np.int32)
+        frozen.flags.writeable = False
+
+        return frozen
+
+    @staticmethod
+    def from_routes(routes: list[list[int]] | list[np.ndarray], network: Network):
+        """
+        Returns a state whose brigades follow the given routes of establishment ids
+        """
+
+        return State([State.freeze_route(route) for route in routes], network)
+
+    @staticmethod
+    def decode(tour: np.ndarray, offsets: np.ndarray, network: Network) -> "State":
+        """
+        Returns the state encoded in the given giant tour and brigade offsets,
+        as returned by **encode**
+        """
+
+        return State.from_routes(np.split(tour, offsets[1:-1]), network)
+
+    def encode(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a compact encoding of this state's routes:
+        every route back to back in a single "giant tour" array,
+        where the route of brigade *b* spans the tour between offsets *b* and *b + 1*
+        """
+
+        offsets = np.zeros(len(self.routes) + 1, dtype=np.int32)
+        np.cumsum([len(route) for route in self.routes], out=offsets[1:])
+
+        tour = (
+            np.concatenate(self.routes)
+            if len(self.routes) > 0
+            else np.empty(0, dtype=np.int32)
+        )
+
+        return tour, offsets
+
     @staticmethod
     def initial_state(
-        depot: Establishment,
-        graph: Graph,
-        establishments: list[Establishment],
+        network: Network,
         num_carriers: int,
         generator: Generator = RandomGenerator(),
     ) -> "State":
         """
-        Generates the initial state from the given list of establishments
+        Generates the initial state from the network's establishments
         using the given generator.
 
         By default it uses a random generator to generate the initial state
         """
 
-        brigades = [[depot] for _ in range(num_carriers)]
+        routes: list[list[int]] = [[] for _ in range(num_carriers)]
+        previous = [network.depot.establishment_id] * num_carriers
 
-        establishments_copy = {e.establishment_id: e for e in establishments}
+        unvisited = np.zeros(len(network.graph.mat), dtype=bool)
+        unvisited[[e.establishment_id for e in network.establishments]] = True
+        remaining = len(network.establishments)
 
-        while len(establishments_copy) > 0:
-            for brigade in brigades:
+        while remaining > 0:
+            for brigade, route in enumerate(routes):
                 # in case we exhaust every establishment
-                if len(establishments_copy) == 0:
+                if remaining == 0:
                     break
 
-                previous = brigade[-1]
                 establishment = generator.next(
-                    dict(establishments_copy.items()), previous, graph
+                    unvisited, previous[brigade], network.graph
                 )
-                establishments_copy.pop(establishment.establishment_id)
-                brigade.append(establishment)
-
-        return State(
-            [Brigade(Route(brigade)) for brigade in brigades],
-            depot,
-            establishments,
-            graph,
-        )
+                unvisited[establishment] = False
+                remaining -= 1
+
+                route.append(establishment)
+                previous[brigade] = establishment
+
+        return State.from_routes(routes, network)
+
+    @property
+    def num_brigades(self) -> int:
+        """
+        Returns the number of brigades in this state
+        """
+
+        return len(self.routes)
+
+    def route(self, brigade: int) -> np.ndarray:
+        """
+        Returns the read-only establishment ids visited by the given brigade,
+        in order and without the depot
+        """
+
+        return self.routes[brigade]
+
+    def invalidate(self, *brigades: int):
+        """
+        Marks the routes of the given brigades as changed,
+        so that their costs are recomputed on the next evaluation
+        """
+
+        self.waiting_times[list(brigades)] = np.nan
+
+    def with_routes(
+        self,
+        routes: dict[int, list[int] | np.ndarray],
+        waiting_times: dict[int, float] | None = None,
+        hashes: dict[int, int] | None = None,
+    ) -> "State":
+        """
+        Returns a copy of this state in which the given brigades
+        follow the given routes instead,
+        optionally with the already known waiting times and hashes of those routes.
+
+        Every other route is shared with this state, along with its cached costs
+        """
+
+        new_routes = self.routes.copy()
+        for brigade, route in routes.items():
+            new_routes[brigade] = State.freeze_route(route)
+
+        new_state = State(new_routes, self.network, self.waiting_times.copy())
+        new_state.invalidate(*routes.keys())
+        new_state.cached_value = self.cached_value
+        new_state.schedules = {
+            brigade: schedule
+            for brigade, schedule in self.schedules.items()
+            if brigade not in routes
+        }
+        new_state.suffix_summaries = {
+            brigade: suffixes
+            for brigade, suffixes in self.suffix_summaries.items()
+            if brigade not in routes
+        }
+
+        new_state.hashes = {
+            brigade: route_hash
+            for brigade, route_hash in self.hashes.items()
+            if brigade not in routes
+        }
+        new_state.hashes.update(hashes or {})
+
+        # only the establishments of the changed routes move
+        if self.locations is not None:
+            brigades, positions = self.locations[0].copy(), self.locations[1].copy()
+
+            for brigade in routes:
+                for position, establishment in enumerate(new_routes[brigade].tolist()):
+                    brigades[establishment] = brigade
+                    positions[establishment] = position
+
+            new_state.locations = (brigades, positions)
+
+        for brigade, waiting_time in (waiting_times or {}).items():
+            new_state.waiting_times[brigade] = waiting_time
+
+        return new_state
+
+    def route_waiting_time(self, brigade: int) -> float:
+        """
+        Returns the waiting time of the given brigade's route,
+        only evaluating it if it changed
+        """
+
+        if np.isnan(waiting_time := self.waiting_times[brigade]):
+            [waiting_time] = route_waiting_times(
+                [self.route(brigade)], self.network, self.route_hashes([brigade])
+            )
+            self.waiting_times[brigade] = waiting_time
+
+        return float(waiting_time)
+
+    def route_hash(self, brigade: int) -> int:
+        """
+        Returns the hash of the given brigade's route in the network's route cache,
+        only computing it the first time
+        """
+
+        if (route_hash := self.hashes.get(brigade)) is None:
+            route_hash = self.network.route_cache.route_hash(self.route(brigade))
+            self.hashes[brigade] = route_hash
+
+        return route_hash
+
+    def route_hashes(self, brigades: list[int]) -> list[int | None] | None:
+        """
+        Returns the hashes of the routes of the given brigades,
+        or None if the network's route cache is disabled and they are not needed
+        """
+
+        if not self.network.route_cache.enabled:
+            return None
+
+        return [self.route_hash(brigade) for brigade in brigades]
+
+    def schedule(self, brigade: int) -> RouteSchedule:
+        """
+        Returns the prefix schedule of the given brigade's route,
+        only building it the first time
+        """
+
+        if (schedule := self.schedules.get(brigade)) is None:
+            schedule = route_schedule(self.route(brigade), self.network)
+            self.schedules[brigade] = schedule
+
+        return schedule
+
+    def suffixes(self, brigade: int) -> list[SegmentSummary]:
+        """
+        Returns the summary of every suffix of the given brigade's route,
+        only building them the first time
+        """
+
+        if (suffixes := self.suffix_summaries.get(brigade)) is None:
+            suffixes = route_suffixes(self.route(brigade).tolist(), self.network)
+            self.suffix_summaries[brigade] = suffixes
+
+        return suffixes
+
+    def locate(self, establishment: int) -> tuple[int, int]:
+        """
+        Returns the brigade that visits the given establishment
+        and its position in that brigade's route.
+
+        The locations of every establishment are built the first time,
+        unless they were carried over from the state this one was derived from
+        """
+
+        if self.locations is None:
+            tour, offsets = self.encode()
+
+            brigades = np.zeros(len(self.network.graph.mat), dtype=np.intp)
+            positions = np.zeros(len(self.network.graph.mat), dtype=np.intp)
+
+            lengths = np.diff(offsets)
+            brigades[tour] = np.repeat(np.arange(len(self.routes)), lengths)
+            positions[tour] = np.arange(len(tour)) - np.repeat(offsets[:-1], lengths)
+
+            # plain lists are faster than arrays when reading one element at a time
+            self.locations = (brigades.tolist(), positions.tolist())
+
+        return self.locations[0][establishment], self.locations[1][establishment]
+
+    @property
+    def brigades(self) -> list[Brigade]:
+        """
+        Returns the brigades of this state, built from its routes
+        """
+
+        depot = self.network.depot
+        establishments = self.network.establishments_by_id
+
+        return [
+            Brigade(Route([depot, *map(establishments.__getitem__, route.tolist())]))
+            for route in self.routes
+        ]
+
+    def evaluations(self) -> list[RouteEvaluation]:
+        """
+        Returns the costs of every brigade's route
+        """
+
+        return [evaluate_path(route, self.network) for route in self.routes]
 
     def value(self) -> float:
         """
         Returns the value of the current state, to be used in evaluation functions.
 
         This value is based on the current network
-        which tells how the different routes are connected
+        which tells how the different routes are connected.
+
+        The waiting time of each route is cached,
+        so only the routes that changed are re-evaluated,
+        unless the network's route cache already knows their cost
         """
 
-        self.cached_value = sum(
-            map(lambda b: b.total_waiting_time(self.network), self.brigades), 0
-        )
+        if len(dirty := np.flatnonzero(np.isnan(self.waiting_times))) > 0:
+            self.waiting_times[dirty] = route_waiting_times(
+                [self.routes[brigade] for brigade in dirty.tolist()],
+                self.network,
+                self.route_hashes(dirty.tolist()),
+            )
+
+        self.cached_value = float(self.waiting_times.sum())
         return self.cached_value
 
     def copy(self):
@@ -93,4 +354,4 @@ class State(Printable):
         persisting changes to this instance
         """
 
-        return deepcopy(self)
+        return self.with_routes({})